@@ -1,74 +1,44 @@
 # app/1_Analise_Historica.py
 
 import streamlit as st
-import pandas as pd
-import joblib
-import plotly.express as px
+
+from artifacts import (dataset_version, deputies_version, load_dataset, load_dataset_index, load_deputies_master,
+                       load_model_bundle, plotly_chart, render_approval)
+from src.modeling.approval import ABSOLUTE_MAJORITY
+from src.modeling.predict import PlenaryPredictor
+from src.utils.timing import timed
 
 # --- Configuração da Página e Carregamento de Dados ---
 st.set_page_config(page_title="Plenar.io Preditivo", page_icon="📊", layout="wide")
 
 
-@st.cache_data
-def load_artifacts():
-    """Carrega todos os artefatos do modelo e os dados necessários."""
-    try:
-        model = joblib.load('models/lgbm_model.joblib')
-        encoder = joblib.load('models/label_encoder.joblib')
-        feature_columns = joblib.load('models/feature_columns.joblib')
-        data = pd.read_parquet('data/processed/modeling_dataset_enriched.parquet')
-        deputies_master = pd.read_parquet('data/processed/deputies_master_table.parquet')
-        return model, encoder, feature_columns, data, deputies_master
-    except FileNotFoundError:
-        st.error("Artefatos não encontrados. Execute o pipeline de scripts de 'src/' primeiro.")
-        return None, None, None, None, None
+bundle = load_model_bundle()
+df = load_dataset() if bundle is not None else None
+deputies_master_df = load_deputies_master() if df is not None else None
+dataset_index = load_dataset_index() if df is not None else None
 
 
-model, encoder, feature_columns, df, deputies_master_df = load_artifacts()
+# --- Funções de Lógica ---
+@st.cache_resource(max_entries=2)
+def _build_plenary_predictor(model_version, data_version, deputies_master_version, _bundle, _deputies_master, _data):
+    historical_features = _data[['id_deputado', 'pct_sim_historico', 'pct_sim_uf']].drop_duplicates()
+    return PlenaryPredictor(_deputies_master, historical_features, _bundle.predictor, _bundle.feature_columns,
+                            model_version)
 
 
-# --- Funções de Lógica ---
+@timed('app.previsao_plenario')
 def predict_plenary_votes(voting_id):
-    """Prevê o voto para TODOS os deputados para uma dada votação."""
+    """
+    Prevê o voto para TODOS os deputados para uma dada votação.
+
+    As previsões ficam em um cache LRU compartilhado por todas as sessões (ver `PlenaryPredictor`),
+    então votações já analisadas voltam sem chamar o modelo.
+    """
     if df is None: return None
 
-    voting_data = df[df['id_votacao'] == voting_id].iloc[0]
-    prediction_df = deputies_master_df.copy()
-    prediction_df['pct_sim_na_votacao'] = voting_data['pct_sim_na_votacao']
-    prediction_df['pct_sim_posicao_votacao'] = voting_data['pct_sim_posicao_votacao']
-    historical_features = df[['id_deputado', 'pct_sim_historico', 'pct_sim_uf']].drop_duplicates()
-    prediction_df = pd.merge(prediction_df, historical_features, on='id_deputado', how='left')
-    prediction_df.fillna(0.5, inplace=True)
-    PARTIDOS_GOVERNO = ['PT', 'PCdoB', 'PV', 'PSB', 'MDB', 'PSD', 'REPUBLICANOS', 'PODE', 'UNIÃO', 'PSOL', 'REDE']
-    PARTIDOS_OPOSICAO = ['PL', 'PP', 'NOVO']
-
-    def define_posicao(partido):
-        if partido in PARTIDOS_GOVERNO:
-            return 'Governo'
-        elif partido in PARTIDOS_OPOSICAO:
-            return 'Oposição'
-        else:
-            return 'Independente'
-
-    prediction_df['posicao_governo'] = prediction_df['partido'].apply(define_posicao)
-    X_live = pd.get_dummies(prediction_df[['partido', 'posicao_governo', 'uf', 'escolaridade']], drop_first=True)
-    X_live['idade'] = prediction_df['idade'].values
-    X_live['pct_sim_historico'] = prediction_df['pct_sim_historico'].values
-    X_live['pct_sim_na_votacao'] = prediction_df['pct_sim_na_votacao'].values
-    X_live['pct_sim_uf'] = prediction_df['pct_sim_uf'].values
-    X_live['pct_sim_posicao_votacao'] = prediction_df['pct_sim_posicao_votacao'].values
-    faixa_idade = pd.cut(prediction_df['idade'], bins=[0, 30, 40, 50, 60, 100],
-                         labels=['18-30', '41-50', '51-60', '60+', '31-40'])
-    X_faixa = pd.get_dummies(faixa_idade, prefix='faixa_idade', drop_first=True)
-    X_live = pd.concat([X_live, X_faixa], axis=1)
-    X_live = X_live.reindex(columns=feature_columns, fill_value=0)
-    predictions = model.predict(X_live)
-    prediction_df['voto_previsto'] = encoder.inverse_transform(predictions)
-    real_votes = df[df['id_votacao'] == voting_id][['id_deputado', 'tipoVoto']]
-    real_votes = real_votes.rename(columns={'tipoVoto': 'voto_realizado'})
-    prediction_df = pd.merge(prediction_df, real_votes, on='id_deputado', how='left')
-    prediction_df['voto_realizado'].fillna('Não Votou', inplace=True)
-    return prediction_df
+    predictor = _build_plenary_predictor(bundle.version, dataset_version(), deputies_version(), bundle,
+                                         deputies_master_df, df)
+    return predictor.predict(voting_id, dataset_index.voting_rows(voting_id))
 
 
 # --- Interface do Usuário (UI) ---
@@ -82,16 +52,13 @@ if df is not None:
     st.sidebar.caption(
         "A previsão usará o padrão de comportamento dos partidos e blocos desta votação como base para o cálculo.")
 
-    unique_votings = df[['id_votacao', 'proposicao_ementa']].drop_duplicates('id_votacao')
-
-
     def format_voting_option(voting_id):
-        ementa = unique_votings[unique_votings['id_votacao'] == voting_id]['proposicao_ementa'].iloc[0]
+        ementa = dataset_index.ementas[voting_id]
         if 'Ementa não disponível' in ementa: return f"Votação {voting_id} (Processual)"
         return ementa[:100] + "..."
 
 
-    selected_voting_id = st.sidebar.selectbox("Usar Padrão de Voto da Sessão:", options=unique_votings['id_votacao'],
+    selected_voting_id = st.sidebar.selectbox("Usar Padrão de Voto da Sessão:", options=dataset_index.voting_ids,
                                               format_func=format_voting_option)
 
     st.sidebar.markdown("**Passo 2: Filtre a Visualização (Opcional)**")
@@ -104,8 +71,10 @@ if df is not None:
             prediction_results = predict_plenary_votes(selected_voting_id)
 
         if prediction_results is not None:
-            ementa_selecionada = \
-            unique_votings[unique_votings['id_votacao'] == selected_voting_id]['proposicao_ementa'].iloc[0]
+            # O plotly só é importado quando há um gráfico a desenhar, não na abertura da página
+            import plotly.express as px
+
+            ementa_selecionada = dataset_index.ementas[selected_voting_id]
             st.header(f"Análise da Votação")
             st.info(f"**Votação de Referência ({selected_voting_id}):** {ementa_selecionada}")
 
@@ -127,7 +96,7 @@ if df is not None:
                     votos_sim_real = placar_real.get('Sim', 0)
                     votos_nao_real = placar_real.get('Não', 0)
                     votos_outros_real = len(display_df) - votos_sim_real - votos_nao_real
-                    resultado_real = "Aprovada" if votos_sim_real > 257 and selected_bancada == 'Todas' else "Rejeitada" if selected_bancada == 'Todas' else "-"
+                    resultado_real = "Aprovada" if votos_sim_real >= ABSOLUTE_MAJORITY and selected_bancada == 'Todas' else "Rejeitada" if selected_bancada == 'Todas' else "-"
                     c1, c2, c3 = st.columns(3)
                     c1.metric("Votos 'SIM'", f"{votos_sim_real}")
                     c2.metric("Votos 'NÃO'", f"{votos_nao_real}")
@@ -139,13 +108,16 @@ if df is not None:
                     placar_previsto = display_df['voto_previsto'].value_counts()
                     votos_sim_prev = placar_previsto.get('Sim', 0)
                     votos_nao_prev = placar_previsto.get('Não', 0)
-                    resultado_previsto = "Aprovada" if votos_sim_prev > 257 and selected_bancada == 'Todas' else "Rejeitada" if selected_bancada == 'Todas' else "-"
+                    resultado_previsto = "Aprovada" if votos_sim_prev >= ABSOLUTE_MAJORITY and selected_bancada == 'Todas' else "Rejeitada" if selected_bancada == 'Todas' else "-"
                     c1, c2, c3 = st.columns(3)
                     c1.metric("Votos 'SIM'", f"{votos_sim_prev}", delta=f"{votos_sim_prev - votos_sim_real}")
                     c2.metric("Votos 'NÃO'", f"{votos_nao_prev}", delta=f"{votos_nao_prev - votos_nao_real}")
                     c3.metric("Total Previsto", f"{votos_sim_prev + votos_nao_prev}")
                     if selected_bancada == 'Todas': st.metric("Status Previsto da Votação", resultado_previsto)
 
+                if selected_bancada == 'Todas':
+                    render_approval(display_df['prob_sim'].values, "Probabilidade de Aprovação")
+
                 st.subheader(f"Distribuição dos Votos Reais ({selected_bancada})")
                 bancada_votes = display_df.groupby('posicao_governo')['voto_realizado'].value_counts().unstack(
                     fill_value=0)
@@ -159,7 +131,7 @@ if df is not None:
                                  labels={'x': 'Bloco Político', 'value': 'Número de Votos'},
                                  barmode='group',
                                  color_discrete_map={'Sim': 'green', 'Não': 'red', 'Não Votou': 'grey'})
-                    st.plotly_chart(fig, use_container_width=True)
+                    plotly_chart(fig, use_container_width=True)
 
                 st.subheader(f"Mapa de Votos Detalhado ({selected_bancada})")
                 st.dataframe(
@@ -0,0 +1,403 @@
+# app/artifacts.py
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Garante que o pacote `src` seja importável quando o app é iniciado com `streamlit run app/...`
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from src.analysis import analytics  # noqa: E402
+from src.feature_engineering import build_aggregates  # noqa: E402
+from src.modeling import registry  # noqa: E402
+from src.modeling.approval import ABSOLUTE_MAJORITY, CONSTITUTIONAL_MAJORITY, approval_summary  # noqa: E402
+from src.utils.arrow_store import current_arrow_path, read_arrow  # noqa: E402
+from src.utils.artifacts import content_version  # noqa: E402
+from src.utils.dataset_index import DatasetIndex  # noqa: E402
+from src.utils.dataset_store import read_dataset  # noqa: E402
+from src.utils.timing import timed  # noqa: E402
+
+DATASET_PATH = 'data/processed/modeling_dataset_enriched.parquet'
+DATASET_ARROW_NAME = 'modeling_dataset_enriched'
+DEPUTIES_PATH = 'data/processed/deputies_master_table.parquet'
+PREDICTIONS_PATH = 'data/processed/predictions.parquet'
+# Os ids são gravados por último pelo `ementa_index.py` e definem a versão do índice
+EMENTA_INDEX_IDS_PATH = 'data/processed/ementa_index/ids.json'
+
+
+# --- Dados compartilhados ---
+# `st.cache_resource` guarda um único objeto por processo (sem pickle/cópia por chamada, como o
+# `st.cache_data`), então todas as páginas e sessões usam a mesma cópia dos dados. As funções
+# públicas devolvem visões rasas (`copy(deep=False)`): colunas novas ficam locais à página, mas os
+# valores são compartilhados e não devem ser alterados in-place — filtre ou use `.copy()` antes.
+#
+# Cada cache recebe como argumento a versão dos artefatos de que depende (o ponteiro versionado da
+# exportação Arrow ou o hash do conteúdo do arquivo), resolvida a cada rerun: uma nova saída do
+# pipeline é adotada no rerun seguinte e só invalida os caches que dependem dela. Os caches do dataset
+# guardam uma única versão: a anterior sai do cache assim que a nova é carregada, e as sessões com um
+# rerun em andamento mantêm a própria referência até terminar, então as duas cópias só coexistem
+# durante a troca.
+#
+# As leituras são instrumentadas com `timed` por baixo do cache: só as cargas de fato (cache miss)
+# aparecem na página de Desempenho.
+
+def dataset_version():
+    """
+    Versão do dataset enriquecido: (caminho da exportação Arrow, hash do parquet). O caminho da
+    exportação já muda a cada exportação; o hash do parquet só é calculado quando ela não existe.
+    """
+    arrow_path = current_arrow_path(DATASET_ARROW_NAME)
+    return arrow_path, None if arrow_path is not None else content_version(DATASET_PATH)
+
+
+def deputies_version():
+    """Versão (hash do conteúdo) da tabela mestre dos deputados."""
+    return content_version(DEPUTIES_PATH)
+
+
+@st.cache_resource(max_entries=1)
+@timed('app.carregar_dataset')
+def _read_dataset(version):
+    # Com a exportação Arrow do pipeline, o arquivo é mapeado em memória e o cache de páginas do SO
+    # é a única cópia, compartilhada entre os workers; sem ela, lê o parquet para o heap do processo.
+    arrow_path, _ = version
+    if arrow_path is not None:
+        return read_arrow(arrow_path)
+    data = pd.read_parquet(DATASET_PATH)
+    if 'dataRegistroVoto' in data.columns:
+        data['dataRegistroVoto'] = pd.to_datetime(data['dataRegistroVoto'], errors='coerce')
+    return data
+
+
+@st.cache_resource(max_entries=2)
+@timed('app.carregar_deputados')
+def _read_deputies_master(version):
+    return pd.read_parquet(DEPUTIES_PATH)
+
+
+def _shared_view(reader):
+    try:
+        return reader().copy(deep=False)
+    except FileNotFoundError:
+        st.error("Artefatos não encontrados. Execute o pipeline de scripts de 'src/' primeiro.")
+        return None
+
+
+def load_dataset():
+    """
+    O dataset enriquecido (deputado x votação), compartilhado por todas as páginas do processo.
+
+    A versão é resolvida a cada rerun (`dataset_version`), então uma nova saída do pipeline
+    é usada sem reiniciar o servidor.
+    """
+    version = dataset_version()
+    return _shared_view(lambda: _read_dataset(version))
+
+
+def load_deputies_master():
+    """A tabela mestre dos deputados em exercício, compartilhada por todas as páginas do processo."""
+    version = deputies_version()
+    return _shared_view(lambda: _read_deputies_master(version))
+
+
+@st.cache_resource(max_entries=1)
+@timed('app.indice_dataset')
+def _build_dataset_index(version, deputies_master_version):
+    try:
+        deputies_master = _read_deputies_master(deputies_master_version)
+    except FileNotFoundError:
+        deputies_master = None
+    return DatasetIndex(_read_dataset(version), deputies_master)
+
+
+def load_dataset_index():
+    """
+    Dimensões e índices do dataset compartilhado (`DatasetIndex`): rótulos das votações, nomes
+    dos deputados e recuperação das linhas por votação/deputado, montados uma vez por processo.
+    """
+    try:
+        return _build_dataset_index(dataset_version(), deputies_version())
+    except FileNotFoundError:
+        st.error("Artefatos não encontrados. Execute o pipeline de scripts de 'src/' primeiro.")
+        return None
+
+
+@st.cache_resource(max_entries=8)
+@timed('app.medias_grupo')
+def _group_means(version, key):
+    # Lê só as duas colunas necessárias do parquet, sem carregar o dataset inteiro
+    return analytics.group_means(read_dataset(columns=[key, 'pct_sim_historico']), key)
+
+
+def load_group_means(key):
+    """Média de `pct_sim_historico` por `key` (ex: 'partido'), calculada uma vez por versão do dataset."""
+    return _group_means(content_version(DATASET_PATH), key)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+@timed('app.ler_selecao')
+def _read_selection(version, voting_id=None, deputy_id=None):
+    data = read_dataset(voting_ids=None if voting_id is None else [voting_id],
+                        deputy_ids=None if deputy_id is None else [deputy_id])
+    data['dataRegistroVoto'] = pd.to_datetime(data['dataRegistroVoto'], errors='coerce')
+    return data
+
+
+def load_voting_rows(voting_id):
+    """
+    As linhas de uma votação lidas direto do parquet (só os row groups que a contêm), para
+    páginas que não precisam do dataset inteiro. Cada chamada devolve uma cópia própria.
+    """
+    try:
+        return _read_selection(content_version(DATASET_PATH), voting_id=voting_id)
+    except FileNotFoundError:
+        st.error("Artefatos não encontrados. Execute o pipeline de scripts de 'src/' primeiro.")
+        return None
+
+
+def load_deputy_rows(deputy_id):
+    """As linhas de um deputado lidas direto do parquet (ver `load_voting_rows`)."""
+    try:
+        return _read_selection(content_version(DATASET_PATH), deputy_id=deputy_id)
+    except FileNotFoundError:
+        st.error("Artefatos não encontrados. Execute o pipeline de scripts de 'src/' primeiro.")
+        return None
+
+
+@st.cache_resource(max_entries=2)
+@timed('app.carregar_agregados')
+def _read_aggregates(table_versions, version):
+    tables = build_aggregates.load_aggregates()
+    if tables is None:
+        # Sem a etapa do pipeline, calcula as mesmas tabelas uma vez por processo a partir do dataset
+        tables = build_aggregates.build_aggregates(_read_dataset(version))
+    return tables
+
+
+def load_aggregates():
+    """
+    As tabelas agregadas materializadas pelo pipeline (`build_aggregates.py`): `votings_summary`,
+    `bloc_counts`, `deputies_summary`, `party_rates` e `uf_rates`. Os arquivos são relidos quando
+    o pipeline os atualiza.
+
+    Returns:
+        dict: Nome da tabela -> DataFrame, ou None se os dados não estiverem disponíveis.
+    """
+    table_versions = tuple(content_version(os.path.join(build_aggregates.AGGREGATES_DIR, f"{name}.parquet"))
+                           for name in build_aggregates.TABLES)
+    # O dataset só entra na chave quando as tabelas não existem e são calculadas a partir dele
+    version = dataset_version() if None in table_versions else None
+    try:
+        return _read_aggregates(table_versions, version)
+    except FileNotFoundError:
+        st.error("Artefatos não encontrados. Execute o pipeline de scripts de 'src/' primeiro.")
+        return None
+
+
+@st.cache_resource(max_entries=2)
+@timed('app.carregar_previsoes')
+def _read_prediction_store(model_version, predictions_version):
+    try:
+        predictions = pd.read_parquet(PREDICTIONS_PATH,
+                                      columns=['id_votacao', 'id_deputado', 'voto_previsto', 'prob_sim',
+                                               'model_version'])
+    except FileNotFoundError:
+        return None
+    if predictions.empty or predictions['model_version'].iloc[0] != model_version:
+        return None
+    return predictions.drop(columns='model_version').set_index(['id_votacao', 'id_deputado']).sort_index()
+
+
+def load_prediction_store(bundle):
+    """
+    As previsões pré-calculadas pelo pipeline (`build_prediction_store.py`), indexadas por
+    (id_votacao, id_deputado), se existirem e tiverem sido geradas pela versão do modelo em uso.
+    """
+    if bundle is None:
+        return None
+    return _read_prediction_store(bundle.version, content_version(PREDICTIONS_PATH))
+
+
+def lookup_predictions(store, rows):
+    """
+    Busca em `store` (`load_prediction_store`) as previsões armazenadas para as linhas
+    (deputado x votação); None se alguma estiver ausente.
+    """
+    if store is None:
+        return None
+    keys = pd.MultiIndex.from_arrays([rows['id_votacao'].astype(str), rows['id_deputado']])
+    stored = store.reindex(keys)
+    if stored['voto_previsto'].isna().any():
+        return None
+    return stored
+
+
+@st.cache_resource
+@timed('app.carregar_modelo')
+def _load_bundle(version):
+    """Um único ModelBundle por versão e por processo, compartilhado entre páginas e sessões."""
+    return registry.ModelBundle(version)
+
+
+def load_model_bundle(version=None):
+    """
+    Retorna o bundle do modelo a usar nesta execução da página.
+
+    A versão é resolvida a cada rerun: a informada, a fixada na URL (`?modelo=<versão>`),
+    a fixada via `PLENARIO_MODEL_VERSION` ou a apontada por `models/registry/CURRENT`.
+    Assim, publicar um modelo novo (ou rodar `registry use`) troca a versão sem reiniciar o app.
+
+    Returns:
+        ModelBundle: O bundle, ou None se nenhum modelo foi publicado.
+    """
+    resolved = registry.resolve_version(version or st.query_params.get('modelo'))
+    if resolved is None:
+        st.error("Nenhum modelo publicado em 'models/registry'. Execute 'src/modeling/train_model.py' primeiro.")
+        return None
+    try:
+        return _load_bundle(resolved)
+    except FileNotFoundError:
+        st.error(f"Versão do modelo '{resolved}' não encontrada no registro.")
+        return None
+
+
+def model_version_selector():
+    """Seletor na sidebar para fixar uma versão do modelo nesta sessão (via `?modelo=` na URL)."""
+    versions = registry.list_versions()
+    if not versions:
+        return
+    current = registry.current_version()
+    options = ['Atual'] + versions[::-1]
+    pinned = st.query_params.get('modelo')
+    selected = st.sidebar.selectbox(
+        "Versão do Modelo:",
+        options=options,
+        index=options.index(pinned) if pinned in options else 0,
+        format_func=lambda v: f"Atual ({current})" if v == 'Atual' else v,
+    )
+    if selected == 'Atual':
+        st.query_params.pop('modelo', None)
+    else:
+        st.query_params['modelo'] = selected
+
+
+@st.cache_resource(max_entries=2)
+@timed('app.carregar_shap')
+def _load_explanation_service(version, data_version):
+    # As contribuições guardadas valem para as features do dataset da versão; um dataset novo recomeça o cache
+    from src.modeling.explain import ExplanationService
+    return ExplanationService(_load_bundle(version))
+
+
+def load_explanation_service(bundle):
+    """Serviço de explicações SHAP do bundle em uso, com um cache compartilhado por todas as sessões."""
+    return _load_explanation_service(bundle.version, dataset_version())
+
+
+# Sem spinner: também é chamado no callback do botão do cenário, que roda dentro de um fragmento
+@st.cache_resource(max_entries=2, show_spinner=False)
+@timed('app.carregar_indice_ementas')
+def _read_ementa_index(version):
+    # Importado só quando usado: o índice traz o scipy e o scikit-learn
+    from src.modeling.ementa_index import EmentaIndex
+    return EmentaIndex.load()
+
+
+def load_ementa_index():
+    """O índice de similaridade das ementas passadas (`ementa_index.py`), ou None se ainda não foi construído."""
+    version = content_version(EMENTA_INDEX_IDS_PATH)
+    if version is None:
+        return None
+    return _read_ementa_index(version)
+
+
+def plotly_chart(fig, **kwargs):
+    """`st.plotly_chart` instrumentado (serialização da figura para o navegador) para a página de Desempenho."""
+    with timed('app.plotly_chart'):
+        st.plotly_chart(fig, **kwargs)
+
+
+def render_approval(prob_sim, title):
+    """
+    Bloco de probabilidade de aprovação de uma votação: chance de cada maioria, faixa de 90% dos
+    votos 'SIM' e a distribuição do total de votos 'SIM' (`approval_summary`).
+
+    Args:
+        prob_sim (np.ndarray): P(Sim) de cada deputado do plenário.
+        title (str): Título da seção.
+    """
+    import plotly.express as px
+
+    st.subheader(title)
+    approval = approval_summary(prob_sim)
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Maioria Simples", f"{approval['prob_maioria_simples']:.1%}")
+    c2.metric(f"Maioria Absoluta ({ABSOLUTE_MAJORITY})", f"{approval['prob_maioria_absoluta']:.1%}")
+    c3.metric(f"Maioria Constitucional ({CONSTITUTIONAL_MAJORITY})", f"{approval['prob_maioria_constitucional']:.1%}")
+    lower, upper = approval['intervalo_inferior'], approval['intervalo_superior']
+    st.caption(f"Votos 'SIM' esperados: {approval['votos_sim_esperados']:.0f} "
+               f"(faixa de 90% de confiança: {lower} a {upper}), considerando a incerteza de cada deputado.")
+    distribution = approval['distribuicao']
+    fig = px.bar(x=np.arange(len(distribution)), y=distribution,
+                 title="Distribuição de Probabilidade do Total de Votos 'SIM'",
+                 labels={'x': "Votos 'SIM'", 'y': 'Probabilidade'})
+    fig.add_vrect(x0=lower, x1=upper, fillcolor='blue', opacity=0.1, line_width=0)
+    fig.add_vline(x=ABSOLUTE_MAJORITY, line_dash='dash', line_color='orange', annotation_text='Absoluta')
+    fig.add_vline(x=CONSTITUTIONAL_MAJORITY, line_dash='dash', line_color='red', annotation_text='Constitucional')
+    fig.update_xaxes(range=[max(0, lower - 60), min(len(distribution), upper + 60)])
+    plotly_chart(fig, use_container_width=True)
+
+
+# Linhas por página das tabelas grandes (`paginated_dataframe`)
+PAGE_SIZE = 50
+
+
+def paginated_dataframe(table, key, labels, search_columns=(), default_sort=None, default_ascending=True,
+                        column_config=None, page_size=PAGE_SIZE):
+    """
+    Mostra `table` com busca, ordenação e paginação feitas no servidor: só as linhas da página
+    visível são formatadas e enviadas ao navegador, e as colunas numéricas seguem numéricas até a
+    exibição (formatadas pelo `column_config`).
+
+    Args:
+        table (pd.DataFrame): A tabela completa.
+        key (str): Prefixo das chaves dos widgets (único por tabela na página).
+        labels (dict): Coluna -> rótulo exibido; só essas colunas aparecem, nessa ordem.
+        search_columns (tuple): Colunas de texto usadas pela busca.
+        default_sort (str, opcional): Coluna da ordenação inicial.
+        column_config (dict, opcional): `column_config` do `st.dataframe`, pelos rótulos exibidos.
+    """
+    col_search, col_sort, col_order, col_page = st.columns([3, 2, 1, 1])
+    search = col_search.text_input("Buscar:", key=f"{key}_busca",
+                                   placeholder=", ".join(labels[c] for c in search_columns)) if search_columns else ''
+    sort_options = list(labels)
+    sort_by = col_sort.selectbox("Ordenar por:", sort_options, format_func=labels.get, key=f"{key}_ordem",
+                                 index=sort_options.index(default_sort) if default_sort in sort_options else 0)
+    ascending = col_order.selectbox("Ordem:", [True, False], index=0 if default_ascending else 1,
+                                    format_func=lambda asc: "Crescente" if asc else "Decrescente",
+                                    key=f"{key}_crescente")
+
+    rows = analytics.search_rows(table, search, search_columns)
+    n_pages = max(1, -(-len(rows) // page_size))
+    # Uma busca ou ordenação nova volta para a primeira página; a página também é limitada ao total
+    page_key, query = f"{key}_pagina", (search, sort_by, ascending)
+    if st.session_state.get(f"{key}_consulta") != query:
+        st.session_state[f"{key}_consulta"] = query
+        st.session_state[page_key] = 1
+    st.session_state[page_key] = min(max(st.session_state.get(page_key, 1), 1), n_pages)
+    page = col_page.number_input(f"Página (de {n_pages}):", min_value=1, max_value=n_pages, step=1, key=page_key)
+
+    visible = analytics.page_rows(rows, page, page_size, sort_by, ascending)
+    st.dataframe(visible[list(labels)].rename(columns=labels), use_container_width=True, hide_index=True,
+                 column_config=column_config)
+    if rows.empty:
+        st.caption("Nenhuma linha encontrada para a busca.")
+    else:
+        first = (page - 1) * page_size
+        st.caption(f"Linhas {first + 1}–{first + len(visible)} de {len(rows):,}"
+                   + (f" ({len(table):,} sem a busca)" if len(rows) != len(table) else ""))
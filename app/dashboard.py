@@ -1,34 +1,25 @@
 # app/dashboard.py
 
 import streamlit as st
-import pandas as pd
-import joblib
 import numpy as np
 
+from artifacts import load_dataset, load_dataset_index, load_model_bundle
+from src.modeling.features import build_feature_matrix
+from src.utils.timing import timed
+
 # --- Configuração da Página e Carregamento de Dados ---
 
 st.set_page_config(page_title="Plenário Preditivo", page_icon="🗳️", layout="wide")
 
 
-@st.cache_data
-def load_artifacts():
-    """Carrega todos os artefatos do modelo e os dados necessários."""
-    try:
-        model = joblib.load('models/lgbm_model.joblib')
-        encoder = joblib.load('models/label_encoder.joblib')
-        feature_columns = joblib.load('models/feature_columns.joblib')
-        data = pd.read_parquet('data/processed/modeling_dataset_enriched.parquet')
-        return model, encoder, feature_columns, data
-    except FileNotFoundError:
-        st.error("Artefatos do modelo não encontrados. Por favor, execute o pipeline de scripts de 'src/' primeiro.")
-        return None, None, None, None
-
-
-model, encoder, feature_columns, df = load_artifacts()
+bundle = load_model_bundle()
+df = load_dataset() if bundle is not None else None
+dataset_index = load_dataset_index() if df is not None else None
 
 
 # --- Funções de Lógica da Aplicação ---
 
+@timed('app.previsao_voto')
 def predict_vote(deputy_id, voting_id):
     """
     Prepara os dados para um deputado e uma votação específicos e retorna a previsão do modelo.
@@ -36,28 +27,16 @@ def predict_vote(deputy_id, voting_id):
     if df is None:
         return None, None
 
-    instance = df[(df['id_deputado'] == deputy_id) & (df['id_votacao'] == voting_id)]
+    instance = dataset_index.row(deputy_id, voting_id)
 
     if instance.empty:
         st.warning("Não foram encontrados dados para a combinação de deputado e votação selecionada.")
         return None, None
 
     # Prepara as features exatamente como no treinamento
-    X_live = pd.get_dummies(instance[['partido', 'posicao_governo', 'uf', 'escolaridade']], drop_first=True)
-    X_live['idade'] = instance['idade'].values
-    X_live['pct_sim_historico'] = instance['pct_sim_historico'].values
-    X_live['pct_sim_na_votacao'] = instance['pct_sim_na_votacao'].values
-    X_live['pct_sim_uf'] = instance['pct_sim_uf'].values
-    X_live['pct_sim_posicao_votacao'] = instance['pct_sim_posicao_votacao'].values
-
-    faixa_idade = pd.cut(instance['idade'], bins=[0, 30, 40, 50, 60, 100],
-                         labels=['18-30', '31-40', '41-50', '51-60', '60+'])
-    X_faixa = pd.get_dummies(faixa_idade, prefix='faixa_idade', drop_first=True)
-    X_live = pd.concat([X_live, X_faixa], axis=1)
+    X_live = build_feature_matrix(instance, bundle.feature_columns)
 
-    X_live = X_live.reindex(columns=feature_columns, fill_value=0)
-
-    prediction_proba = model.predict_proba(X_live)
+    prediction_proba = bundle.predictor.predict_proba(X_live)
     real_vote = instance['tipoVoto'].iloc[0]
 
     return prediction_proba[0], real_vote
@@ -72,13 +51,10 @@ st.markdown(
 if df is not None:
     st.sidebar.header("Simulador de Votação")
 
-    unique_votings = df[['id_votacao', 'proposicao_ementa']].drop_duplicates('id_votacao')
-
-
     # --- CORREÇÃO APLICADA AQUI ---
     def format_voting_option(voting_id):
         # Pega a ementa correspondente ao ID
-        ementa = unique_votings[unique_votings['id_votacao'] == voting_id]['proposicao_ementa'].iloc[0]
+        ementa = dataset_index.ementas[voting_id]
         # Se a ementa for o nosso texto padrão, mostra um formato diferente
         if 'Ementa não disponível' in ementa:
             return f"Votação {voting_id} (Ementa Indisponível)"
@@ -88,15 +64,15 @@ if df is not None:
 
     selected_voting_id = st.sidebar.selectbox(
         "Escolha uma Votação:",
-        options=unique_votings['id_votacao'],
+        options=dataset_index.voting_ids,
         format_func=format_voting_option  # Usamos nossa nova função inteligente
     )
 
-    deputies_in_voting = df[df['id_votacao'] == selected_voting_id]
+    deputies_in_voting = dataset_index.voting_rows(selected_voting_id)
     selected_deputy_id = st.sidebar.selectbox(
         "Escolha um Deputado:",
         options=deputies_in_voting.sort_values('nome_urna')['id_deputado'],
-        format_func=lambda x: deputies_in_voting[deputies_in_voting['id_deputado'] == x]['nome_urna'].iloc[0]
+        format_func=lambda x: dataset_index.deputy_names[x]
     )
 
     if st.sidebar.button("Executar Previsão", type="primary"):
@@ -104,7 +80,7 @@ if df is not None:
         probabilities, real_vote = predict_vote(selected_deputy_id, selected_voting_id)
 
         if probabilities is not None:
-            deputy_info = df[df['id_deputado'] == selected_deputy_id].iloc[0]
+            deputy_info = dataset_index.deputy_rows(selected_deputy_id).iloc[0]
 
             st.header(f"Resultado para o(a) Dep. {deputy_info['nome_urna']}")
             st.write(
@@ -112,10 +88,10 @@ if df is not None:
 
             st.subheader("Ementa da Votação Selecionada:")
             st.info(
-                f"{unique_votings[unique_votings['id_votacao'] == selected_voting_id]['proposicao_ementa'].iloc[0]}")
+                f"{dataset_index.ementas[selected_voting_id]}")
 
-            prob_nao = probabilities[encoder.transform(['Não'])[0]]
-            prob_sim = probabilities[encoder.transform(['Sim'])[0]]
+            prob_nao = probabilities[bundle.class_index('Não')]
+            prob_sim = probabilities[bundle.class_index('Sim')]
             predicted_vote = "Sim" if prob_sim > prob_nao else "Não"
 
             st.subheader("Previsão do Modelo")
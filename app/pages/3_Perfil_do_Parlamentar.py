@@ -1,57 +1,45 @@
 # app/pages/3_Perfil_do_Parlamentar.py
 
 import streamlit as st
+import numpy as np
 import pandas as pd
-import joblib
-import plotly.express as px
+
+from artifacts import (load_deputies_master, load_deputy_rows, load_explanation_service, load_group_means,
+                       load_model_bundle, load_prediction_store, lookup_predictions, plotly_chart)
+from src.modeling.explain import group_contributions
+from src.modeling.features import build_feature_matrix
+from src.utils.timing import timed
 
 # --- Configuração da Página e Carregamento de Dados ---
 st.set_page_config(page_title="Perfil do Parlamentar", page_icon="👤", layout="wide")
 
 
-@st.cache_data
-def load_artifacts():
-    """Carrega todos os artefatos do modelo e os dados necessários."""
-    try:
-        model = joblib.load('models/lgbm_model.joblib')
-        encoder = joblib.load('models/label_encoder.joblib')
-        feature_columns = joblib.load('models/feature_columns.joblib')
-        data = pd.read_parquet('data/processed/modeling_dataset_enriched.parquet')
-        deputies_master = pd.read_parquet('data/processed/deputies_master_table.parquet')
-        return model, encoder, feature_columns, data, deputies_master
-    except FileNotFoundError:
-        st.error("Artefatos não encontrados. Execute o pipeline de scripts de 'src/' primeiro.")
-        return None, None, None, None, None
+bundle = load_model_bundle()
+# Só a tabela de deputados e as linhas do deputado escolhido são lidas, não o dataset inteiro
+deputies_master_df = load_deputies_master() if bundle is not None else None
 
 
-model, encoder, feature_columns, df, deputies_master_df = load_artifacts()
+predictions_store = load_prediction_store(bundle)
 
 
 # --- Funções de Lógica ---
+@timed('app.previsao_deputado')
 def predict_votes_for_deputy(deputy_df):
     """Recebe um DataFrame com o histórico de um deputado e retorna as previsões."""
     if deputy_df.empty:
         return None
 
+    # Usa as previsões pré-calculadas quando disponíveis, sem chamar o modelo
+    stored = lookup_predictions(predictions_store, deputy_df)
+    if stored is not None:
+        deputy_df['voto_previsto'] = stored['voto_previsto'].values
+        return deputy_df
+
     # Prepara as features para todas as votações do deputado
-    X_live = pd.get_dummies(deputy_df[['partido', 'posicao_governo', 'uf', 'escolaridade']], drop_first=True)
-    X_live['idade'] = deputy_df['idade'].values
-    X_live['pct_sim_historico'] = deputy_df['pct_sim_historico'].values
-    X_live['pct_sim_na_votacao'] = deputy_df['pct_sim_na_votacao'].values
-    X_live['pct_sim_uf'] = deputy_df['pct_sim_uf'].values
-    X_live['pct_sim_posicao_votacao'] = deputy_df['pct_sim_posicao_votacao'].values
-    faixa_idade = pd.cut(deputy_df['idade'], bins=[0, 30, 40, 50, 60, 100],
-                         labels=['18-30', '41-50', '51-60', '60+', '31-40'])
-    X_faixa = pd.get_dummies(faixa_idade, prefix='faixa_idade', drop_first=True)
-    X_live = pd.concat([X_live, X_faixa], axis=1)
-
-    X_live = X_live.reindex(columns=feature_columns, fill_value=0)
-
-    # Faz a previsão
-    predictions = model.predict(X_live)
-
-    # Adiciona as previsões ao DataFrame do deputado
-    deputy_df['voto_previsto'] = encoder.inverse_transform(predictions)
+    X_live = build_feature_matrix(deputy_df, bundle.feature_columns)
+
+    # Faz a previsão e adiciona ao DataFrame do deputado
+    deputy_df['voto_previsto'] = bundle.predictor.predict(X_live)
     return deputy_df
 
 
@@ -59,21 +47,24 @@ def predict_votes_for_deputy(deputy_df):
 st.title("👤 Perfil do Parlamentar")
 st.markdown("Analise o perfil de votação, o alinhamento político e a previsibilidade de cada deputado.")
 
-if df is not None:
+if deputies_master_df is not None:
+    deputy_names = dict(zip(deputies_master_df['id_deputado'], deputies_master_df['nome_urna']))
     st.sidebar.header("Seleção de Parlamentar")
 
     selected_deputy_id = st.sidebar.selectbox(
         "Escolha um Deputado para Analisar:",
         options=deputies_master_df.sort_values('nome_urna')['id_deputado'],
-        format_func=lambda x: deputies_master_df[deputies_master_df['id_deputado'] == x]['nome_urna'].iloc[0]
+        format_func=lambda x: deputy_names[x]
     )
 
     if selected_deputy_id:
-        deputy_data = df[df['id_deputado'] == selected_deputy_id].copy()
+        deputy_data = load_deputy_rows(selected_deputy_id)
 
-        if deputy_data.empty:
+        if deputy_data is None or deputy_data.empty:
             st.warning("Nenhum histórico de votação encontrado para este parlamentar no dataset.")
         else:
+            import plotly.express as px
+
             deputy_info = deputy_data.iloc[0]
 
             st.header(f"Análise de {deputy_info['nome_urna']}")
@@ -86,9 +77,8 @@ if df is not None:
 
             st.subheader("Alinhamento Político")
             deputy_alignment = deputy_info['pct_sim_historico'] * 100
-            party_alignment = df[df['partido'] == deputy_info['partido']]['pct_sim_historico'].mean() * 100
-            bloc_alignment = df[df['posicao_governo'] == deputy_info['posicao_governo']][
-                                 'pct_sim_historico'].mean() * 100
+            party_alignment = load_group_means('partido')[deputy_info['partido']] * 100
+            bloc_alignment = load_group_means('posicao_governo')[deputy_info['posicao_governo']] * 100
             alignment_data = pd.DataFrame({
                 'Entidade': [f"Dep. {deputy_info['nome_urna']}", f"Partido ({deputy_info['partido']})",
                              f"Bloco ({deputy_info['posicao_governo']})"],
@@ -101,7 +91,7 @@ if df is not None:
                          title="Comparativo de Alinhamento (Taxa Histórica de Votos 'Sim')",
                          text=alignment_data['Taxa de Votos "Sim" (%)'].apply(lambda x: f'{x:.1f}%'))
             fig.update_layout(yaxis={'categoryorder': 'total ascending'})
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, use_container_width=True)
 
             st.subheader("Histórico de Votações Recentes e Previsibilidade")
 
@@ -112,10 +102,8 @@ if df is not None:
                 accuracy = (deputy_predictions['tipoVoto'] == deputy_predictions['voto_previsto']).mean()
                 st.metric("🎯 Previsibilidade do Deputado (Acurácia do Modelo)", f"{accuracy:.2%}")
 
-                deputy_predictions['acerto'] = deputy_predictions.apply(
-                    lambda row: '✅' if row['tipoVoto'] == row['voto_previsto'] else '❌',
-                    axis=1
-                )
+                deputy_predictions['acerto'] = np.where(
+                    deputy_predictions['tipoVoto'] == deputy_predictions['voto_previsto'], '✅', '❌')
 
                 # --- MUDANÇA APLICADA AQUI ---
                 # Adicionamos 'id_votacao' à lista de colunas e ao dicionário de renomeação
@@ -130,6 +118,23 @@ if df is not None:
                     }),
                     use_container_width=True
                 )
+
+                # --- Explicabilidade (SHAP) ---
+                st.subheader("🔬 Fatores que Influenciam as Previsões")
+                # O SHAP (e o Booster do modelo) só é carregado quando o usuário pede as explicações
+                if st.toggle("Calcular a contribuição de cada fator (SHAP)", key='perfil_shap'):
+                    explanation_service = load_explanation_service(bundle)
+                    contributions = group_contributions(explanation_service.explain_rows(deputy_data))
+                    mean_contributions = contributions.mean().sort_values()
+                    fig = px.bar(x=mean_contributions.values, y=mean_contributions.index, orientation='h',
+                                 color=mean_contributions.values > 0,
+                                 color_discrete_map={True: 'green', False: 'red'},
+                                 title="Contribuição Média de cada Fator (SHAP) nas Votações do Deputado",
+                                 labels={'x': "← favorece 'Não' | favorece 'Sim' →", 'y': 'Fator'})
+                    fig.update_layout(showlegend=False)
+                    plotly_chart(fig, use_container_width=True)
+                    st.caption("Valores em log-odds: quanto cada fator empurra, em média, a previsão para 'Sim' ou "
+                               "'Não'.")
             else:
                 st.error("Não foi possível gerar as previsões para este deputado.")
 else:
@@ -0,0 +1,77 @@
+# app/pages/4_Desempenho.py
+
+import glob
+import json
+import os
+
+import streamlit as st
+import pandas as pd
+
+import artifacts  # noqa: F401  (coloca a raiz do projeto no sys.path)
+from src.utils import timing
+
+# --- Configuração da Página ---
+st.set_page_config(page_title="Desempenho", page_icon="⏱️", layout="wide")
+
+APP_EXPORT_PREFIX = os.path.join(timing.TIMING_DIR, 'app')
+COLUMNS = {'chamadas': 'Chamadas', 'total_s': 'Total (s)', 'p50_ms': 'p50 (ms)', 'p95_ms': 'p95 (ms)',
+           'max_ms': 'Máx. (ms)', 'memoria_p50_mb': 'Δ Memória p50 (MB)', 'memoria_max_mb': 'Δ Memória máx. (MB)'}
+
+
+def summary_table(summary):
+    """O resumo de `timing.snapshot()` como tabela, um trecho por linha."""
+    table = pd.DataFrame.from_dict(summary, orient='index')
+    return table.rename(columns=COLUMNS).rename_axis('Trecho')
+
+
+# --- Interface do Usuário (UI) ---
+st.title("⏱️ Desempenho")
+st.markdown(
+    "Tempos (p50/p95 sobre as últimas {} chamadas) e variação de memória dos carregamentos, previsões, "
+    "agregações e gráficos instrumentados, medidos neste processo do servidor.".format(timing.WINDOW))
+
+enabled = st.toggle("Instrumentação ativa", value=timing.is_enabled(),
+                    help="Vale para o processo inteiro (todas as sessões). Desativada, o custo é só a checagem de "
+                         "uma flag por chamada. Também pode ser ligada no início com PLENARIO_TIMING=1.")
+if enabled != timing.is_enabled():
+    timing.enable(enabled)
+
+summary = timing.snapshot()
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    if st.button("Zerar medições", use_container_width=True):
+        timing.reset()
+        st.rerun()
+with col2:
+    st.download_button("Baixar JSON", data=json.dumps(summary, ensure_ascii=False, indent=2),
+                       file_name='desempenho_app.json', mime='application/json', use_container_width=True)
+with col3:
+    st.download_button("Baixar Prometheus", data=timing.prometheus_text(summary),
+                       file_name='desempenho_app.prom', mime='text/plain', use_container_width=True)
+
+if not summary:
+    st.info("Nenhuma medição ainda. Ative a instrumentação e navegue pelas outras páginas do app.")
+else:
+    table = summary_table(summary)
+    st.dataframe(table, use_container_width=True)
+    st.subheader("Trechos mais lentos (p95)")
+    st.bar_chart(table['p95 (ms)'].sort_values(ascending=False).head(15))
+
+    if st.button("Exportar para o disco"):
+        timing.export(APP_EXPORT_PREFIX)
+        st.success(f"Medições gravadas em '{APP_EXPORT_PREFIX}.json' e '{APP_EXPORT_PREFIX}.prom'.")
+
+# --- Medições exportadas pelos scripts do pipeline (`PLENARIO_TIMING=1 python -m src...`) ---
+st.divider()
+st.subheader("Scripts do Pipeline")
+exports = sorted(glob.glob(os.path.join(timing.TIMING_DIR, '*.json')))
+if not exports:
+    st.info(f"Nenhuma exportação em '{timing.TIMING_DIR}'. Execute um script do pipeline com PLENARIO_TIMING=1.")
+else:
+    selected = st.selectbox("Exportação:", options=exports, format_func=lambda p: os.path.basename(p)[:-len('.json')])
+    with open(selected, encoding='utf-8') as f:
+        exported = json.load(f)
+    st.caption(f"Exportado em {exported['exportado_em']} (processo {exported['processo']}).")
+    if exported['trechos']:
+        st.dataframe(summary_table(exported['trechos']), use_container_width=True)
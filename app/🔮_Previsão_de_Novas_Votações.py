@@ -1,87 +1,162 @@
 # app/pages/🔮_Previsão_de_Novas_Votações.py
 
 import streamlit as st
-import pandas as pd
-import joblib
-import plotly.express as px
+import time
+
+from artifacts import (dataset_version, deputies_version, load_dataset, load_dataset_index, load_deputies_master,
+                       load_ementa_index, load_model_bundle, plotly_chart, render_approval)
+from src.modeling.approval import ABSOLUTE_MAJORITY
+from src.modeling.features import BLOCOS, define_posicao
+from src.modeling.scenario import NEUTRAL_COHESION, ScenarioEngine, apply_priors
+from src.utils.timing import timed
 
 # --- Configuração da Página e Carregamento de Dados ---
 st.set_page_config(page_title="Previsão de Novas Votações", page_icon="🔮", layout="wide")
 
 
-@st.cache_data
-def load_artifacts():
-    try:
-        model = joblib.load('models/lgbm_model.joblib')
-        encoder = joblib.load('models/label_encoder.joblib')
-        feature_columns = joblib.load('models/feature_columns.joblib')
-        # Carregamos o dataset completo para ter o histórico
-        data = pd.read_parquet('data/processed/modeling_dataset_enriched.parquet')
-        deputies_master = pd.read_parquet('data/processed/deputies_master_table.parquet')
-        return model, encoder, feature_columns, data, deputies_master
-    except FileNotFoundError:
-        st.error("Artefatos não encontrados. Execute o pipeline de scripts de 'src/' primeiro.")
-        return None, None, None, None, None
-
-
-model, encoder, feature_columns, df, deputies_master_df = load_artifacts()
+bundle = load_model_bundle()
+df = load_dataset() if bundle is not None else None
+deputies_master_df = load_deputies_master() if df is not None else None
+dataset_index = load_dataset_index() if df is not None else None
 
 
 # --- Funções de Lógica ---
-def predict_future_vote(ementa_text):
-    """Prevê o voto para todos os deputados com base em uma nova ementa."""
+@st.cache_resource(max_entries=2)
+def _build_scenario_engine(model_version, data_version, deputies_master_version, _bundle, _deputies_master, _data):
+    return ScenarioEngine(_bundle, _deputies_master, _data)
+
+
+def load_scenario_engine():
+    """Monta a parte fixa (por deputado) da matriz de features uma vez por versão do modelo e dos dados."""
+    return _build_scenario_engine(bundle.version, dataset_version(), deputies_version(), bundle, deputies_master_df,
+                                  df)
+
+
+def seed_scenario(engine):
+    """Usa as votações passadas com ementa mais parecida como ponto de partida do cenário."""
+    ementa_text = st.session_state.get('ementa', '')
+    index = load_ementa_index()
+    if not ementa_text or index is None:
+        st.session_state.pop('cenario_semelhantes', None)
+        return
+    similar = index.search(ementa_text)
+    priors = engine.similar_voting_priors(similar)
+    similar['proposicao_ementa'] = similar['id_votacao'].map(dataset_index.ementas)
+    st.session_state['cenario_semelhantes'] = {'ementa': ementa_text, 'priors': priors, 'votacoes': similar}
+    for bloco in BLOCOS:
+        st.session_state[f"coesao_{bloco}"] = round(priors[1].get(bloco, NEUTRAL_COHESION), 2)
+
+
+@timed('app.previsao_pauta')
+def predict_future_vote(ementa_text, party_cohesion=None, bloc_cohesion=None, priors=None):
+    """Prevê o voto para todos os deputados com base em uma nova ementa e no cenário de coesão."""
     if df is None: return None
-
-    # Prepara um DataFrame para todos os 513 deputados
-    prediction_df = deputies_master_df.copy()
-
-    # Adiciona as features de histórico que já calculamos
-    historical_features = df[['id_deputado', 'pct_sim_historico', 'pct_sim_uf']].drop_duplicates()
-    prediction_df = pd.merge(prediction_df, historical_features, on='id_deputado', how='left')
-
-    # --- A LÓGICA CENTRAL ---
-    # Para features de votação desconhecidas, usamos um valor neutro (0.5)
-    prediction_df['pct_sim_na_votacao'] = 0.5
-    prediction_df['pct_sim_posicao_votacao'] = 0.5
-
-    # Preenche deputados novos (sem histórico) com o mesmo valor neutro
-    prediction_df.fillna(0.5, inplace=True)
-
-    # Cria a feature 'posicao_governo'
-    PARTIDOS_GOVERNO = ['PT', 'PCdoB', 'PV', 'PSB', 'MDB', 'PSD', 'REPUBLICANOS', 'PODE', 'UNIÃO', 'PSOL', 'REDE']
-    PARTIDOS_OPOSICAO = ['PL', 'PP', 'NOVO']
-
-    def define_posicao(partido):
-        if partido in PARTIDOS_GOVERNO:
-            return 'Governo'
-        elif partido in PARTIDOS_OPOSICAO:
-            return 'Oposicao'
+    engine = load_scenario_engine()
+    return engine.predict(*apply_priors(party_cohesion, bloc_cohesion, priors))
+
+
+@st.fragment
+def scenario_section(engine, ementa_input):
+    """
+    Cenário de coesão e o placar previsto. Como fragmento, cada ajuste nos sliders reexecuta só
+    este trecho, não a página inteira (ementa e previsão em lote ficam de fora).
+    """
+    seeded = st.session_state.get('cenario_semelhantes')
+    priors = seeded['priors'] if seeded and seeded['ementa'] == ementa_input else None
+
+    # Cenário: % de 'Sim' esperado em cada bloco e, opcionalmente, em partidos específicos
+    st.subheader("Cenário de Coesão")
+    st.caption("Percentual esperado de votos 'SIM' em cada bloco. Partidos sem ajuste próprio acompanham o seu bloco.")
+    bloc_cohesion = {}
+    for column, bloco in zip(st.columns(len(BLOCOS)), BLOCOS):
+        st.session_state.setdefault(f"coesao_{bloco}", NEUTRAL_COHESION)
+        bloc_cohesion[bloco] = column.slider(bloco, 0.0, 1.0, step=0.01, key=f"coesao_{bloco}")
+
+    party_cohesion = {}
+    with st.expander("Ajustar coesão por partido"):
+        selected_parties = st.multiselect("Partidos:", options=engine.parties)
+        for party in selected_parties:
+            party_cohesion[party] = st.slider(party, 0.0, 1.0, bloc_cohesion[define_posicao(party)], 0.01,
+                                              key=f"coesao_partido_{party}")
+
+    if st.button("Prever Placar Futuro", type="primary", on_click=seed_scenario, args=(engine,)):
+        if not ementa_input:
+            st.warning("Por favor, insira o texto da ementa para realizar a previsão.")
         else:
-            return 'Independente'
-
-    prediction_df['posicao_governo'] = prediction_df['partido'].apply(define_posicao)
-
-    # Prepara o DataFrame de features (X) para o modelo
-    X_live = pd.get_dummies(prediction_df[['partido', 'posicao_governo', 'uf', 'escolaridade']], drop_first=True)
-    X_live['idade'] = prediction_df['idade'].values
-    X_live['pct_sim_historico'] = prediction_df['pct_sim_historico'].values
-    X_live['pct_sim_na_votacao'] = prediction_df['pct_sim_na_votacao'].values
-    X_live['pct_sim_uf'] = prediction_df['pct_sim_uf'].values
-    X_live['pct_sim_posicao_votacao'] = prediction_df['pct_sim_posicao_votacao'].values
-    faixa_idade = pd.cut(prediction_df['idade'], bins=[0, 30, 40, 50, 60, 100],
-                         labels=['18-30', '41-50', '51-60', '60+', '31-40'])
-    X_faixa = pd.get_dummies(faixa_idade, prefix='faixa_idade', drop_first=True)
-    X_live = pd.concat([X_live, X_faixa], axis=1)
-
-    X_live = X_live.reindex(columns=feature_columns, fill_value=0)
-
-    # Faz a previsão para todos os deputados de uma vez
-    predictions = model.predict(X_live)
-
-    # Decodifica as previsões de volta para 'Sim' e 'Não'
-    prediction_df['voto_previsto'] = encoder.inverse_transform(predictions)
-
-    return prediction_df
+            st.session_state['cenario_ativo'] = True
+
+    # Depois da primeira previsão, cada ajuste nos sliders recalcula apenas as colunas do cenário
+    if st.session_state.get('cenario_ativo') and ementa_input:
+        start_time = time.perf_counter()
+        prediction_results = predict_future_vote(ementa_input, party_cohesion, bloc_cohesion, priors)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+        if prediction_results is not None:
+            import plotly.express as px
+
+            st.header(f"Previsão de Placar para a Nova Pauta")
+            if load_ementa_index() is None:
+                st.caption("Índice de ementas não encontrado (execute `python -m src.modeling.ementa_index`); "
+                           "o cenário parte da coesão neutra.")
+
+            if priors is not None:
+                with st.expander("🔎 Votações Passadas com Ementa Semelhante"):
+                    st.caption("As coesões observadas nessas votações, ponderadas pela similaridade, "
+                               "são o ponto de partida do cenário.")
+                    st.dataframe(seeded['votacoes'], use_container_width=True, hide_index=True, column_config={
+                        'similaridade': st.column_config.ProgressColumn(min_value=0.0, max_value=1.0)})
+
+            # Placar Geral
+            placar = prediction_results['voto_previsto'].value_counts()
+            votos_sim = placar.get('Sim', 0)
+            votos_nao = placar.get('Não', 0)
+            resultado = "Aprovação Provável" if votos_sim >= ABSOLUTE_MAJORITY else "Rejeição Provável"
+            st.subheader("Resultado Geral Previsto")
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Votos 'SIM' Previstos", f"{votos_sim}")
+            col2.metric("Votos 'NÃO' Previstos", f"{votos_nao}")
+            col3.metric("Resultado Provável", resultado)
+
+            render_approval(prediction_results['prob_sim'].values, "Chance de Aprovação")
+
+            # Gráfico de Bancadas
+            st.subheader("Previsão por Bloco Político")
+            bancada_votes = prediction_results.groupby('posicao_governo')['voto_previsto'].value_counts().unstack(
+                fill_value=0)
+            for col in ['Sim', 'Não']:
+                if col not in bancada_votes.columns: bancada_votes[col] = 0
+            fig = px.bar(bancada_votes, x=bancada_votes.index, y=['Sim', 'Não'],
+                         title="Distribuição dos Votos Previstos por Bancada",
+                         labels={'x': 'Bloco Político', 'value': 'Número de Votos'},
+                         barmode='group', color_discrete_map={'Sim': 'green', 'Não': 'red'})
+            plotly_chart(fig, use_container_width=True)
+
+            # Mapa de Votos
+            st.subheader("Mapa de Votos Previstos")
+            st.dataframe(prediction_results[['nome_urna', 'partido', 'uf', 'posicao_governo', 'voto_previsto']],
+                         use_container_width=True)
+
+            st.caption(f"Cenário calculado em {elapsed_ms:.0f} ms.")
+
+            # Sensibilidade do resultado à coesão dos dois principais blocos: são 25 cenários, então a
+            # grade só é calculada quando pedida e fica guardada enquanto o cenário não mudar
+            with st.expander("📊 Tabela de Sensibilidade"):
+                levels = [0.0, 0.25, 0.5, 0.75, 1.0]
+                st.caption(f"Probabilidade de aprovação por maioria absoluta ({ABSOLUTE_MAJORITY} votos) variando a "
+                           "coesão do Governo e da Oposição; os demais ajustes do cenário são mantidos.")
+                scenario_key = (bundle.version, ementa_input, tuple(sorted(bloc_cohesion.items())),
+                                tuple(sorted(party_cohesion.items())))
+                stored = st.session_state.get('sensibilidade')
+                if st.button("Calcular tabela de sensibilidade"):
+                    sensitivity = engine.sensitivity_table('Governo', 'Oposição', levels, bloc_cohesion,
+                                                          party_cohesion, priors)
+                    sensitivity.index = [f"Governo {level:.0%}" for level in levels]
+                    sensitivity.columns = [f"Oposição {level:.0%}" for level in levels]
+                    stored = st.session_state['sensibilidade'] = (scenario_key, sensitivity)
+                if stored is not None and stored[0] == scenario_key:
+                    st.dataframe(stored[1].style.format("{:.1%}"), use_container_width=True)
+                else:
+                    st.caption("Calcule a tabela para o cenário atual.")
 
 
 # --- Interface do Usuário (UI) ---
@@ -91,50 +166,42 @@ st.markdown(
 
 if df is not None:
     st.info(
-        "**Como funciona:** Cole o texto da ementa de um novo projeto de lei. O modelo usará o perfil de cada deputado e o conteúdo da ementa para prever a tendência de voto, assumindo um cenário de coesão partidária neutra.")
+        "**Como funciona:** Cole o texto da ementa de um novo projeto de lei. O cenário de coesão parte das votações passadas com ementa mais parecida, e o modelo usa o perfil de cada deputado para prever a tendência de voto. Ajuste o cenário nos controles abaixo (50% = coesão partidária neutra).")
 
     ementa_input = st.text_area(
         "Cole aqui a Ementa da Proposição:",
         height=200,
-        placeholder="Ex: Dispõe sobre a regulamentação da inteligência artificial no Brasil..."
+        placeholder="Ex: Dispõe sobre a regulamentação da inteligência artificial no Brasil...",
+        key='ementa'
     )
 
-    if st.button("Prever Placar Futuro", type="primary"):
-        if not ementa_input:
-            st.warning("Por favor, insira o texto da ementa para realizar a previsão.")
+    engine = load_scenario_engine()
+    scenario_section(engine, ementa_input)
+
+    # --- Previsão em Lote (pauta da semana) ---
+    st.divider()
+    st.header("Previsão em Lote da Pauta")
+    st.markdown(
+        "Envie um CSV ou parquet com uma proposição por linha (coluna `ementa`, opcionalmente `item`). "
+        "Colunas `coesao_<bloco ou partido>` (ex: `coesao_Governo`, `coesao_PT`, de 0 a 1) definem o cenário de "
+        "cada item; essas colunas ajustam o cenário que parte das votações passadas com ementa mais parecida.")
+    uploaded_pauta = st.file_uploader("Arquivo da pauta:", type=['csv', 'parquet'])
+    if uploaded_pauta is not None:
+        from src.modeling.score_pauta import read_pauta, score_pauta
+        try:
+            pauta = read_pauta(uploaded_pauta, uploaded_pauta.name)
+        except ValueError as e:
+            st.error(str(e))
         else:
-            with st.spinner('Calculando previsão com base no perfil dos 513 deputados...'):
-                prediction_results = predict_future_vote(ementa_input)
-
-            if prediction_results is not None:
-                st.header(f"Previsão de Placar para a Nova Pauta")
-
-                # Placar Geral
-                placar = prediction_results['voto_previsto'].value_counts()
-                votos_sim = placar.get('Sim', 0)
-                votos_nao = placar.get('Não', 0)
-                resultado = "Aprovação Provável" if votos_sim > 257 else "Rejeição Provável"
-                st.subheader("Resultado Geral Previsto")
-                col1, col2, col3 = st.columns(3)
-                col1.metric("Votos 'SIM' Previstos", f"{votos_sim}")
-                col2.metric("Votos 'NÃO' Previstos", f"{votos_nao}")
-                col3.metric("Resultado Provável", resultado)
-
-                # Gráfico de Bancadas
-                st.subheader("Previsão por Bloco Político")
-                bancada_votes = prediction_results.groupby('posicao_governo')['voto_previsto'].value_counts().unstack(
-                    fill_value=0)
-                for col in ['Sim', 'Não']:
-                    if col not in bancada_votes.columns: bancada_votes[col] = 0
-                fig = px.bar(bancada_votes, x=bancada_votes.index, y=['Sim', 'Não'],
-                             title="Distribuição dos Votos Previstos por Bancada",
-                             labels={'x': 'Bloco Político', 'value': 'Número de Votos'},
-                             barmode='group', color_discrete_map={'Sim': 'green', 'Não': 'red'})
-                st.plotly_chart(fig, use_container_width=True)
-
-                # Mapa de Votos
-                st.subheader("Mapa de Votos Previstos")
-                st.dataframe(prediction_results[['nome_urna', 'partido', 'uf', 'posicao_governo', 'voto_previsto']],
-                             use_container_width=True)
+            with st.spinner(f"Calculando {len(pauta)} itens x {len(engine.deputies)} deputados..."):
+                placar_pauta, deputados_pauta = score_pauta(engine, pauta, load_ementa_index())
+            st.dataframe(placar_pauta, use_container_width=True, column_config={
+                column: st.column_config.NumberColumn(format="percent")
+                for column in ('prob_maioria_simples', 'prob_maioria_absoluta', 'prob_maioria_constitucional')})
+            col1, col2 = st.columns(2)
+            col1.download_button("Baixar placar por item (parquet)", placar_pauta.to_parquet(index=False),
+                                 file_name='pauta_placar.parquet')
+            col2.download_button("Baixar previsões por deputado (parquet)", deputados_pauta.to_parquet(index=False),
+                                 file_name='pauta_deputados.parquet')
 else:
     st.info("Aguardando o carregamento dos artefatos do modelo...")
\ No newline at end of file
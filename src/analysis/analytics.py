@@ -0,0 +1,131 @@
+# src/analysis/analytics.py
+
+import numpy as np
+import pandas as pd
+
+from src.utils.timing import timed
+
+MISSING_EMENTA = 'Ementa não disponível'
+
+
+@timed('analytics.deputies_overview')
+def deputies_overview(deputies_summary, party=None, position=None):
+    """
+    Resumo por deputado (aba "Deputados") a partir das contagens deputado x partido x bloco.
+
+    Args:
+        deputies_summary (pd.DataFrame): Tabela `deputies_summary` de `build_aggregates`.
+        party (str, opcional): Mantém só as contagens desse partido.
+        position (str, opcional): Mantém só as contagens desse bloco.
+
+    Returns:
+        tuple[pd.DataFrame, pd.Series]: Uma linha por deputado com `votacoes` e `taxa_sim`
+        (ordenada por `votacoes`) e o total de votos por partido.
+    """
+    filtered = deputies_summary
+    if party is not None:
+        filtered = filtered[filtered['partido'] == party]
+    if position is not None:
+        filtered = filtered[filtered['posicao_governo'] == position]
+
+    summary = filtered.groupby('id_deputado').agg(
+        nome_urna=('nome_urna', 'first'),
+        partido=('partido', 'first'),
+        uf=('uf', 'first'),
+        idade=('idade', 'first'),
+        votacoes=('total_votos', 'sum'),
+        votos_sim=('votos_sim', 'sum'),
+    ).reset_index()
+    summary['taxa_sim'] = summary.pop('votos_sim') / summary['votacoes'] * 100
+
+    party_totals = filtered.groupby('partido')['total_votos'].sum().sort_values(ascending=False)
+    return summary.sort_values('votacoes', ascending=False), party_totals
+
+
+@timed('analytics.votings_overview')
+def votings_overview(votings_summary):
+    """Uma linha por votação (aba "Votações") com `ementa`, votos e `taxa_aprovacao` (%)."""
+    overview = votings_summary.sort_values('id_votacao')[['id_votacao', 'proposicao_ementa', 'votos_sim', 'total_votos']]
+    overview.columns = ['id_votacao', 'ementa', 'votos_sim', 'total_votos']
+    overview['taxa_aprovacao'] = (overview['votos_sim'] / overview['total_votos'] * 100).round(1)
+    return overview
+
+
+@timed('analytics.voting_outcomes')
+def voting_outcomes(votings_summary):
+    """Quantidade de votações aprovadas e rejeitadas (mais 'Sim' que 'Não' = aprovada)."""
+    return pd.Series(np.where(votings_summary['votos_sim'] > votings_summary['votos_nao'],
+                              'Aprovada', 'Rejeitada')).value_counts()
+
+
+@timed('analytics.bloc_vote_totals')
+def bloc_vote_totals(bloc_counts):
+    """Total de votos 'Sim' e 'Não' de cada bloco em todas as votações."""
+    return bloc_counts.groupby('posicao_governo')[['votos_sim', 'votos_nao']].sum()
+
+
+@timed('analytics.approval_forecast')
+def approval_forecast(votings_summary, bloc_counts, bloc=None):
+    """
+    Tabela da aba "Previsões": taxa de 'Sim', resultado previsto e confiança por votação.
+
+    Args:
+        votings_summary (pd.DataFrame): Tabela `votings_summary` de `build_aggregates`.
+        bloc_counts (pd.DataFrame): Tabela `bloc_counts` (votação x bloco).
+        bloc (str, opcional): Considera apenas os votos desse bloco.
+
+    Returns:
+        pd.DataFrame: Uma linha por votação com `id_votacao`, `ementa`, `data`, `taxa_sim` e
+        `confianca` (%), `previsao` e `total_votos`. As colunas continuam numéricas/datas: a
+        formatação fica para a exibição, só das linhas visíveis.
+    """
+    if bloc is not None:
+        bloc_counts = bloc_counts[bloc_counts['posicao_governo'] == bloc]
+        votings_summary = votings_summary.drop(columns=['votos_sim', 'votos_nao', 'total_votos']).merge(
+            bloc_counts[['id_votacao', 'votos_sim', 'total_votos']], on='id_votacao')
+
+    approval_rate = votings_summary['votos_sim'] / votings_summary['total_votos']
+    voting_label = votings_summary['id_votacao'].astype(str)
+    ementa = votings_summary['proposicao_ementa']
+    missing_ementa = ementa.isna() | ementa.astype(str).str.contains(MISSING_EMENTA, regex=False)
+
+    return pd.DataFrame({
+        'id_votacao': votings_summary['id_votacao'],
+        'ementa': ementa.where(~missing_ementa, 'Votação #' + voting_label),
+        'data': pd.to_datetime(votings_summary['dataRegistroVoto'], errors='coerce'),
+        'taxa_sim': approval_rate * 100,
+        'previsao': np.where(approval_rate > 0.5, 'Aprovada', 'Rejeitada'),
+        'confianca': np.maximum(approval_rate, 1 - approval_rate) * 100,
+        'total_votos': votings_summary['total_votos'],
+    })
+
+
+@timed('analytics.search_rows')
+def search_rows(table, text, columns):
+    """As linhas de `table` em que alguma das colunas `columns` contém `text` (sem diferenciar maiúsculas)."""
+    text = (text or '').strip()
+    if not text:
+        return table
+    mask = np.zeros(len(table), dtype=bool)
+    for column in columns:
+        mask |= table[column].astype(str).str.contains(text, case=False, regex=False).to_numpy()
+    return table[mask]
+
+
+@timed('analytics.page_rows')
+def page_rows(table, page, page_size, sort_by=None, ascending=True):
+    """
+    As linhas da página `page` (a partir de 1) de `table`, ordenada por `sort_by` (valores
+    ausentes por último). Só a página sai daqui: a formatação e o envio ao navegador ficam
+    restritos às linhas visíveis.
+    """
+    start = (max(page, 1) - 1) * page_size
+    if sort_by is not None:
+        table = table.sort_values(sort_by, ascending=ascending, kind='stable', na_position='last')
+    return table.iloc[start:start + page_size]
+
+
+@timed('analytics.group_means')
+def group_means(df, key, column='pct_sim_historico'):
+    """Média de `column` por valor de `key` (ex: por partido), em uma única passada pelo dataset."""
+    return df.groupby(key, sort=False)[column].mean()
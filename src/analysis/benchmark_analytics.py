@@ -0,0 +1,69 @@
+# src/analysis/benchmark_analytics.py
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from src.analysis import analytics
+from src.analysis.benchmark_predictor import time_call
+from src.feature_engineering.build_aggregates import build_aggregates
+
+DATASET_PATH = 'data/processed/modeling_dataset_enriched.parquet'
+SCALES = [1, 2, 5, 10]
+
+
+def scale_votings(df, factor):
+    """Replica as votações `factor` vezes com novos `id_votacao` (mesmos deputados)."""
+    copies = [df.assign(id_votacao=df['id_votacao'].astype(str) + f"-{i}") for i in range(factor)]
+    return pd.concat(copies, ignore_index=True)
+
+
+def render_tabs(tables):
+    """Os cálculos das abas do Placar, como o app os executa a cada interação."""
+    analytics.deputies_overview(tables['deputies_summary'])
+    analytics.deputies_overview(tables['deputies_summary'], party=tables['party_rates']['partido'].iloc[0])
+    analytics.votings_overview(tables['votings_summary'])
+    analytics.voting_outcomes(tables['votings_summary'])
+    analytics.bloc_vote_totals(tables['bloc_counts'])
+    analytics.approval_forecast(tables['votings_summary'], tables['bloc_counts'])
+    analytics.approval_forecast(tables['votings_summary'], tables['bloc_counts'], bloc='Governo')
+
+
+def loop_forecast(df):
+    """Versão anterior da aba "Previsões": um laço por votação que filtra o dataset três vezes."""
+    rows = []
+    for voting_id in df['id_votacao'].unique():
+        voting_data = df[df['id_votacao'] == voting_id]
+        votos_sim = (df[(df['id_votacao'] == voting_id) & (df['tipoVoto'] == 'Sim')]).shape[0]
+        total = df[df['id_votacao'] == voting_id].shape[0]
+        rows.append({'id_votacao': voting_id, 'ementa': voting_data['proposicao_ementa'].iloc[0],
+                     'taxa_sim': votos_sim / total if total else 0})
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Mede o tempo dos cálculos dos dashboards à medida que o número de votações cresce.")
+    parser.add_argument('--scales', type=int, nargs='+', default=SCALES, help="Multiplicadores do nº de votações.")
+    parser.add_argument('--skip-loop', action='store_true', help="Não mede a versão anterior (laço por votação).")
+    args = parser.parse_args()
+
+    try:
+        df = pd.read_parquet(DATASET_PATH)
+    except FileNotFoundError:
+        print(f"Erro: Arquivo '{DATASET_PATH}' não encontrado. Execute o pipeline de 'src/' primeiro.")
+        exit()
+
+    print(f"{'Votações':>9} {'Linhas':>11} {'Agregação (pipeline)':>21} {'Abas (analytics)':>17} {'Laço por votação':>17}")
+    print("-" * 80)
+    for factor in args.scales:
+        scaled = scale_votings(df, factor)
+        start = time.perf_counter()
+        tables = build_aggregates(scaled)
+        aggregation = time.perf_counter() - start
+
+        render = np.median(time_call(lambda: render_tabs(tables), repeats=5))
+        loop = '-' if args.skip_loop else f"{min(time_call(lambda: loop_forecast(scaled), repeats=1)) * 1000:.0f} ms"
+        print(f"{scaled['id_votacao'].nunique():>9,} {len(scaled):>11,} {aggregation * 1000:>18.0f} ms "
+              f"{render * 1000:>14.1f} ms {loop:>17}")
@@ -0,0 +1,42 @@
+# src/analysis/benchmark_parquet_reads.py
+
+import argparse
+import numpy as np
+import pandas as pd
+
+from src.analysis.benchmark_predictor import time_call
+from src.utils.dataset_store import DATASET_PATH, read_dataset, scanned_row_groups
+
+
+def selections(df):
+    """Leituras típicas das páginas: tudo, uma votação, um deputado, um mês e poucas colunas."""
+    dates = pd.to_datetime(df['dataRegistroVoto'], errors='coerce').dropna()
+    month_start = dates.min().normalize().replace(day=1)
+    return {
+        'Dataset inteiro': {},
+        'Uma votação': {'voting_ids': [df['id_votacao'].iloc[len(df) // 2]]},
+        'Um deputado': {'deputy_ids': [int(df['id_deputado'].iloc[0])]},
+        'Um mês': {'start': month_start.strftime('%Y-%m-%d'),
+                   'end': (month_start + pd.DateOffset(months=1)).strftime('%Y-%m-%d')},
+        'Três colunas': {'columns': ['partido', 'posicao_governo', 'pct_sim_historico']},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede leituras do dataset com projeção de colunas e filtros.")
+    parser.add_argument('--repeats', type=int, default=5, help="Repetições de cada leitura (mediana).")
+    args = parser.parse_args()
+
+    try:
+        keys = read_dataset(columns=['id_votacao', 'id_deputado', 'dataRegistroVoto'])
+    except FileNotFoundError:
+        print(f"Erro: Arquivo '{DATASET_PATH}' não encontrado. Execute o pipeline de 'src/' primeiro.")
+        exit()
+
+    print(f"{'Leitura':<18} {'Linhas':>10} {'Row groups':>12} {'Bytes lidos':>13} {'Tempo':>10}")
+    print("-" * 67)
+    for name, selection in selections(keys).items():
+        rows = len(read_dataset(**selection))
+        read, total, n_bytes = scanned_row_groups(**selection)
+        elapsed = np.median(time_call(lambda: read_dataset(**selection), repeats=args.repeats))
+        print(f"{name:<18} {rows:>10,} {f'{read}/{total}':>12} {n_bytes / 1024:>10,.0f} KB {elapsed * 1000:>7.1f} ms")
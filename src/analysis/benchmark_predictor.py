@@ -0,0 +1,84 @@
+# src/analysis/benchmark_predictor.py
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+import joblib
+
+from src.modeling.predictor import FastPredictor
+
+BATCH_SIZES = [1, 513, 1_000_000]
+
+
+def make_synthetic_rows(feature_columns, n_rows, seed=42):
+    """Gera linhas sintéticas no formato da matriz de features (dummies 0/1, idade e taxas)."""
+    rng = np.random.default_rng(seed)
+    X = (rng.random((n_rows, len(feature_columns)), dtype=np.float32) < 0.1).astype(np.float32)
+    for i, column in enumerate(feature_columns):
+        if column == 'idade':
+            X[:, i] = rng.integers(25, 80, n_rows)
+        elif column.startswith('pct_sim'):
+            X[:, i] = rng.random(n_rows, dtype=np.float32)
+    return X
+
+
+def time_call(func, repeats):
+    """Executa `func` `repeats` vezes e retorna a lista de durações em segundos."""
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmark dos preditores do modelo.")
+    parser.add_argument('--threads', type=int, default=0, help="Threads do LightGBM (0 = padrão).")
+    parser.add_argument('--chunk-size', type=int, default=100_000, help="Linhas por chamada ao Booster.")
+    parser.add_argument('--skip-numpy-1m', action='store_true', help="Não mede o fallback NumPy com 1M de linhas.")
+    args = parser.parse_args()
+
+    try:
+        model = joblib.load('models/lgbm_model.joblib')
+        feature_columns = joblib.load('models/feature_columns.joblib')
+        fast = FastPredictor.from_joblib(num_threads=args.threads, chunk_size=args.chunk_size)
+        numpy_fallback = FastPredictor.from_joblib(use_numpy=True)
+    except FileNotFoundError:
+        print("Erro: Artefatos do modelo não encontrados. Execute 'train_model.py' primeiro.")
+        exit()
+
+    X_all = make_synthetic_rows(feature_columns, max(BATCH_SIZES))
+    engines = {
+        'LGBMClassifier (DataFrame)': lambda X: model.predict_proba(pd.DataFrame(X, columns=feature_columns)),
+        'FastPredictor (Booster)': fast.predict_proba,
+        'FastPredictor (NumPy)': numpy_fallback.predict_proba,
+    }
+
+    # Consistência entre os motores antes de medir
+    sample = X_all[:5000]
+    reference = engines['LGBMClassifier (DataFrame)'](sample)[:, 1]
+    for name in ('FastPredictor (Booster)', 'FastPredictor (NumPy)'):
+        diff = np.abs(engines[name](sample)[:, 1] - reference).max()
+        print(f"Diferença máxima vs LGBMClassifier - {name}: {diff:.2e}")
+
+    print("\n" + "=" * 70)
+    print("LATÊNCIA DE UMA LINHA (mediana de 200 chamadas)")
+    print("=" * 70)
+    single_row = X_all[:1]
+    for name, engine in engines.items():
+        durations = time_call(lambda: engine(single_row), repeats=200)
+        print(f"{name:<30} {np.median(durations) * 1e6:>10.1f} µs")
+
+    print("\n" + "=" * 70)
+    print("VAZÃO POR TAMANHO DE LOTE (linhas/segundo, melhor de 3)")
+    print("=" * 70)
+    for batch_size in BATCH_SIZES:
+        batch = X_all[:batch_size]
+        for name, engine in engines.items():
+            if args.skip_numpy_1m and batch_size >= 1_000_000 and 'NumPy' in name:
+                continue
+            repeats = 1 if batch_size >= 1_000_000 else 3
+            best = min(time_call(lambda: engine(batch), repeats=repeats))
+            print(f"lote={batch_size:>9,} | {name:<30} {batch_size / best:>14,.0f} linhas/s")
@@ -0,0 +1,342 @@
+# src/analysis/benchmark_sessions.py
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.benchmark_analytics import scale_votings
+from src.feature_engineering.build_aggregates import AGGREGATES_DIR, build_aggregates, save_aggregates
+from src.modeling.ementa_index import INDEX_DIR, update_index
+from src.utils.arrow_store import ARROW_DIR, export_arrow
+from src.utils.dataset_store import DATASET_PATH, DEPUTY_LAYOUT_PATH, write_dataset
+from src.utils.timing import rss_bytes
+
+APP_DIR = 'app'
+DEPUTIES_PATH = 'data/processed/deputies_master_table.parquet'
+MODELS_DIR = 'models'
+# `shared_test_runtime` substitui partes internas do Streamlit (Runtime, ScriptCache, armazenamento de
+# cache do AppTest) e foi escrito para esta versão, a mesma fixada no requirements.txt
+STREAMLIT_VERSION = '1.50.0'
+SAMPLE_EMENTAS = [
+    'Dispõe sobre a reforma tributária e altera a legislação do imposto de renda.',
+    'Altera a Lei de Diretrizes Básicas da Educação para ampliar o ensino integral.',
+    'Institui o programa nacional de segurança pública nas fronteiras.',
+    'Dispõe sobre o piso salarial da enfermagem e o financiamento do SUS.',
+]
+
+
+# --- Dataset sintético ---
+
+def synthetic_dataset(df, n_votings):
+    """O dataset com `n_votings` votações: as reais replicadas (novos `id_votacao`, mesmos deputados) e cortadas."""
+    factor = -(-n_votings // df['id_votacao'].nunique())
+    scaled = scale_votings(df, factor)
+    keep = scaled['id_votacao'].drop_duplicates().iloc[:n_votings]
+    return scaled[scaled['id_votacao'].isin(keep)].reset_index(drop=True)
+
+
+def build_workspace(workdir, n_votings, source_dir='.'):
+    """
+    Monta em `workdir` os artefatos que o app lê (mesmos caminhos relativos de `data/processed/`)
+    a partir do dataset enriquecido de `source_dir`, com `n_votings` votações. O registro de
+    modelos é um link para o de `source_dir`.
+
+    Returns:
+        pd.DataFrame: O dataset sintético.
+    """
+    df = pd.read_parquet(os.path.join(source_dir, DATASET_PATH))
+    df = synthetic_dataset(df, n_votings or df['id_votacao'].nunique())
+
+    os.makedirs(os.path.join(workdir, os.path.dirname(DATASET_PATH)), exist_ok=True)
+    write_dataset(df, os.path.join(workdir, DATASET_PATH), os.path.join(workdir, DEPUTY_LAYOUT_PATH))
+    export_arrow(df.assign(dataRegistroVoto=pd.to_datetime(df['dataRegistroVoto'], errors='coerce')),
+                 'modeling_dataset_enriched', os.path.join(workdir, ARROW_DIR))
+    save_aggregates(build_aggregates(df), os.path.join(workdir, AGGREGATES_DIR))
+    update_index(df, os.path.join(workdir, INDEX_DIR))
+    shutil.copy(os.path.join(source_dir, DEPUTIES_PATH), os.path.join(workdir, DEPUTIES_PATH))
+    if not os.path.lexists(os.path.join(workdir, MODELS_DIR)):
+        os.symlink(os.path.abspath(os.path.join(source_dir, MODELS_DIR)), os.path.join(workdir, MODELS_DIR))
+    return df
+
+
+# --- Interações de cada página ---
+# Cada interação altera um widget (ou clica um botão) e reexecuta a página, como o navegador faz.
+
+def _widget(elements, label=None, key=None):
+    for element in elements:
+        if (label is not None and element.label == label) or (key is not None and element.key == key):
+            return element
+    raise LookupError(f"widget '{label or key}' não encontrado")
+
+
+def _choose(at, label, rng, options=None):
+    """
+    Escolhe uma opção aleatória de um selectbox. Com `format_func`, o AppTest só reconhece os
+    valores originais, então as opções (ids de votação/deputado) vêm do dataset sintético.
+    """
+    selectbox = _widget(at.selectbox, label)
+    if options is None:
+        selectbox.select_index(rng.randrange(len(selectbox.options))).run()
+    else:
+        selectbox.set_value(rng.choice(options)).run()
+
+
+def _click(at, label):
+    _widget(at.button, label).click().run()
+
+
+def _choose_voting_deputy(at, rng, choices):
+    """Um deputado que votou na votação escolhida no simulador do Placar."""
+    voting_id = _widget(at.selectbox, "Escolha uma Votação:").value
+    _choose(at, "Escolha um Deputado:", rng, choices['deputados_por_votacao'][voting_id])
+
+
+def session_choices(df, deputies_master):
+    """As opções dos selectboxes com `format_func`: votações, deputados por votação e deputados em exercício."""
+    return {
+        'votacoes': df['id_votacao'].drop_duplicates().tolist(),
+        'deputados_por_votacao': df.groupby('id_votacao')['id_deputado'].agg(list).to_dict(),
+        'deputados': deputies_master['id_deputado'].tolist(),
+    }
+
+
+PAGES = {
+    'placar': ('🔮_Placar_Preditivo.py', [
+        ('escolher_votacao', lambda at, rng, c: _choose(at, "Escolha uma Votação:", rng, c['votacoes'])),
+        ('escolher_deputado', _choose_voting_deputy),
+        ('executar_previsao', lambda at, rng, c: _click(at, "🚀 Executar Previsão")),
+        ('filtrar_partido', lambda at, rng, c: _choose(at, "Filtrar por Partido:", rng)),
+    ]),
+    'historica': ('1_Analise_Historica.py', [
+        ('escolher_votacao', lambda at, rng, c: _choose(at, "Usar Padrão de Voto da Sessão:", rng, c['votacoes'])),
+        ('analisar_votacao', lambda at, rng, c: _click(at, "Analisar Votação")),
+    ]),
+    'votacao': ('pages/2_Analise_de_Votacao.py', [
+        ('escolher_votacao', lambda at, rng, c: _choose(at, "Escolha uma Votação para Analisar:", rng,
+                                                         c['votacoes'])),
+        ('analisar_votacao', lambda at, rng, c: _click(at, "Analisar Votação")),
+    ]),
+    'perfil': ('pages/3_Perfil_do_Parlamentar.py', [
+        ('escolher_deputado', lambda at, rng, c: _choose(at, "Escolha um Deputado para Analisar:", rng,
+                                                          c['deputados'])),
+    ]),
+    'previsao': ('🔮_Previsão_de_Novas_Votações.py', [
+        ('digitar_ementa', lambda at, rng, c: _widget(at.text_area, key='ementa').input(
+            rng.choice(SAMPLE_EMENTAS)).run()),
+        ('prever_placar', lambda at, rng, c: _click(at, "Prever Placar Futuro")),
+        ('ajustar_coesao', lambda at, rng, c: _widget(at.slider, key='coesao_Governo').set_value(
+            round(rng.random(), 2)).run()),
+    ]),
+}
+
+
+def run_session(page, choices, iterations, seed, timeout=120, app_dir=APP_DIR):
+    """
+    Uma sessão simulada: abre a página e repete `iterations` vezes as suas interações.
+
+    Returns:
+        tuple[list, list]: Medições (página, interação, segundos) e erros (página, interação, mensagem).
+    """
+    from streamlit.testing.v1 import AppTest
+
+    script, interactions = PAGES[page]
+    rng = random.Random(seed)
+    at = AppTest.from_file(os.path.join(app_dir, script), default_timeout=timeout)
+    steps = [('abrir', lambda at, rng, c: at.run())] + interactions * iterations
+    measurements, errors = [], []
+    for name, action in steps:
+        start = time.perf_counter()
+        try:
+            action(at, rng, choices)
+        except Exception as e:  # widget ausente ou timeout: contado no relatório, e a sessão segue
+            errors.append((page, name, f"{type(e).__name__}: {e}"))
+            continue
+        measurements.append((page, name, time.perf_counter() - start))
+        errors.extend((page, name, str(exception.value)) for exception in at.exception)
+    return measurements, errors
+
+
+def check_streamlit_version():
+    """Falha (RuntimeError) se o Streamlit instalado não for a versão para a qual o harness foi escrito."""
+    import streamlit
+    if streamlit.__version__ != STREAMLIT_VERSION:
+        raise RuntimeError(f"o harness de sessões depende de partes internas do Streamlit {STREAMLIT_VERSION}, "
+                           f"mas a versão instalada é {streamlit.__version__}. Revise `shared_test_runtime` "
+                           "e atualize STREAMLIT_VERSION.")
+
+
+@contextmanager
+def shared_test_runtime():
+    """
+    Mantém um Runtime de teste durante a carga. O AppTest instala um Runtime falso no início de
+    cada execução e o remove ao fim, o que quebra as execuções das outras sessões em andamento;
+    aqui todas as sessões usam um único Runtime e um único cache de bytecode das páginas (como as
+    sessões de um servidor Streamlit). O cache também evita compilar a mesma página em várias
+    threads ao mesmo tempo, que o `ast.parse` do Python 3.11 não suporta.
+    """
+    check_streamlit_version()
+    from unittest.mock import MagicMock
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage('/mock/media'))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    original_instance, original_exists = Runtime.__dict__['instance'], Runtime.__dict__['exists']
+    Runtime.instance = classmethod(lambda cls: cls._instance or runtime)
+    Runtime.exists = classmethod(lambda cls: True)
+
+    script_cache, compile_lock = ScriptCache(), threading.Lock()
+    original_get_bytecode = ScriptCache.get_bytecode
+
+    def get_bytecode(self, script_path):
+        with compile_lock:
+            return original_get_bytecode(script_cache, script_path)
+
+    ScriptCache.get_bytecode = get_bytecode
+    try:
+        yield runtime
+    finally:
+        Runtime.instance, Runtime.exists = original_instance, original_exists
+        ScriptCache.get_bytecode = original_get_bytecode
+
+
+class PeakRSS:
+    """Amostra o RSS do processo em uma thread enquanto a carga roda e guarda o pico."""
+
+    def __init__(self, interval=0.02):
+        self.interval = interval
+        self.peak = rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, rss_bytes())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, rss_bytes())
+        return False
+
+
+def run_load(pages, choices, sessions, iterations, timeout=120, app_dir=APP_DIR, seed=42):
+    """
+    Roda `sessions` sessões simultâneas (distribuídas entre as páginas) em threads de um mesmo
+    processo, como as sessões de um servidor Streamlit: os caches do app são compartilhados e as
+    reexecuções concorrem pelo GIL.
+
+    Returns:
+        tuple[pd.DataFrame, list, float]: Medições, erros e duração total em segundos.
+    """
+    with shared_test_runtime(), ThreadPoolExecutor(max_workers=sessions) as pool:
+        start = time.perf_counter()
+        futures = [pool.submit(run_session, pages[i % len(pages)], choices, iterations, seed + i, timeout,
+                               app_dir) for i in range(sessions)]
+        results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start
+    measurements = pd.DataFrame([m for result, _ in results for m in result],
+                                columns=['pagina', 'interacao', 'segundos'])
+    errors = [e for _, result in results for e in result]
+    return measurements, errors, elapsed
+
+
+def print_report(measurements, errors, elapsed):
+    """Percentis e número de erros de cada interação (inclusive as que só falharam)."""
+    errors = pd.DataFrame(errors, columns=['pagina', 'interacao', 'mensagem'])
+    error_counts = errors.groupby(['pagina', 'interacao']).size()
+    keys = pd.concat([measurements[['pagina', 'interacao']], errors[['pagina', 'interacao']]]).drop_duplicates()
+    print(f"{'Página':<10} {'Interação':<18} {'Execuções':>9} {'Erros':>6} {'p50 (ms)':>9} {'p95 (ms)':>9} "
+          f"{'p99 (ms)':>9} {'máx. (ms)':>10}")
+    print("-" * 87)
+    for page, interaction in keys.itertuples(index=False):
+        values = measurements.loc[(measurements['pagina'] == page) & (measurements['interacao'] == interaction),
+                                  'segundos'].to_numpy() * 1000
+        n_errors = error_counts.get((page, interaction), 0)
+        if len(values):
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            timings = f"{p50:>9.0f} {p95:>9.0f} {p99:>9.0f} {values.max():>10.0f}"
+        else:
+            timings = f"{'-':>9} {'-':>9} {'-':>9} {'-':>10}"
+        print(f"{page:<10} {interaction:<18} {len(values):>9} {n_errors:>6} {timings}")
+    print("-" * 87)
+    print(f"{len(measurements)} reexecuções em {elapsed:.1f}s ({len(measurements) / elapsed:.1f}/s), "
+          f"{len(errors)} erros")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Simula sessões simultâneas nas páginas do app (AppTest) e mede a latência das interações.")
+    parser.add_argument('--votings', type=int, help="Votações do dataset sintético (padrão: as do dataset real).")
+    parser.add_argument('--sessions', type=int, default=8, help="Sessões simultâneas.")
+    parser.add_argument('--iterations', type=int, default=3, help="Repetições das interações em cada sessão.")
+    parser.add_argument('--pages', nargs='+', choices=list(PAGES), default=list(PAGES), help="Páginas exercitadas.")
+    parser.add_argument('--timeout', type=float, default=120, help="Tempo máximo de cada reexecução, em segundos.")
+    parser.add_argument('--workdir', help="Pasta do dataset sintético (padrão: temporária, removida ao fim).")
+    args = parser.parse_args()
+
+    if not os.path.exists(DATASET_PATH):
+        print(f"Erro: Arquivo '{DATASET_PATH}' não encontrado. Execute o pipeline de 'src/' primeiro.")
+        exit()
+    try:
+        check_streamlit_version()
+    except RuntimeError as e:
+        print(f"Erro: {e}")
+        sys.exit(1)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='plenario_sessions_')
+    root = os.getcwd()
+    print(f"Montando o dataset sintético em '{workdir}'...")
+    df = build_workspace(workdir, args.votings)
+    print(f"{df['id_votacao'].nunique():,} votações, {len(df):,} linhas.\n")
+    choices = session_choices(df, pd.read_parquet(os.path.join(workdir, DEPUTIES_PATH)))
+    del df
+
+    # As páginas leem os artefatos por caminhos relativos: o app "roda" dentro da pasta sintética
+    # (`streamlit run` coloca a pasta do script no sys.path; o AppTest não)
+    app_dir = os.path.join(root, APP_DIR)
+    sys.path.insert(0, app_dir)
+    os.chdir(workdir)
+    try:
+        # Uma sessão por página antes da carga, para medir o regime com os caches do processo já aquecidos
+        _, warmup_errors, _ = run_load(args.pages, choices, len(args.pages), 1, args.timeout, app_dir)
+        baseline = rss_bytes()
+        with PeakRSS() as peak:
+            measurements, errors, elapsed = run_load(args.pages, choices, args.sessions, args.iterations,
+                                                     args.timeout, app_dir)
+    finally:
+        os.chdir(root)
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{args.sessions} sessões simultâneas x {args.iterations} repetições ({', '.join(args.pages)})\n")
+    print_report(measurements, errors, elapsed)
+    print(f"RSS: {baseline / 1024 ** 2:.0f} MB após o aquecimento, pico de {peak.peak / 1024 ** 2:.0f} MB "
+          f"durante a carga.")
+
+    # Qualquer erro (inclusive no aquecimento) invalida as medições: o script termina com código 1
+    all_errors = warmup_errors + errors
+    if all_errors:
+        messages = pd.DataFrame(all_errors, columns=['pagina', 'interacao', 'mensagem']).value_counts()
+        print(f"\nErro: {len(all_errors)} interações falharam ({len(warmup_errors)} no aquecimento):")
+        for (page, interaction, message), count in messages.head(10).items():
+            print(f"  {count}x {page}/{interaction}: {message}")
+        sys.exit(1)
@@ -0,0 +1,98 @@
+# src/analysis/benchmark_startup.py
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+
+APP_DIR = 'app'
+# Pacotes pesados que só devem ser importados quando o usuário pede algo que os usa
+HEAVY_PACKAGES = ('plotly', 'sklearn', 'lightgbm', 'joblib', 'shap', 'scipy', 'requests')
+RENDER_MARKER = '--- primeira renderizacao ---'
+
+# Executado em um processo novo (com `-X importtime`) para cada página: a renderização pelo
+# AppTest equivale à primeira sessão de um servidor recém-iniciado.
+RENDER_SCRIPT = f"""
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+sys.stderr.write({RENDER_MARKER!r} + '\\n')
+sys.stderr.flush()
+start = time.perf_counter()
+app = AppTest.from_file(sys.argv[1], default_timeout=float(sys.argv[2])).run()
+print(json.dumps({{'segundos': time.perf_counter() - start, 'excecoes': [str(e.value) for e in app.exception]}}))
+"""
+
+
+def app_pages(app_dir=APP_DIR):
+    """Os scripts de página do app (raiz e `pages/`), sem os módulos auxiliares."""
+    pages = sorted(glob.glob(os.path.join(app_dir, '*.py'))) + sorted(glob.glob(os.path.join(app_dir, 'pages', '*.py')))
+    return [page for page in pages if os.path.basename(page) != 'artifacts.py']
+
+
+def parse_importtime(stderr):
+    """
+    Tempo próprio (em segundos) de cada pacote importado depois do marcador, a partir da saída
+    do `python -X importtime` (linhas 'import time: self [us] | cumulative | pacote').
+    """
+    packages = {}
+    lines = stderr.split(RENDER_MARKER, 1)[-1].splitlines()
+    for line in lines:
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|', 2)
+        package = name.strip().split('.')[0]
+        packages[package] = packages.get(package, 0.0) + int(self_us) / 1e6
+    return packages
+
+
+def measure_page(page, timeout=300):
+    """Tempo até a primeira renderização da página e importações feitas durante ela."""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [os.path.abspath(APP_DIR), env.get('PYTHONPATH')]))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', RENDER_SCRIPT, page, str(timeout)],
+                            capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    measurement = json.loads(result.stdout.strip().splitlines()[-1])
+    measurement['importacoes'] = parse_importtime(result.stderr)
+    return measurement
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede o tempo de cold start de cada página do app.")
+    parser.add_argument('pages', nargs='*', help="Páginas a medir (padrão: todas as páginas de 'app/').")
+    parser.add_argument('--budget', type=float, help="Orçamento em segundos para a primeira renderização.")
+    parser.add_argument('--top', type=int, default=5, help="Pacotes mais lentos listados por página.")
+    args = parser.parse_args()
+
+    pages = args.pages or app_pages()
+    if not pages:
+        print(f"Erro: Nenhuma página encontrada em '{APP_DIR}/'.")
+        exit()
+
+    over_budget = []
+    print(f"{'Página':<40} {'1ª renderização':>16} {'Importações':>12}  Pacotes pesados")
+    print("-" * 100)
+    for page in pages:
+        try:
+            measurement = measure_page(page)
+        except RuntimeError as e:
+            print(f"{os.path.basename(page):<40} falhou: {e}")
+            continue
+        imports = measurement['importacoes']
+        heavy = [package for package in HEAVY_PACKAGES if package in imports]
+        print(f"{os.path.basename(page):<40} {measurement['segundos']:>15.2f}s {sum(imports.values()):>11.2f}s  "
+              f"{', '.join(heavy) or '-'}")
+        slowest = sorted(imports.items(), key=lambda item: -item[1])[:args.top]
+        print(f"{'':<40} {'':>16} {'':>12}  " + ', '.join(f"{name} {seconds:.2f}s" for name, seconds in slowest))
+        if measurement['excecoes']:
+            print(f"{'':<40} exceções: {measurement['excecoes']}")
+        if args.budget is not None and measurement['segundos'] > args.budget:
+            over_budget.append(page)
+
+    if over_budget:
+        print(f"\n{len(over_budget)} página(s) acima do orçamento de {args.budget:.2f}s: "
+              f"{', '.join(os.path.basename(page) for page in over_budget)}")
+        exit(1)
@@ -0,0 +1,84 @@
+# src/analysis/memory_report.py
+
+import argparse
+import gc
+import os
+import resource
+import sys
+import time
+import pandas as pd
+
+APP_DIR = 'app'
+PAGES = [
+    '🔮_Placar_Preditivo.py',
+    'pages/2_Analise_de_Votacao.py',
+    'pages/3_Perfil_do_Parlamentar.py',
+    '1_Analise_Historica.py',
+    '🔮_Previsão_de_Novas_Votações.py',
+    'dashboard.py',
+]
+DATASET_PATH = 'data/processed/modeling_dataset_enriched.parquet'
+
+
+def rss_mb():
+    """Memória residente do processo em MB (VmRSS no Linux; pico de RSS nos demais sistemas)."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except FileNotFoundError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def dataset_copies(n_rows):
+    """
+    Conta as cópias distintas do dataset vivas no processo: DataFrames com o mesmo número de
+    linhas e a coluna `pct_sim_historico`, agrupados pelo buffer de memória dessa coluna
+    (visões rasas compartilham o buffer e contam como uma única cópia).
+    """
+    buffers = set()
+    for obj in gc.get_objects():
+        if type(obj) is pd.DataFrame and len(obj) == n_rows and 'pct_sim_historico' in obj.columns:
+            buffers.add(obj['pct_sim_historico'].to_numpy().__array_interface__['data'][0])
+    return len(buffers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Executa as páginas do app em um único processo (como um servidor Streamlit) e mede a memória.")
+    parser.add_argument('pages', nargs='*', default=PAGES, help="Páginas a executar, relativas a 'app/'.")
+    args = parser.parse_args()
+
+    from streamlit.testing.v1 import AppTest
+
+    # `streamlit run` coloca a pasta do script no sys.path; o AppTest não
+    sys.path.insert(0, os.path.abspath(APP_DIR))
+    try:
+        n_rows = pd.read_parquet(DATASET_PATH, columns=['id_deputado']).shape[0]
+    except FileNotFoundError:
+        print(f"Erro: Arquivo '{DATASET_PATH}' não encontrado. Execute o pipeline de 'src/' primeiro.")
+        exit()
+
+    baseline = rss_mb()
+    print(f"{'Página':<40} {'Tempo':>8} {'RSS (MB)':>10} {'Δ RSS':>8} {'Cópias do dataset':>18}")
+    print("-" * 88)
+    apps = []
+    previous = baseline
+    for page in args.pages:
+        start = time.perf_counter()
+        app = AppTest.from_file(os.path.join(APP_DIR, page), default_timeout=300).run()
+        elapsed = time.perf_counter() - start
+        apps.append(app)  # Mantém as "sessões" vivas, como usuários conectados em páginas diferentes
+        gc.collect()
+        current = rss_mb()
+        status = ' (erro)' if app.exception else ''
+        print(f"{page + status:<40} {elapsed:>7.1f}s {current:>10.0f} {current - previous:>+8.0f} "
+              f"{dataset_copies(n_rows):>18}")
+        previous = current
+
+    print("-" * 88)
+    print(f"Total: {rss_mb() - baseline:+.0f} MB para {len(args.pages)} páginas; "
+          f"{dataset_copies(n_rows)} cópia(s) do dataset ({n_rows} linhas) no processo.")
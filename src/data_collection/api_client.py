@@ -4,6 +4,8 @@ import requests
 import pandas as pd
 import os
 
+from src.utils.timing import timed
+
 
 # URL base da API v2 da Câmara dos Deputados
 BASE_URL = "https://dadosabertos.camara.leg.br/api/v2"
@@ -17,6 +19,7 @@ def find_next_url(links):
     return None
 
 
+@timed('coleta.fetch_all_deputies')
 def fetch_all_deputies():
     """
     Busca a lista de TODOS os deputados em exercício na API da Câmara,
@@ -65,10 +68,14 @@ def fetch_all_deputies():
         print("Erro: A chave 'dados' ou 'links' não foi encontrada no JSON de resposta.")
         return None
 
+@timed('dados.save_to_parquet')
 def save_to_parquet(df, file_path):
     """
     Salva um DataFrame em um arquivo Parquet, criando o diretório se não existir.
 
+    O arquivo é gravado ao lado com sufixo `.tmp` e trocado com `os.replace`, então quem lê o
+    caminho (ex: o app durante uma atualização) vê sempre a versão anterior ou a nova, completas.
+
     Args:
         df (pd.DataFrame): O DataFrame a ser salvo.
         file_path (str): O caminho completo do arquivo (ex: 'data/raw/deputies.parquet').
@@ -81,7 +88,8 @@ def save_to_parquet(df, file_path):
             os.makedirs(directory)
             print(f"Diretório '{directory}' criado.")
 
-        df.to_parquet(file_path, index=False)
+        df.to_parquet(f"{file_path}.tmp", index=False)
+        os.replace(f"{file_path}.tmp", file_path)
         print(f"Dados salvos com sucesso em '{file_path}'")
     except Exception as e:
         print(f"Erro ao salvar o arquivo Parquet: {e}")
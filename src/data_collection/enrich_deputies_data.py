@@ -4,9 +4,11 @@ import pandas as pd
 import requests
 import time
 from tqdm import tqdm
-from api_client import BASE_URL, save_to_parquet  # Reutilizamos nossa URL base e função de salvar!
+from src.data_collection.api_client import BASE_URL, save_to_parquet  # Reutilizamos nossa URL base e função de salvar!
+from src.utils.timing import timed
 
 
+@timed('coleta.fetch_deputy_details')
 def fetch_deputy_details(deputy_id):
     """
     Busca os detalhes de um deputado específico na API da Câmara.
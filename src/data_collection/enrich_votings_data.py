@@ -7,8 +7,10 @@ from tqdm import tqdm
 import os
 
 from src.data_collection.api_client import BASE_URL, save_to_parquet
+from src.utils.timing import timed
 
 
+@timed('coleta.fetch_voting_details')
 def fetch_voting_details(voting_id):
     """
     Busca os detalhes de uma votação específica, focando na ementa da proposição.
@@ -8,9 +8,11 @@ from tqdm import tqdm
 import os
 
 from src.data_collection.api_client import BASE_URL, find_next_url, save_to_parquet
+from src.utils.timing import timed
 
 
 # As funções fetch_votings_list e fetch_votes_for_voting permanecem as mesmas.
+@timed('coleta.fetch_votings_list')
 def fetch_votings_list(start_date, end_date):
     # ... (código da função inalterado) ...
     all_votings_list = []
@@ -35,6 +37,7 @@ def fetch_votings_list(start_date, end_date):
         return None
 
 
+@timed('coleta.fetch_votes_for_voting')
 def fetch_votes_for_voting(voting_id):
     # ... (código da função inalterado) ...
     endpoint = f"{BASE_URL}/votacoes/{voting_id}/votos"
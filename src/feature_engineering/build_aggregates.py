@@ -0,0 +1,121 @@
+# src/feature_engineering/build_aggregates.py
+
+import argparse
+import os
+import pandas as pd
+
+from src.utils.timing import timed
+
+DATASET_PATH = 'data/processed/modeling_dataset_enriched.parquet'
+AGGREGATES_DIR = 'data/processed/aggregates'
+TABLES = ('votings_summary', 'bloc_counts', 'deputies_summary', 'party_rates', 'uf_rates')
+COUNT_COLUMNS = ['votos_sim', 'votos_nao', 'total_votos']
+
+
+def vote_counts(df, keys, first_columns=()):
+    """Votos 'Sim', 'Não' e total por grupo, mais o primeiro valor de `first_columns`."""
+    counts = df.assign(votos_sim=df['tipoVoto'].eq('Sim'), votos_nao=df['tipoVoto'].eq('Não'))
+    aggregations = {column: (column, 'first') for column in first_columns}
+    aggregations.update(votos_sim=('votos_sim', 'sum'), votos_nao=('votos_nao', 'sum'),
+                        total_votos=('tipoVoto', 'size'))
+    return counts.groupby(keys, sort=False, dropna=False).agg(**aggregations).reset_index()
+
+
+def with_sim_rate(table):
+    table['taxa_sim'] = table['votos_sim'] / table['total_votos'] * 100
+    return table
+
+
+@timed('agregados.build_aggregates')
+def build_aggregates(df):
+    """
+    Calcula as tabelas agregadas usadas pelos dashboards a partir do dataset enriquecido.
+
+    Returns:
+        dict: DataFrames `votings_summary` (uma linha por votação), `bloc_counts` (votação x bloco),
+              `deputies_summary` (deputado x partido x bloco), `party_rates` e `uf_rates`.
+    """
+    return {
+        'votings_summary': vote_counts(df, 'id_votacao', ['proposicao_ementa', 'dataRegistroVoto']),
+        'bloc_counts': vote_counts(df, ['id_votacao', 'posicao_governo']),
+        'deputies_summary': vote_counts(df, ['id_deputado', 'partido', 'posicao_governo'],
+                                        ['nome_urna', 'uf', 'idade']),
+        'party_rates': with_sim_rate(vote_counts(df, 'partido')),
+        'uf_rates': with_sim_rate(vote_counts(df, 'uf')),
+    }
+
+
+def merge_aggregates(existing, new):
+    """
+    Soma as agregações das votações novas às já materializadas. As tabelas por votação só
+    ganham linhas; as demais somam as contagens por grupo (mantendo os primeiros atributos).
+    """
+    merged = {}
+    for name in ('votings_summary', 'bloc_counts'):
+        merged[name] = pd.concat([existing[name], new[name]], ignore_index=True)
+
+    for name, keys in (('deputies_summary', ['id_deputado', 'partido', 'posicao_governo']),
+                       ('party_rates', ['partido']), ('uf_rates', ['uf'])):
+        combined = pd.concat([existing[name], new[name]], ignore_index=True)
+        first_columns = [c for c in combined.columns if c not in keys + COUNT_COLUMNS + ['taxa_sim']]
+        aggregations = {column: 'first' for column in first_columns}
+        aggregations.update({column: 'sum' for column in COUNT_COLUMNS})
+        table = combined.groupby(keys, sort=False, dropna=False).agg(aggregations).reset_index()
+        merged[name] = with_sim_rate(table) if 'taxa_sim' in combined.columns else table
+    return merged
+
+
+def load_aggregates(directory=AGGREGATES_DIR):
+    """Lê as tabelas materializadas, ou None se alguma ainda não existir."""
+    try:
+        return {name: pd.read_parquet(os.path.join(directory, f"{name}.parquet")) for name in TABLES}
+    except FileNotFoundError:
+        return None
+
+
+def save_aggregates(tables, directory=AGGREGATES_DIR):
+    """Grava cada tabela em um arquivo temporário e o renomeia sobre o anterior (troca atômica)."""
+    os.makedirs(directory, exist_ok=True)
+    for name, table in tables.items():
+        file_path = os.path.join(directory, f"{name}.parquet")
+        table.to_parquet(f"{file_path}.tmp", index=False)
+        os.replace(f"{file_path}.tmp", file_path)
+
+
+@timed('agregados.update_aggregates')
+def update_aggregates(df, directory=AGGREGATES_DIR, full=False):
+    """
+    Atualiza as tabelas agregadas processando apenas as votações que ainda não foram agregadas
+    (ou todas, com `full=True` ou quando ainda não há tabelas).
+
+    Returns:
+        int: Número de votações agregadas nesta execução.
+    """
+    existing = None if full else load_aggregates(directory)
+    if existing is not None:
+        df = df[~df['id_votacao'].isin(existing['votings_summary']['id_votacao'])]
+    if df.empty:
+        return 0
+
+    new = build_aggregates(df)
+    save_aggregates(new if existing is None else merge_aggregates(existing, new), directory)
+    return df['id_votacao'].nunique()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Materializa as tabelas agregadas usadas pelos dashboards.")
+    parser.add_argument('--full', action='store_true', help="Recalcula todas as tabelas do zero.")
+    args = parser.parse_args()
+
+    try:
+        df = pd.read_parquet(DATASET_PATH)
+    except FileNotFoundError:
+        print(f"Erro: Arquivo '{DATASET_PATH}' não encontrado.")
+        print("Execute o script 'enrich_behavioral_features.py' primeiro.")
+        exit()
+
+    updated = update_aggregates(df, full=args.full)
+    if updated:
+        print(f"✓ {updated} votações agregadas. Tabelas salvas em '{AGGREGATES_DIR}'.")
+    else:
+        print("Nenhuma votação nova desde a última agregação. As tabelas estão atualizadas.")
@@ -1,7 +1,8 @@
 # src/feature_engineering/enrich_behavioral_features.py
 
 import pandas as pd
-from src.data_collection.api_client import save_to_parquet
+from src.utils.arrow_store import export_arrow
+from src.utils.dataset_store import write_dataset
 
 if __name__ == "__main__":
     print("Enriquecendo dataset com features comportamentais...\n")
@@ -45,5 +46,10 @@ if __name__ == "__main__":
     df = pd.merge(df, votacao_posicao_stats, on=['id_votacao', 'posicao_governo'], how='left')
 
     file_path = 'data/processed/modeling_dataset_enriched.parquet'
-    save_to_parquet(df, file_path)
-    print(f"\n✓ Dataset enriquecido salvo em '{file_path}' com nomes corrigidos.")
\ No newline at end of file
+    # Ordenado e em row groups, para que leituras filtradas (votação, deputado, período) só leiam o necessário
+    write_dataset(df, file_path)
+    print(f"\n✓ Dataset enriquecido salvo em '{file_path}' com nomes corrigidos.")
+
+    # Cópia em Arrow IPC, mapeada em memória (somente leitura) pelos processos do app
+    export_arrow(df.assign(dataRegistroVoto=pd.to_datetime(df['dataRegistroVoto'], errors='coerce')),
+                 'modeling_dataset_enriched')
\ No newline at end of file
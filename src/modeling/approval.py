@@ -0,0 +1,84 @@
+# src/modeling/approval.py
+
+import numpy as np
+
+# Quóruns da Câmara (513 cadeiras)
+ABSOLUTE_MAJORITY = 257
+CONSTITUTIONAL_MAJORITY = 308
+
+
+def sim_count_distribution(prob_sim):
+    """
+    Distribuição exata do número de votos 'Sim' (Poisson-binomial) a partir da
+    probabilidade individual de cada deputado votar 'Sim'.
+
+    Usa programação dinâmica em NumPy, vetorizada sobre várias votações ao mesmo tempo.
+
+    Args:
+        prob_sim (array-like): P(Sim) por deputado, shape (n,) ou (votações, n).
+
+    Returns:
+        numpy.ndarray: P(total de 'Sim' = k) para k = 0..n, shape (n + 1,) ou (votações, n + 1).
+    """
+    p = np.asarray(prob_sim, dtype=np.float64)
+    single = p.ndim == 1
+    p = np.atleast_2d(p)
+    n_votings, n_deputies = p.shape
+
+    pmf = np.zeros((n_votings, n_deputies + 1))
+    pmf[:, 0] = 1.0
+    for i in range(n_deputies):
+        p_i = p[:, i:i + 1]
+        shifted = pmf[:, :i + 1] * p_i
+        pmf[:, :i + 1] *= 1.0 - p_i
+        pmf[:, 1:i + 2] += shifted
+    return pmf[0] if single else pmf
+
+
+def approval_summary(prob_sim, confidence=0.9, absolute_majority=ABSOLUTE_MAJORITY,
+                     constitutional_majority=CONSTITUTIONAL_MAJORITY):
+    """
+    Resume a distribuição de votos 'Sim' de uma (ou várias) votações previstas.
+
+    A maioria simples considera todos os deputados informados como votantes ('Sim' > 'Não').
+
+    Args:
+        prob_sim (array-like): P(Sim) por deputado, shape (n,) ou (votações, n).
+        confidence (float): Nível da faixa de confiança do total de 'Sim' (ex: 0.9 = 5%-95%).
+        absolute_majority (int): Votos necessários para a maioria absoluta.
+        constitutional_majority (int): Votos necessários para a maioria constitucional (3/5).
+
+    Returns:
+        dict: Distribuição, votos 'Sim' esperados, faixa de confiança e a probabilidade de
+              aprovação por maioria simples, absoluta e constitucional.
+    """
+    p = np.asarray(prob_sim, dtype=np.float64)
+    single = p.ndim == 1
+    p = np.atleast_2d(p)
+    n_deputies = p.shape[1]
+
+    pmf = sim_count_distribution(p)
+    cdf = np.cumsum(pmf, axis=1)
+    # P(S >= k) = 1 - P(S <= k - 1)
+    survival = np.concatenate([np.ones((len(pmf), 1)), 1.0 - cdf[:, :-1]], axis=1).clip(0.0, 1.0)
+
+    def prob_at_least(votes):
+        if votes > n_deputies:
+            return np.zeros(len(pmf))
+        return survival[:, max(votes, 0)]
+
+    tail = (1.0 - confidence) / 2
+    summary = {
+        'distribuicao': pmf,
+        'votos_sim_esperados': p.sum(axis=1),
+        'desvio_padrao': np.sqrt((p * (1.0 - p)).sum(axis=1)),
+        'votos_sim_mais_provavel': pmf.argmax(axis=1),
+        'intervalo_inferior': (cdf < tail).sum(axis=1),
+        'intervalo_superior': (cdf < 1.0 - tail).sum(axis=1),
+        'prob_maioria_simples': prob_at_least(n_deputies // 2 + 1),
+        'prob_maioria_absoluta': prob_at_least(absolute_majority),
+        'prob_maioria_constitucional': prob_at_least(constitutional_majority),
+    }
+    if single:
+        summary = {key: value[0] for key, value in summary.items()}
+    return summary
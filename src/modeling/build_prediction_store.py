@@ -0,0 +1,95 @@
+# src/modeling/build_prediction_store.py
+
+import argparse
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from src.data_collection.api_client import save_to_parquet
+from src.modeling.features import build_feature_matrix
+from src.modeling.registry import load_bundle
+from src.utils.artifacts import file_hash, read_json, write_json
+from src.utils.timing import timed
+
+DATASET_PATH = 'data/processed/modeling_dataset_enriched.parquet'
+PREDICTIONS_PATH = 'data/processed/predictions.parquet'
+MANIFEST_PATH = 'data/processed/predictions_manifest.json'
+
+# Linhas por bloco ao montar a matriz de features, para manter a memória limitada
+CHUNK_SIZE = 200_000
+
+
+@timed('previsoes.score_dataset')
+def score_dataset(df, predictor, feature_columns, model_version):
+    """
+    Pontua todas as linhas (deputado x votação) do dataset.
+
+    Returns:
+        pandas.DataFrame: id_votacao, id_deputado, voto_previsto, prob_sim e model_version,
+                          ordenado pela chave (id_votacao, id_deputado).
+    """
+    sim_index = list(predictor.classes).index('Sim')
+    prob_sim = np.empty(len(df), dtype=np.float32)
+    for start in range(0, len(df), CHUNK_SIZE):
+        chunk = df.iloc[start:start + CHUNK_SIZE]
+        X = build_feature_matrix(chunk, feature_columns)
+        prob_sim[start:start + CHUNK_SIZE] = predictor.predict_proba(X)[:, sim_index]
+
+    predictions = pd.DataFrame({
+        'id_votacao': df['id_votacao'].astype(str).values,
+        'id_deputado': df['id_deputado'].values,
+        'voto_previsto': np.where(prob_sim > 0.5, 'Sim', 'Não'),
+        'prob_sim': prob_sim,
+        'model_version': model_version,
+    })
+    return predictions.sort_values(['id_votacao', 'id_deputado'], ignore_index=True)
+
+
+def build_prediction_store(force=False):
+    """
+    Recria o `predictions.parquet` apenas se o modelo ou o dataset mudaram desde a última execução.
+
+    Returns:
+        bool: True se o arquivo foi recriado.
+    """
+    dataset_hash = file_hash(DATASET_PATH)
+    bundle = load_bundle()
+    if bundle is None:
+        raise FileNotFoundError("nenhum modelo publicado em 'models/registry'")
+    model_version = bundle.version
+
+    manifest = read_json(MANIFEST_PATH)
+    if not force and manifest and manifest.get('dataset_hash') == dataset_hash \
+            and manifest.get('model_version') == model_version:
+        print("Modelo e dataset inalterados. As previsões armazenadas já estão atualizadas.")
+        return False
+
+    df = pd.read_parquet(DATASET_PATH)
+    print(f"Pontuando {len(df)} linhas com o modelo {model_version}...")
+
+    predictions = score_dataset(df, bundle.predictor, bundle.feature_columns, model_version)
+    save_to_parquet(predictions, PREDICTIONS_PATH)
+    write_json({
+        'dataset_hash': dataset_hash,
+        'model_version': model_version,
+        'rows': len(predictions),
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+    }, MANIFEST_PATH)
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pré-calcula as previsões do modelo para todos os votos históricos.")
+    parser.add_argument('--force', action='store_true', help="Recria as previsões mesmo sem mudanças.")
+    args = parser.parse_args()
+
+    print("Iniciando a construção do armazenamento de previsões...")
+    try:
+        rebuilt = build_prediction_store(force=args.force)
+    except FileNotFoundError as e:
+        print(f"Erro: Arquivo não encontrado - {e}.")
+        print("Execute 'enrich_behavioral_features.py' e 'train_model.py' primeiro.")
+        exit()
+
+    if rebuilt:
+        print(f"\n✓ Previsões salvas em '{PREDICTIONS_PATH}'")
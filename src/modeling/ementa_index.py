@@ -0,0 +1,152 @@
+# src/modeling/ementa_index.py
+
+import argparse
+import os
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from src.utils.artifacts import read_json, write_json
+from src.utils.timing import timed
+
+DATASET_PATH = 'data/processed/modeling_dataset_enriched.parquet'
+INDEX_DIR = 'data/processed/ementa_index'
+# Texto usado pelo create_modeling_dataset.py quando a votação não tem ementa
+MISSING_EMENTA = 'Ementa não disponível'
+N_FEATURES = 2 ** 18
+DEFAULT_TOP_K = 10
+
+
+def l2_normalize(matrix):
+    """Normaliza cada linha de uma matriz esparsa para norma L2 unitária (linhas vazias ficam zeradas)."""
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags((1.0 / norms).astype(np.float32)) @ matrix
+
+
+class EmentaIndex:
+    """
+    Índice de similaridade das ementas já votadas (TF-IDF sobre um HashingVectorizer).
+
+    O vocabulário é substituído por hashing, então adicionar votações novas não exige
+    reprocessar o arquivo: só as contagens das ementas novas são calculadas e empilhadas,
+    e a frequência de documentos é atualizada. Os pesos IDF e a normalização L2 são
+    aplicados em memória uma vez por atualização, e cada busca é um único produto
+    esparso matriz x vetor (similaridade de cosseno).
+    """
+
+    def __init__(self, ids=None, counts=None, doc_freq=None):
+        self._vectorizer = None
+        self.ids = list(ids or [])
+        self.counts = counts if counts is not None else sparse.csr_matrix((0, N_FEATURES), dtype=np.float32)
+        self.doc_freq = doc_freq if doc_freq is not None else np.zeros(N_FEATURES, dtype=np.int32)
+        self._refresh()
+
+    @property
+    def vectorizer(self):
+        # O scikit-learn só é importado na primeira busca ou indexação, não ao carregar o índice
+        if self._vectorizer is None:
+            from sklearn.feature_extraction.text import HashingVectorizer
+            self._vectorizer = HashingVectorizer(n_features=N_FEATURES, alternate_sign=False, norm=None,
+                                                 strip_accents='unicode', ngram_range=(1, 2))
+        return self._vectorizer
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _refresh(self):
+        idf = np.log((1 + len(self.ids)) / (1 + self.doc_freq)).astype(np.float32) + 1
+        self._idf = idf
+        self._matrix = l2_normalize(self.counts.multiply(idf).tocsr())
+        self._positions = {voting_id: i for i, voting_id in enumerate(self.ids)}
+
+    def add(self, ids, ementas):
+        """
+        Indexa as ementas de votações ainda não indexadas (as já presentes são ignoradas).
+
+        Returns:
+            int: Número de votações adicionadas.
+        """
+        new = [(str(i), e) for i, e in zip(ids, ementas)
+               if str(i) not in self._positions and isinstance(e, str) and e.strip() and e != MISSING_EMENTA]
+        new = list(dict(new).items())
+        if not new:
+            return 0
+        new_counts = self.vectorizer.transform([e for _, e in new]).astype(np.float32)
+        self.counts = sparse.vstack([self.counts, new_counts], format='csr')
+        self.doc_freq += np.bincount(new_counts.indices, minlength=N_FEATURES).astype(np.int32)
+        self.ids.extend(i for i, _ in new)
+        self._refresh()
+        return len(new)
+
+    @timed('ementas.search')
+    def search(self, text, k=DEFAULT_TOP_K):
+        """
+        As `k` votações com a ementa mais parecida com `text`.
+
+        Returns:
+            pandas.DataFrame: Colunas `id_votacao` e `similaridade` (cosseno), da mais parecida
+            para a menos parecida. Vazio se o texto não tiver termos em comum com o índice.
+        """
+        query = l2_normalize(self.vectorizer.transform([text]).multiply(self._idf).tocsr())
+        similarity = (self._matrix @ query.T).toarray().ravel()
+        candidates = np.flatnonzero(similarity > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-similarity[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-similarity[candidates])]
+        return pd.DataFrame({'id_votacao': [self.ids[i] for i in candidates],
+                             'similaridade': similarity[candidates]})
+
+    def save(self, directory=INDEX_DIR):
+        """
+        Salva as contagens e os ids (cada arquivo com troca atômica). A frequência de documentos
+        não é salva: `load` a recalcula das contagens válidas, então ela nunca fica fora de sincronia
+        com os ids.
+        """
+        os.makedirs(directory, exist_ok=True)
+        counts_path = os.path.join(directory, 'counts.npz')
+        sparse.save_npz(f"{counts_path}.tmp.npz", self.counts)
+        os.replace(f"{counts_path}.tmp.npz", counts_path)
+        # Os ids são gravados por último e definem quantas linhas das contagens são válidas (as
+        # contagens só ganham linhas no fim, então as novas também servem para os ids anteriores)
+        write_json(self.ids, os.path.join(directory, 'ids.json'))
+
+    @classmethod
+    def load(cls, directory=INDEX_DIR):
+        """Carrega o índice salvo, ou None se ele ainda não foi construído."""
+        ids = read_json(os.path.join(directory, 'ids.json'))
+        if ids is None:
+            return None
+        counts = sparse.load_npz(os.path.join(directory, 'counts.npz')).tocsr()[:len(ids)]
+        doc_freq = np.bincount(counts.indices, minlength=N_FEATURES).astype(np.int32)
+        return cls(ids, counts, doc_freq)
+
+
+@timed('ementas.update_index')
+def update_index(dataset, directory=INDEX_DIR):
+    """Carrega o índice (ou cria um vazio), indexa as votações novas do dataset e salva."""
+    index = EmentaIndex.load(directory)
+    if index is None:
+        index = EmentaIndex()
+    votings = dataset.drop_duplicates('id_votacao')[['id_votacao', 'proposicao_ementa']]
+    added = index.add(votings['id_votacao'].astype(str), votings['proposicao_ementa'])
+    if added:
+        index.save(directory)
+    return index, added
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Constrói/atualiza o índice de similaridade das ementas.")
+    parser.add_argument('--query', help="Busca as votações mais parecidas com este texto após a atualização.")
+    args = parser.parse_args()
+
+    try:
+        df = pd.read_parquet(DATASET_PATH, columns=['id_votacao', 'proposicao_ementa'])
+    except FileNotFoundError:
+        print(f"Erro: Arquivo '{DATASET_PATH}' não encontrado.")
+        exit()
+
+    index, added = update_index(df)
+    print(f"{added} ementas novas indexadas ({len(index)} no total) em '{INDEX_DIR}'.")
+    if args.query:
+        print(index.search(args.query).to_string(index=False))
@@ -0,0 +1,104 @@
+# src/modeling/explain.py
+
+import threading
+import warnings
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+
+from src.modeling.features import CATEGORICAL_FEATURES, build_feature_matrix
+from src.modeling.predictor import to_float32_matrix
+from src.utils.timing import timed
+
+# Número máximo de linhas (deputado x votação) explicadas mantidas em memória
+DEFAULT_CACHE_ENTRIES = 200_000
+# Prefixos das dummies, para reagrupar as contribuições pela variável original
+DUMMY_PREFIXES = CATEGORICAL_FEATURES + ['faixa_idade']
+
+
+def original_feature(column):
+    """Nome da variável original de uma coluna da matriz (ex: 'partido_PT' -> 'partido')."""
+    for prefix in DUMMY_PREFIXES:
+        if column.startswith(f"{prefix}_"):
+            return prefix
+    return column
+
+
+class ExplanationService:
+    """
+    Explicações SHAP (`shap.TreeExplainer`) das previsões de um bundle do modelo.
+
+    As contribuições são calculadas em uma única chamada vetorizada para todas as linhas
+    pedidas (ex: todos os deputados de uma votação) e guardadas em um cache LRU com chave
+    (versão do modelo, chave da linha), então só as linhas ainda não explicadas são calculadas.
+    O cache é compartilhado pelas sessões do app e protegido por uma trava. Os valores estão na
+    escala de log-odds de 'Sim'.
+    """
+
+    def __init__(self, bundle, max_entries=DEFAULT_CACHE_ENTRIES):
+        self.bundle = bundle
+        self.feature_columns = bundle.feature_columns
+        self._explainer = None
+        self._cache = LRUCache(maxsize=max_entries)
+        self._lock = threading.Lock()
+
+    @property
+    def explainer(self):
+        if self._explainer is None:
+            import shap
+            self._explainer = shap.TreeExplainer(self.bundle.booster)
+        return self._explainer
+
+    @property
+    def base_value(self):
+        """Valor esperado (log-odds de 'Sim') antes de qualquer contribuição."""
+        return float(np.ravel(self.explainer.expected_value)[-1])
+
+    @timed('modelo.shap')
+    def explain(self, X, keys):
+        """
+        Contribuições SHAP das linhas de X.
+
+        Args:
+            X (pd.DataFrame | np.ndarray): Matriz de features alinhada a `feature_columns`.
+            keys (list): Uma chave única por linha (ex: (id_votacao, id_deputado)).
+
+        Returns:
+            pandas.DataFrame: Contribuições por coluna da matriz, indexadas pelas chaves.
+        """
+        version = self.bundle.version
+        contributions = np.empty((len(keys), len(self.feature_columns)))
+        # As linhas já explicadas são copiadas sob a trava; as demais vêm do cálculo desta chamada,
+        # então uma remoção do LRU (por esta ou por outra sessão) não afeta o resultado
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                cached = self._cache.get((version, key))
+                if cached is None:
+                    missing.append(i)
+                else:
+                    contributions[i] = cached
+        if missing:
+            X_missing = to_float32_matrix(X)[missing]
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                values = self.explainer.shap_values(X_missing)
+            if isinstance(values, list):
+                values = values[-1]
+            contributions[missing] = values
+            with self._lock:
+                for row, i in enumerate(missing):
+                    self._cache[(version, keys[i])] = values[row]
+
+        return pd.DataFrame(contributions, index=pd.Index(keys, tupleize_cols=False), columns=self.feature_columns)
+
+    def explain_rows(self, rows):
+        """Explica linhas do dataset (deputado x votação), usando (id_votacao, id_deputado) como chave."""
+        X = build_feature_matrix(rows, self.feature_columns)
+        keys = list(zip(rows['id_votacao'].astype(str), rows['id_deputado']))
+        return self.explain(X, keys)
+
+
+def group_contributions(contributions):
+    """Soma as contribuições das dummies de cada variável original (partido, uf, faixa_idade...)."""
+    return contributions.T.groupby(original_feature).sum().T
@@ -0,0 +1,58 @@
+# src/modeling/features.py
+
+import pandas as pd
+
+from src.utils.timing import timed
+
+# Colunas usadas para montar a matriz de features do modelo (mesma ordem do treinamento)
+CATEGORICAL_FEATURES = ['partido', 'posicao_governo', 'uf', 'escolaridade']
+BEHAVIORAL_FEATURES = ['pct_sim_historico', 'pct_sim_na_votacao', 'pct_sim_uf', 'pct_sim_posicao_votacao']
+AGE_BINS = [0, 30, 40, 50, 60, 100]
+AGE_LABELS = ['18-30', '31-40', '41-50', '51-60', '60+']
+
+# Alinhamento dos partidos em relação ao governo (mesma classificação do enrich_behavioral_features.py)
+PARTIDOS_GOVERNO = ['PT', 'PCdoB', 'PV', 'PSB', 'MDB', 'PSD', 'REPUBLICANOS', 'PODE', 'UNIÃO', 'PSOL', 'REDE']
+PARTIDOS_OPOSICAO = ['PL', 'PP', 'NOVO']
+BLOCOS = ['Governo', 'Oposição', 'Independente']
+
+
+def define_posicao(partido):
+    if partido in PARTIDOS_GOVERNO:
+        return 'Governo'
+    elif partido in PARTIDOS_OPOSICAO:
+        return 'Oposição'
+    else:
+        return 'Independente'
+
+
+@timed('features.build_feature_matrix')
+def build_feature_matrix(df, feature_columns=None):
+    """
+    Monta a matriz de features (X) a partir das colunas demográficas e comportamentais.
+
+    Sem `feature_columns`, reproduz a codificação do treinamento (`drop_first=True`). Com
+    `feature_columns`, gera todas as dummies e alinha o resultado às colunas do modelo
+    treinado, o que funciona inclusive para uma única linha.
+
+    Args:
+        df (pd.DataFrame): Linhas (deputado x votação) com as colunas de entrada do modelo.
+        feature_columns (list, opcional): Colunas salvas no treinamento.
+
+    Returns:
+        pandas.DataFrame: A matriz de features, com o mesmo índice de `df`.
+    """
+    categorical = df[CATEGORICAL_FEATURES].copy()
+    categorical['escolaridade'] = categorical['escolaridade'].fillna('Não Informado')
+
+    X = pd.get_dummies(categorical, drop_first=feature_columns is None)
+    X['idade'] = df['idade'].values
+    for feature in BEHAVIORAL_FEATURES:
+        X[feature] = df[feature].values
+
+    faixa_idade = pd.cut(df['idade'], bins=AGE_BINS, labels=AGE_LABELS)
+    X_faixa = pd.get_dummies(faixa_idade, prefix='faixa_idade', drop_first=True)
+    X = pd.concat([X, X_faixa], axis=1)
+
+    if feature_columns is not None:
+        X = X.reindex(columns=feature_columns, fill_value=0)
+    return X
@@ -0,0 +1,333 @@
+# src/modeling/predict.py
+
+import argparse
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from cachetools import LRUCache
+
+from src.modeling.approval import approval_summary
+from src.modeling.features import build_feature_matrix, define_posicao
+from src.modeling.predictor import FastPredictor, to_float32_matrix
+from src.modeling.registry import load_bundle
+from src.utils.dataset_store import DATASET_PATH, read_dataset
+from src.utils.timing import timed
+
+DEPUTIES_PATH = 'data/processed/deputies_master_table.parquet'
+OUTPUT_DIR = 'data/processed/predict'
+# Votações por tarefa do pool: cada tarefa lê, pontua e grava só as suas votações
+CHUNK_VOTINGS = 50
+MODES = ('sessao', 'plenario')
+# Colunas gravadas por deputado (o modo 'plenario' também traz `posicao_governo`)
+OUTPUT_COLUMNS = ['id_votacao', 'id_deputado', 'nome_urna', 'partido', 'uf', 'posicao_governo', 'prob_sim',
+                  'voto_previsto', 'voto_realizado']
+# Votações mantidas no cache do `PlenaryPredictor` (~100 KB cada com 513 deputados)
+PLENARY_CACHE_ENTRIES = int(os.environ.get('PLENARIO_PLENARY_CACHE_SIZE', 256))
+# Colunas de coesão da votação; todas as outras features do plenário são fixas por deputado
+COHESION_COLUMNS = ['pct_sim_na_votacao', 'pct_sim_posicao_votacao']
+SUMMARY_KEYS = ('votos_sim_esperados', 'prob_maioria_simples', 'prob_maioria_absoluta', 'prob_maioria_constitucional')
+
+
+def _prob_sim(rows, predictor, feature_columns):
+    X = build_feature_matrix(rows, feature_columns)
+    return predictor.predict_proba(X)[:, list(predictor.classes).index('Sim')]
+
+
+@timed('previsoes.predict_session')
+def predict_session(voting_rows, predictor, feature_columns):
+    """
+    Prevê os votos registrados em uma ou mais votações (os deputados que votaram).
+
+    Args:
+        voting_rows (pd.DataFrame): Linhas (deputado x votação) do dataset enriquecido.
+        predictor (FastPredictor): O preditor do modelo (ex: `bundle.predictor`).
+        feature_columns (list): Colunas da matriz de features do modelo.
+
+    Returns:
+        pd.DataFrame: id_votacao, id_deputado, nome_urna, partido, uf, voto_realizado, prob_sim e voto_previsto.
+    """
+    results = voting_rows[['id_votacao', 'id_deputado', 'nome_urna', 'partido', 'uf', 'tipoVoto']]
+    results = results.rename(columns={'tipoVoto': 'voto_realizado'})
+    results['prob_sim'] = _prob_sim(voting_rows, predictor, feature_columns)
+    results['voto_previsto'] = np.where(results['prob_sim'] > 0.5, 'Sim', 'Não')
+    return results
+
+
+@timed('previsoes.predict_plenary')
+def predict_plenary(voting_rows, deputies_master, historical_features, predictor, feature_columns):
+    """
+    Prevê o voto de TODOS os deputados em exercício em uma ou mais votações.
+
+    A coesão da votação (`pct_sim_na_votacao` e `pct_sim_posicao_votacao`) vem do primeiro voto
+    registrado em cada votação; deputados sem histórico recebem o valor neutro (0.5), e quem
+    não votou aparece com `voto_realizado` = 'Não Votou'.
+
+    Args:
+        voting_rows (pd.DataFrame): Linhas (deputado x votação) das votações a prever.
+        deputies_master (pd.DataFrame): A tabela mestre dos deputados em exercício.
+        historical_features (pd.DataFrame): `id_deputado`, `pct_sim_historico` e `pct_sim_uf` por deputado.
+        predictor (FastPredictor): O preditor do modelo.
+        feature_columns (list): Colunas da matriz de features do modelo.
+
+    Returns:
+        pd.DataFrame: Uma linha por votação x deputado em exercício, com prob_sim, voto_previsto e voto_realizado.
+    """
+    voting_cohesion = voting_rows.drop_duplicates('id_votacao')[
+        ['id_votacao', 'pct_sim_na_votacao', 'pct_sim_posicao_votacao']]
+    plenary = pd.merge(deputies_master, historical_features, on='id_deputado', how='left')
+    plenary = pd.merge(voting_cohesion, plenary, how='cross').fillna(0.5)
+    plenary['posicao_governo'] = plenary['partido'].map(define_posicao)
+    plenary['prob_sim'] = _prob_sim(plenary, predictor, feature_columns)
+    plenary['voto_previsto'] = np.where(plenary['prob_sim'] > 0.5, 'Sim', 'Não')
+
+    real_votes = voting_rows[['id_votacao', 'id_deputado', 'tipoVoto']].rename(columns={'tipoVoto': 'voto_realizado'})
+    plenary = pd.merge(plenary, real_votes, on=['id_votacao', 'id_deputado'], how='left')
+    plenary['voto_realizado'] = plenary['voto_realizado'].fillna('Não Votou')
+    return plenary
+
+
+class PlenaryPredictor:
+    """
+    As mesmas previsões do plenário completo de `predict_plenary`, votação a votação, com cache LRU.
+
+    A parte fixa (uma linha por deputado em exercício, com o histórico já mesclado e a matriz de
+    features float32) é montada uma única vez; cada votação só preenche as duas colunas de coesão
+    e chama o preditor. Os resultados ficam em um cache LRU com chave (id_votacao, versão do
+    modelo), limitado a `max_entries` votações: votações repetidas voltam sem recalcular nada.
+    """
+
+    def __init__(self, deputies_master, historical_features, predictor, feature_columns, model_version=None,
+                 max_entries=PLENARY_CACHE_ENTRIES):
+        self.predictor = predictor
+        self.model_version = model_version
+        self.deputies = pd.merge(deputies_master, historical_features, on='id_deputado', how='left').fillna(0.5)
+        self.deputies['posicao_governo'] = self.deputies['partido'].map(define_posicao)
+        self._X = to_float32_matrix(build_feature_matrix(self.deputies.assign(**dict.fromkeys(COHESION_COLUMNS, 0.5)),
+                                                         feature_columns))
+        self._cohesion_positions = [feature_columns.index(column) for column in COHESION_COLUMNS]
+        self._sim_column = list(predictor.classes).index('Sim')
+        self._cache = LRUCache(maxsize=max_entries)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def feature_matrix(self, voting_rows):
+        """
+        Matriz float32 do plenário (na ordem de `deputies`) em uma votação.
+
+        A coesão é a do primeiro voto registrado, como em `predict_plenary` (neutra se não houver votos).
+
+        Returns:
+            tuple[numpy.ndarray, pd.Series]: (matriz de features, coesão usada por coluna).
+        """
+        if voting_rows.empty:
+            cohesion = pd.Series(0.5, index=COHESION_COLUMNS)
+        else:
+            cohesion = voting_rows[COHESION_COLUMNS].iloc[0].fillna(0.5)
+        X = self._X.copy()
+        X[:, self._cohesion_positions] = cohesion.to_numpy(dtype=np.float32)
+        return X, cohesion
+
+    @timed('previsoes.plenario_votacao')
+    def _predict(self, voting_id, voting_rows):
+        X, cohesion = self.feature_matrix(voting_rows)
+        plenary = self.deputies.copy()
+        for position, column in enumerate(['id_votacao'] + COHESION_COLUMNS):
+            plenary.insert(position, column, voting_id if column == 'id_votacao' else cohesion[column])
+        plenary['prob_sim'] = self.predictor.predict_proba(X)[:, self._sim_column]
+        plenary['voto_previsto'] = np.where(plenary['prob_sim'] > 0.5, 'Sim', 'Não')
+        real_votes = voting_rows.drop_duplicates('id_deputado').set_index('id_deputado')['tipoVoto']
+        plenary['voto_realizado'] = plenary['id_deputado'].map(real_votes).fillna('Não Votou')
+        return plenary
+
+    def predict(self, voting_id, voting_rows):
+        """
+        Previsões do plenário para uma votação (mesmas colunas de `predict_plenary`).
+
+        Args:
+            voting_id (str): A votação; junto com a versão do modelo, é a chave do cache.
+            voting_rows (pd.DataFrame): Linhas da votação no dataset (só usadas se ela não estiver em cache).
+
+        Returns:
+            pd.DataFrame: Uma cópia própria do resultado, que pode ser alterada livremente.
+        """
+        key = (voting_id, self.model_version)
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is None:
+            cached = self._predict(voting_id, voting_rows)
+            with self._lock:
+                self._cache[key] = cached
+        return cached.copy()
+
+
+def voting_placar(predictions, voting_rows):
+    """Placar previsto e real de cada votação a partir das previsões por deputado."""
+    placar = []
+    for voting_id, group in predictions.groupby('id_votacao', sort=False):
+        approval = approval_summary(group['prob_sim'].to_numpy())
+        placar.append({
+            'id_votacao': voting_id,
+            'votos_sim_previstos': int((group['voto_previsto'] == 'Sim').sum()),
+            'votos_nao_previstos': int((group['voto_previsto'] == 'Não').sum()),
+            **{key: float(approval[key]) for key in SUMMARY_KEYS},
+            'votos_sim_reais': int((group['voto_realizado'] == 'Sim').sum()),
+            'votos_nao_reais': int((group['voto_realizado'] == 'Não').sum()),
+        })
+    placar = pd.DataFrame(placar)
+    details = voting_rows.drop_duplicates('id_votacao')[['id_votacao', 'proposicao_ementa', 'dataRegistroVoto']]
+    placar = pd.merge(details, placar, on='id_votacao')
+    placar['resultado_previsto'] = np.where(placar['votos_sim_previstos'] > placar['votos_nao_previstos'],
+                                            'Aprovada', 'Rejeitada')
+    placar['resultado_real'] = np.where(placar['votos_sim_reais'] > placar['votos_nao_reais'], 'Aprovada', 'Rejeitada')
+    return placar
+
+
+# --- Execução em lote (pool de processos) ---
+# Cada processo do pool carrega o modelo e a tabela de deputados uma única vez (initializer)
+
+_worker = {}
+
+
+def _init_worker(version, mode, historical_features, output_dir):
+    bundle = load_bundle(version)
+    _worker.update(
+        # Um thread do LightGBM por processo: o paralelismo vem do pool
+        predictor=FastPredictor(bundle.booster, bundle.classes, num_threads=1),
+        feature_columns=bundle.feature_columns,
+        mode=mode,
+        deputies_master=pd.read_parquet(DEPUTIES_PATH) if mode == 'plenario' else None,
+        historical_features=historical_features,
+        output_dir=output_dir,
+    )
+
+
+def _write_partitioned(df, directory, chunk_number):
+    """Grava `df` particionado por mês da votação (`mes=AAAA-MM/lote-NNNNN-0.parquet`)."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_to_dataset(table, directory, partition_cols=['mes'],
+                        basename_template=f"lote-{chunk_number:05d}-{{i}}.parquet")
+
+
+def predict_chunk(chunk_number, voting_ids):
+    """Lê, pontua e grava um lote de votações; devolve (votações, linhas) para o progresso."""
+    rows = read_dataset(voting_ids=voting_ids)
+    if _worker['mode'] == 'plenario':
+        predictions = predict_plenary(rows, _worker['deputies_master'], _worker['historical_features'],
+                                      _worker['predictor'], _worker['feature_columns'])
+    else:
+        predictions = predict_session(rows, _worker['predictor'], _worker['feature_columns'])
+    placar = voting_placar(predictions, rows)
+    predictions = predictions[[c for c in OUTPUT_COLUMNS if c in predictions.columns]]
+
+    month = pd.to_datetime(rows['dataRegistroVoto'], errors='coerce').groupby(rows['id_votacao']).min()
+    month = month.dt.strftime('%Y-%m').fillna('sem-data')
+    predictions['mes'] = predictions['id_votacao'].map(month)
+    placar['mes'] = placar['id_votacao'].map(month)
+    predictions['prob_sim'] = predictions['prob_sim'].astype(np.float32)
+
+    _write_partitioned(predictions, os.path.join(_worker['output_dir'], 'deputados'), chunk_number)
+    _write_partitioned(placar, os.path.join(_worker['output_dir'], 'placar'), chunk_number)
+    return len(placar), len(predictions)
+
+
+def resolve_votings(selection):
+    """
+    Converte a seleção da linha de comando em ids de votação, na ordem do dataset.
+
+    Cada item é um id, um intervalo 'INICIO:FIM' (inclusive, na ordem cronológica do dataset)
+    ou 'all' para todas as votações.
+    """
+    available = read_dataset(columns=['id_votacao'])['id_votacao'].drop_duplicates().tolist()
+    if 'all' in selection:
+        return available
+    positions = {voting_id: i for i, voting_id in enumerate(available)}
+    selected = []
+    for item in selection:
+        start, _, end = item.partition(':')
+        missing = [v for v in (start, end or start) if v not in positions]
+        if missing:
+            raise ValueError(f"Votação '{missing[0]}' não encontrada no dataset.")
+        selected.extend(available[positions[start]:positions[end or start] + 1])
+    return list(dict.fromkeys(selected))
+
+
+@timed('previsoes.run')
+def run(voting_ids, mode='sessao', output_dir=OUTPUT_DIR, chunk_votings=CHUNK_VOTINGS, workers=None, version=None):
+    """
+    Pontua as votações em lotes de `chunk_votings` por um pool de processos e grava as saídas
+    particionadas em `output_dir/deputados` e `output_dir/placar`.
+
+    No máximo `2 x workers` lotes ficam em andamento: a memória depende do tamanho do lote, não do
+    número de votações pedidas. As saídas são escritas em uma pasta temporária que substitui a
+    anterior só ao final.
+    """
+    bundle = load_bundle(version)
+    if bundle is None:
+        raise FileNotFoundError("nenhum modelo publicado em 'models/registry'")
+    workers = workers or os.cpu_count() or 1
+    historical_features = None
+    if mode == 'plenario':
+        historical_features = read_dataset(columns=['id_deputado', 'pct_sim_historico', 'pct_sim_uf']).drop_duplicates()
+
+    tmp_dir = f"{output_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    chunks = [voting_ids[i:i + chunk_votings] for i in range(0, len(voting_ids), chunk_votings)]
+    done_votings = done_rows = 0
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(bundle.version, mode, historical_features, tmp_dir)) as pool:
+        pending = set()
+        for chunk_number, chunk in enumerate(chunks):
+            if len(pending) >= 2 * workers:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    n_votings, n_rows = future.result()
+                    done_votings, done_rows = done_votings + n_votings, done_rows + n_rows
+                print(f"  {done_votings}/{len(voting_ids)} votações pontuadas...")
+            pending.add(pool.submit(predict_chunk, chunk_number, chunk))
+        for future in pending:
+            n_votings, n_rows = future.result()
+            done_votings, done_rows = done_votings + n_votings, done_rows + n_rows
+
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.replace(tmp_dir, output_dir)
+    return done_votings, done_rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Prevê em lote os votos e o placar de votações do dataset (particionado por mês).")
+    parser.add_argument('votacoes', nargs='+', help="Ids de votação, intervalos 'INICIO:FIM' ou 'all'.")
+    parser.add_argument('--modo', choices=MODES, default='sessao',
+                        help="'sessao': deputados que votaram; 'plenario': todos os deputados em exercício.")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help="Pasta de saída (deputados/ e placar/).")
+    parser.add_argument('--chunk-votings', type=int, default=CHUNK_VOTINGS, help="Votações por lote.")
+    parser.add_argument('--workers', type=int, default=None, help="Processos do pool (padrão: nº de CPUs).")
+    parser.add_argument('--version', default=None, help="Versão do modelo (padrão: a fixada ou CURRENT).")
+    args = parser.parse_args()
+
+    try:
+        voting_ids = resolve_votings(args.votacoes)
+    except FileNotFoundError:
+        print(f"Erro: Arquivo '{DATASET_PATH}' não encontrado. Execute o pipeline de 'src/' primeiro.")
+        exit()
+    except ValueError as e:
+        print(f"Erro: {e}")
+        exit()
+
+    print(f"Pontuando {len(voting_ids)} votações (modo '{args.modo}')...")
+    start = time.perf_counter()
+    try:
+        n_votings, n_rows = run(voting_ids, args.modo, args.output_dir, args.chunk_votings, args.workers, args.version)
+    except FileNotFoundError as e:
+        print(f"Erro: Arquivo não encontrado - {e}. Execute 'train_model.py' primeiro.")
+        exit()
+    print(f"\n✓ {n_votings} votações e {n_rows} previsões em {time.perf_counter() - start:.1f}s. "
+          f"Saídas em '{args.output_dir}/deputados' e '{args.output_dir}/placar'.")
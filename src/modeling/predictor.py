@@ -0,0 +1,198 @@
+# src/modeling/predictor.py
+
+import os
+import numpy as np
+
+from src.utils.timing import timed
+
+# Tamanho padrão dos blocos de linhas enviados ao Booster em cada chamada
+DEFAULT_CHUNK_SIZE = 100_000
+# Mesmo limiar usado pelo LightGBM para tratar um valor como zero (kZeroThreshold)
+ZERO_THRESHOLD = 1e-35
+MISSING_TYPES = {'None': 0, 'Zero': 1, 'NaN': 2}
+
+
+def to_float32_matrix(X):
+    """Converte um DataFrame ou array em uma matriz float32 contígua (sem cópia se já estiver no formato)."""
+    if hasattr(X, 'to_numpy'):
+        X = X.to_numpy(dtype=np.float32)
+    return np.ascontiguousarray(X, dtype=np.float32)
+
+
+class NumpyTreeEnsemble:
+    """
+    Avaliação das árvores do modelo em NumPy puro, usada como fallback quando o
+    Booster do LightGBM não está disponível. Suporta apenas splits numéricos ('<='),
+    que é o que o modelo treinado com dummies produz.
+    """
+
+    ARRAY_NAMES = ('feature', 'threshold', 'left', 'right', 'default_left', 'missing_type', 'value', 'roots',
+                   'max_depth', 'sigmoid')
+
+    def __init__(self, arrays):
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.left = arrays['left']
+        self.right = arrays['right']
+        self.default_left = arrays['default_left']
+        self.missing_type = arrays['missing_type']
+        self.value = arrays['value']
+        self.roots = arrays['roots']
+        self.max_depth = int(arrays['max_depth'])
+        self.sigmoid = float(arrays['sigmoid'])
+
+    @classmethod
+    def from_booster(cls, booster):
+        """Achata todas as árvores do Booster em arrays de nós com índices globais."""
+        dump = booster.dump_model()
+        columns = {key: [] for key in
+                   ('feature', 'threshold', 'left', 'right', 'default_left', 'missing_type', 'value')}
+        roots = []
+        max_depth = 0
+
+        def add_node(node, depth):
+            nonlocal max_depth
+            node_id = len(columns['feature'])
+            for values in columns.values():
+                values.append(0)
+            if 'leaf_value' in node:
+                max_depth = max(max_depth, depth)
+                columns['threshold'][node_id] = np.inf
+                columns['left'][node_id] = node_id
+                columns['right'][node_id] = node_id
+                columns['value'][node_id] = node['leaf_value']
+                return node_id
+            if node['decision_type'] != '<=':
+                raise ValueError(f"Split não suportado pelo fallback NumPy: {node['decision_type']}")
+            columns['feature'][node_id] = node['split_feature']
+            columns['threshold'][node_id] = node['threshold']
+            columns['default_left'][node_id] = node['default_left']
+            columns['missing_type'][node_id] = MISSING_TYPES[node['missing_type']]
+            columns['left'][node_id] = add_node(node['left_child'], depth + 1)
+            columns['right'][node_id] = add_node(node['right_child'], depth + 1)
+            return node_id
+
+        for tree in dump['tree_info']:
+            roots.append(add_node(tree['tree_structure'], 0))
+
+        sigmoid = 1.0
+        for token in dump.get('objective', '').split():
+            if token.startswith('sigmoid:'):
+                sigmoid = float(token.split(':')[1])
+
+        arrays = {
+            'feature': np.asarray(columns['feature'], dtype=np.int32),
+            'threshold': np.asarray(columns['threshold'], dtype=np.float64),
+            'left': np.asarray(columns['left'], dtype=np.int32),
+            'right': np.asarray(columns['right'], dtype=np.int32),
+            'default_left': np.asarray(columns['default_left'], dtype=bool),
+            'missing_type': np.asarray(columns['missing_type'], dtype=np.int8),
+            'value': np.asarray(columns['value'], dtype=np.float64),
+            'roots': np.asarray(roots, dtype=np.int32),
+            'max_depth': np.asarray(max_depth, dtype=np.int32),
+            'sigmoid': np.asarray(sigmoid, dtype=np.float64),
+        }
+        return cls(arrays)
+
+    def save(self, directory):
+        """Salva cada array em um `.npy` próprio, para poder ser lido depois com memory-map."""
+        os.makedirs(directory, exist_ok=True)
+        for name in self.ARRAY_NAMES:
+            np.save(os.path.join(directory, f"{name}.npy"), np.asarray(getattr(self, name)))
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        """
+        Carrega os arrays salvos por `save`. Com `mmap_mode='r'`, os arrays ficam mapeados
+        somente-leitura e o cache de páginas do SO é compartilhado entre processos.
+        """
+        return cls({name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+                    for name in cls.ARRAY_NAMES})
+
+    def predict_raw(self, X, chunk_size=20_000):
+        """Soma das folhas de todas as árvores (margem bruta) para cada linha de X."""
+        X = to_float32_matrix(X)
+        raw = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), chunk_size):
+            chunk = X[start:start + chunk_size]
+            rows = np.arange(len(chunk))[:, None]
+            nodes = np.broadcast_to(self.roots, (len(chunk), len(self.roots))).copy()
+            for _ in range(self.max_depth):
+                if (self.left[nodes] == nodes).all():
+                    break
+                values = chunk[rows, self.feature[nodes]].astype(np.float64)
+                missing_type = self.missing_type[nodes]
+                is_nan = np.isnan(values)
+                values[is_nan & (missing_type != 2)] = 0.0
+                is_missing = ((missing_type == 1) & (np.abs(values) <= ZERO_THRESHOLD)) | ((missing_type == 2) & is_nan)
+                go_left = np.where(is_missing, self.default_left[nodes], values <= self.threshold[nodes])
+                nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+            raw[start:start + chunk_size] = self.value[nodes].sum(axis=1)
+        return raw
+
+    def predict(self, X, chunk_size=20_000):
+        """Probabilidade da classe positiva para cada linha de X."""
+        return 1.0 / (1.0 + np.exp(-self.sigmoid * self.predict_raw(X, chunk_size)))
+
+
+class FastPredictor:
+    """
+    Preditor em lote que chama o Booster do LightGBM diretamente com matrizes float32
+    contíguas, evitando a validação e conversão de DataFrames feitas pelo LGBMClassifier.
+    """
+
+    def __init__(self, booster, classes, num_threads=0, chunk_size=DEFAULT_CHUNK_SIZE, use_numpy=False,
+                 numpy_ensemble=None):
+        """
+        Args:
+            booster (lightgbm.Booster): O Booster do modelo treinado (pode ser None com `numpy_ensemble`).
+            classes (array-like): Classes do LabelEncoder (ex: ['Não', 'Sim']).
+            num_threads (int): Threads usadas pelo LightGBM (0 = padrão do OpenMP).
+            chunk_size (int): Número máximo de linhas por chamada ao Booster.
+            use_numpy (bool): Usa a avaliação em NumPy puro em vez do Booster.
+            numpy_ensemble (NumpyTreeEnsemble, opcional): Árvores já achatadas (ex: lidas com
+                memory-map de um bundle); implica `use_numpy=True`.
+        """
+        self.booster = booster
+        self.classes = np.asarray(classes)
+        self.num_threads = num_threads
+        self.chunk_size = chunk_size
+        self.num_features = booster.num_feature() if booster is not None else None
+        if numpy_ensemble is None and use_numpy:
+            numpy_ensemble = NumpyTreeEnsemble.from_booster(booster)
+        self._numpy_ensemble = numpy_ensemble
+
+    @classmethod
+    def from_joblib(cls, model_path='models/lgbm_model.joblib', encoder_path='models/label_encoder.joblib', **kwargs):
+        """Carrega o modelo e o encoder salvos pelo `train_model.py` uma única vez."""
+        import joblib
+        model = joblib.load(model_path)
+        encoder = joblib.load(encoder_path)
+        return cls(model.booster_, encoder.classes_, **kwargs)
+
+    @timed('modelo.predict')
+    def predict_positive(self, X):
+        """Probabilidade da classe positiva (`classes[1]`, ex: 'Sim') para cada linha."""
+        X = to_float32_matrix(X)
+        if X.ndim != 2 or (self.num_features is not None and X.shape[1] != self.num_features):
+            raise ValueError(f"Esperadas {self.num_features} features, recebido shape {X.shape}.")
+
+        if self._numpy_ensemble is not None:
+            return self._numpy_ensemble.predict(X)
+
+        if len(X) <= self.chunk_size:
+            return self.booster.predict(X, num_threads=self.num_threads)
+        output = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), self.chunk_size):
+            output[start:start + self.chunk_size] = self.booster.predict(
+                X[start:start + self.chunk_size], num_threads=self.num_threads)
+        return output
+
+    def predict_proba(self, X):
+        """Matriz (n, 2) de probabilidades, na mesma ordem de `classes` (como no sklearn)."""
+        positive = self.predict_positive(X)
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X):
+        """Rótulos previstos (ex: 'Sim'/'Não') para cada linha."""
+        return self.classes[(self.predict_positive(X) > 0.5).astype(int)]
@@ -0,0 +1,186 @@
+# src/modeling/registry.py
+
+import argparse
+import json
+import os
+import shutil
+from datetime import datetime
+
+from src.modeling.predictor import FastPredictor, NumpyTreeEnsemble
+
+REGISTRY_DIR = 'models/registry'
+CURRENT_POINTER = os.path.join(REGISTRY_DIR, 'CURRENT')
+# Permite fixar uma versão do modelo por processo (ex: em um deploy) sem mexer no ponteiro
+VERSION_ENV_VAR = 'PLENARIO_MODEL_VERSION'
+
+
+def list_versions():
+    """
+    Retorna as versões publicadas no registro, da mais antiga para a mais recente. Diretórios
+    `.tmp` (publicações em andamento ou interrompidas) nunca são versões.
+    """
+    if not os.path.isdir(REGISTRY_DIR):
+        return []
+    return sorted(name for name in os.listdir(REGISTRY_DIR)
+                  if not name.endswith('.tmp') and os.path.isfile(os.path.join(REGISTRY_DIR, name, 'metadata.json')))
+
+
+def current_version():
+    """Lê a versão apontada por `CURRENT`, ou None se nada foi publicado ainda."""
+    try:
+        with open(CURRENT_POINTER, encoding='utf-8') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def set_current(version):
+    """Aponta `CURRENT` para uma versão existente, de forma atômica (arquivo temporário + rename)."""
+    if version not in list_versions():
+        raise ValueError(f"Versão '{version}' não encontrada em '{REGISTRY_DIR}'.")
+    tmp_path = f"{CURRENT_POINTER}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(version)
+    os.replace(tmp_path, CURRENT_POINTER)
+
+
+def resolve_version(version=None):
+    """Resolve a versão a usar: a informada, a fixada via variável de ambiente ou a `CURRENT`."""
+    return version or os.environ.get(VERSION_ENV_VAR) or current_version()
+
+
+def publish_bundle(model, le, feature_columns, metadata, make_current=True):
+    """
+    Publica um bundle versionado com tudo o que a inferência precisa.
+
+    O bundle é escrito em um diretório temporário e renomeado ao final, então leitores
+    nunca veem um bundle pela metade.
+
+    Args:
+        model (lightgbm.LGBMClassifier): O modelo treinado.
+        le (sklearn.preprocessing.LabelEncoder): O encoder da variável alvo.
+        feature_columns (list): As colunas da matriz de features, na ordem do treino.
+        metadata (dict): Metadados do treino (acurácia, linhas, modo, etc.).
+        make_current (bool): Se True, aponta `CURRENT` para a nova versão.
+
+    Returns:
+        str: A versão publicada.
+    """
+    version = datetime.now().strftime('%Y%m%d-%H%M%S')
+    if os.path.exists(os.path.join(REGISTRY_DIR, version)):
+        version = f"{version}-{len(list_versions())}"
+    bundle_dir = os.path.join(REGISTRY_DIR, version)
+    tmp_dir = f"{bundle_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    booster = model.booster_
+    booster.save_model(os.path.join(tmp_dir, 'model.txt'))
+    NumpyTreeEnsemble.from_booster(booster).save(os.path.join(tmp_dir, 'trees'))
+    with open(os.path.join(tmp_dir, 'encoder_classes.json'), 'w', encoding='utf-8') as f:
+        json.dump([str(c) for c in le.classes_], f, ensure_ascii=False)
+    with open(os.path.join(tmp_dir, 'feature_columns.json'), 'w', encoding='utf-8') as f:
+        json.dump(list(feature_columns), f, ensure_ascii=False)
+    # O metadata.json é escrito por último: um bundle sem ele não é listado como versão
+    with open(os.path.join(tmp_dir, 'metadata.json'), 'w', encoding='utf-8') as f:
+        json.dump({'version': version, **metadata}, f, ensure_ascii=False, indent=2)
+
+    os.rename(tmp_dir, bundle_dir)
+    if make_current:
+        set_current(version)
+    print(f"Bundle do modelo publicado em '{bundle_dir}'.")
+    return version
+
+
+class ModelBundle:
+    """
+    Um bundle versionado do registro. Nada é lido do disco até ser usado: o Booster é
+    carregado no primeiro acesso e as árvores achatadas são lidas com memory-map, de modo
+    que vários processos compartilham a mesma cópia no cache de páginas do SO.
+    """
+
+    def __init__(self, version):
+        self.version = version
+        self.path = os.path.join(REGISTRY_DIR, version)
+        if not os.path.isdir(self.path):
+            raise FileNotFoundError(f"Bundle '{self.path}' não encontrado.")
+        self._cache = {}
+
+    def _read_json(self, name):
+        if name not in self._cache:
+            with open(os.path.join(self.path, name), encoding='utf-8') as f:
+                self._cache[name] = json.load(f)
+        return self._cache[name]
+
+    @property
+    def metadata(self):
+        return self._read_json('metadata.json')
+
+    @property
+    def classes(self):
+        return self._read_json('encoder_classes.json')
+
+    @property
+    def feature_columns(self):
+        return self._read_json('feature_columns.json')
+
+    def class_index(self, label):
+        """Posição de uma classe (ex: 'Sim') nas colunas de `predict_proba`."""
+        return self.classes.index(label)
+
+    @property
+    def booster(self):
+        if 'booster' not in self._cache:
+            import lightgbm as lgb
+            self._cache['booster'] = lgb.Booster(model_file=os.path.join(self.path, 'model.txt'))
+        return self._cache['booster']
+
+    @property
+    def tree_ensemble(self):
+        if 'tree_ensemble' not in self._cache:
+            self._cache['tree_ensemble'] = NumpyTreeEnsemble.load(os.path.join(self.path, 'trees'))
+        return self._cache['tree_ensemble']
+
+    @property
+    def predictor(self):
+        """FastPredictor sobre o Booster deste bundle."""
+        if 'predictor' not in self._cache:
+            self._cache['predictor'] = FastPredictor(self.booster, self.classes)
+        return self._cache['predictor']
+
+    def numpy_predictor(self):
+        """FastPredictor que avalia as árvores mapeadas em memória, sem o LightGBM."""
+        return FastPredictor(None, self.classes, numpy_ensemble=self.tree_ensemble)
+
+
+def load_bundle(version=None):
+    """
+    Carrega (de forma preguiçosa) o bundle da versão informada, fixada ou `CURRENT`.
+
+    Returns:
+        ModelBundle: O bundle, ou None se o registro estiver vazio.
+    """
+    resolved = resolve_version(version)
+    if resolved is None:
+        return None
+    return ModelBundle(resolved)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gerencia as versões do modelo em 'models/registry'.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('list', help="Lista as versões publicadas.")
+    use_parser = subparsers.add_parser('use', help="Aponta CURRENT para uma versão (hot-swap).")
+    use_parser.add_argument('version')
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        current = current_version()
+        for version in list_versions():
+            metadata = ModelBundle(version).metadata
+            marker = '*' if version == current else ' '
+            print(f"{marker} {version} | modo: {metadata.get('mode', '-')} | "
+                  f"acurácia: {metadata.get('accuracy', float('nan')):.4f} | linhas: {metadata.get('rows', '-')}")
+    elif args.command == 'use':
+        set_current(args.version)
+        print(f"CURRENT agora aponta para '{args.version}'.")
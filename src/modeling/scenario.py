@@ -0,0 +1,187 @@
+# src/modeling/scenario.py
+
+import numpy as np
+import pandas as pd
+
+from src.modeling.approval import approval_summary
+from src.modeling.features import BLOCOS, build_feature_matrix, define_posicao
+from src.modeling.predictor import to_float32_matrix
+from src.utils.timing import timed
+
+# Valor neutro usado quando não há expectativa de coesão para um partido ou bloco
+NEUTRAL_COHESION = 0.5
+# Features que dependem da votação; todas as outras são fixas por deputado
+PARTY_FEATURE = 'pct_sim_na_votacao'
+BLOC_FEATURE = 'pct_sim_posicao_votacao'
+
+
+def build_deputy_frame(deputies_master, dataset):
+    """
+    Uma linha por deputado em exercício com as features que não dependem da votação:
+    dados demográficos, `pct_sim_historico`, `pct_sim_uf` e `posicao_governo`.
+    Deputados sem histórico recebem o valor neutro.
+    """
+    historical_features = dataset.drop_duplicates('id_deputado')[['id_deputado', 'pct_sim_historico', 'pct_sim_uf']]
+    frame = pd.merge(deputies_master, historical_features, on='id_deputado', how='left')
+    frame[['pct_sim_historico', 'pct_sim_uf']] = frame[['pct_sim_historico', 'pct_sim_uf']].fillna(NEUTRAL_COHESION)
+    frame['posicao_governo'] = frame['partido'].apply(define_posicao)
+    frame[PARTY_FEATURE] = NEUTRAL_COHESION
+    frame[BLOC_FEATURE] = NEUTRAL_COHESION
+    return frame.reset_index(drop=True)
+
+
+def apply_priors(party_cohesion=None, bloc_cohesion=None, priors=None):
+    """
+    Combina um cenário com coesões iniciais (ex: de votações parecidas, `similar_voting_priors`).
+
+    Blocos sem valor no cenário usam o prior. Partidos com prior acompanham o ajuste do seu
+    bloco (prior do partido + diferença entre o bloco no cenário e o prior do bloco), e valores
+    informados explicitamente para um partido sempre prevalecem.
+
+    Returns:
+        tuple[dict, dict]: (party_cohesion, bloc_cohesion) finais.
+    """
+    party_prior, bloc_prior = priors or ({}, {})
+    blocs = {**bloc_prior, **(bloc_cohesion or {})}
+    parties = {}
+    for party, value in party_prior.items():
+        bloc = define_posicao(party)
+        shift = blocs.get(bloc, NEUTRAL_COHESION) - bloc_prior.get(bloc, NEUTRAL_COHESION)
+        parties[party] = min(max(value + shift, 0.0), 1.0)
+    parties.update(party_cohesion or {})
+    return parties, blocs
+
+
+class ScenarioEngine:
+    """
+    Motor de cenários hipotéticos ("e se?") para uma votação que ainda não aconteceu.
+
+    A parte fixa da matriz de features (uma linha por deputado) é montada uma única vez;
+    cada cenário só preenche as duas colunas que dependem da votação — a coesão esperada do
+    partido (`pct_sim_na_votacao`) e do bloco (`pct_sim_posicao_votacao`) — e chama o preditor.
+    Um partido sem coesão própria no cenário herda a coesão esperada do seu bloco.
+    """
+
+    @timed('cenario.build')
+    def __init__(self, bundle, deputies_master, dataset):
+        self.bundle = bundle
+        self.deputies = build_deputy_frame(deputies_master, dataset)
+        self._X = to_float32_matrix(build_feature_matrix(self.deputies, bundle.feature_columns))
+        self._party_column = bundle.feature_columns.index(PARTY_FEATURE)
+        self._bloc_column = bundle.feature_columns.index(BLOC_FEATURE)
+
+        self.parties = sorted(self.deputies['partido'].dropna().unique())
+        self._party_codes = pd.Categorical(self.deputies['partido'], categories=self.parties).codes
+        self._bloc_codes = pd.Categorical(self.deputies['posicao_governo'], categories=BLOCOS).codes
+        self._party_bloc = np.array([BLOCOS.index(define_posicao(p)) for p in self.parties])
+
+        # Coesão observada de cada partido e bloco em cada votação passada (votações x partidos/blocos)
+        votings = dataset.assign(id_votacao=dataset['id_votacao'].astype(str))
+        self._party_history = votings.groupby(['id_votacao', 'partido'])[PARTY_FEATURE].first().unstack()
+        self._bloc_history = votings.groupby(['id_votacao', 'posicao_governo'])[BLOC_FEATURE].first().unstack()
+
+    def cohesion_columns(self, party_cohesion=None, bloc_cohesion=None):
+        """
+        Valores das duas features da votação para cada deputado em um cenário.
+
+        Args:
+            party_cohesion (dict, opcional): % de 'Sim' esperado por partido (ex: {'PT': 0.9}).
+            bloc_cohesion (dict, opcional): % de 'Sim' esperado por bloco (ex: {'Governo': 0.8}).
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: (`pct_sim_na_votacao`, `pct_sim_posicao_votacao`).
+        """
+        bloc_cohesion = bloc_cohesion or {}
+        party_cohesion = party_cohesion or {}
+        bloc_values = np.array([bloc_cohesion.get(b, NEUTRAL_COHESION) for b in BLOCOS], dtype=np.float32)
+        party_values = bloc_values[self._party_bloc]
+        for i, party in enumerate(self.parties):
+            if party in party_cohesion:
+                party_values[i] = party_cohesion[party]
+        return party_values[self._party_codes], bloc_values[self._bloc_codes]
+
+    def similar_voting_priors(self, similar):
+        """
+        Coesões iniciais de um cenário a partir de votações passadas parecidas.
+
+        Args:
+            similar (pd.DataFrame): Colunas `id_votacao` e `similaridade` (ex: `EmentaIndex.search`).
+
+        Returns:
+            tuple[dict, dict]: (party_cohesion, bloc_cohesion) com a média das coesões observadas
+            nessas votações, ponderada pela similaridade. Vazios se não houver votações parecidas.
+        """
+        weights = similar.set_index('id_votacao')['similaridade']
+        weights = weights[weights.index.isin(self._party_history.index)]
+        if weights.empty:
+            return {}, {}
+
+        def weighted_mean(history):
+            values = history.loc[weights.index]
+            present = values.notna()
+            total = present.mul(weights, axis=0).sum()
+            mean = values.fillna(0).mul(weights, axis=0).sum() / total.where(total > 0)
+            return {key: float(value) for key, value in mean.dropna().items()}
+
+        return weighted_mean(self._party_history), weighted_mean(self._bloc_history)
+
+    def feature_matrix(self, party_cohesion=None, bloc_cohesion=None):
+        """Matriz float32 (deputados x features) de um cenário, pronta para o preditor."""
+        X = self._X.copy()
+        X[:, self._party_column], X[:, self._bloc_column] = self.cohesion_columns(party_cohesion, bloc_cohesion)
+        return X
+
+    def score(self, party_cohesion=None, bloc_cohesion=None):
+        """P(Sim) de cada deputado (na ordem de `deputies`) em um cenário."""
+        return self.score_grid([(party_cohesion, bloc_cohesion)])[0]
+
+    @timed('cenario.score_grid')
+    def score_grid(self, scenarios):
+        """
+        Avalia vários cenários em uma única chamada ao preditor (ex: tabelas de sensibilidade).
+
+        Args:
+            scenarios (list): Pares (party_cohesion, bloc_cohesion), como em `cohesion_columns`.
+
+        Returns:
+            numpy.ndarray: P(Sim) com shape (cenários, deputados).
+        """
+        n_deputies = len(self._X)
+        X = np.tile(self._X, (len(scenarios), 1))
+        for i, (party_cohesion, bloc_cohesion) in enumerate(scenarios):
+            rows = slice(i * n_deputies, (i + 1) * n_deputies)
+            X[rows, self._party_column], X[rows, self._bloc_column] = \
+                self.cohesion_columns(party_cohesion, bloc_cohesion)
+        prob_sim = self.bundle.predictor.predict_positive(X)
+        return prob_sim.reshape(len(scenarios), n_deputies)
+
+    def predict(self, party_cohesion=None, bloc_cohesion=None):
+        """Os deputados com `prob_sim` e `voto_previsto` no cenário informado."""
+        results = self.deputies.copy()
+        results['prob_sim'] = self.score(party_cohesion, bloc_cohesion)
+        results['voto_previsto'] = np.where(results['prob_sim'] > 0.5, 'Sim', 'Não')
+        return results
+
+    def sensitivity_table(self, row_bloc, column_bloc, levels, bloc_cohesion=None, party_cohesion=None,
+                          priors=None, metric='prob_maioria_absoluta'):
+        """
+        Tabela de sensibilidade de uma métrica de `approval_summary` variando a coesão de dois blocos.
+
+        Args:
+            row_bloc (str): Bloco variado nas linhas (ex: 'Governo').
+            column_bloc (str): Bloco variado nas colunas (ex: 'Oposição').
+            levels (list): Níveis de coesão avaliados para os dois blocos (ex: [0, 0.25, 0.5, 0.75, 1]).
+            bloc_cohesion (dict, opcional): Coesão dos demais blocos, mantida fixa.
+            party_cohesion (dict, opcional): Coesões por partido, mantidas fixas.
+            priors (tuple, opcional): Coesões iniciais aplicadas a cada cenário (ver `apply_priors`).
+            metric (str): Chave de `approval_summary` (ex: 'votos_sim_esperados').
+
+        Returns:
+            pandas.DataFrame: A métrica para cada combinação (linhas = `row_bloc`, colunas = `column_bloc`).
+        """
+        base = dict(bloc_cohesion or {})
+        scenarios = [apply_priors(party_cohesion, {**base, row_bloc: row_level, column_bloc: column_level}, priors)
+                     for row_level in levels for column_level in levels]
+        values = approval_summary(self.score_grid(scenarios))[metric]
+        return pd.DataFrame(np.asarray(values).reshape(len(levels), len(levels)),
+                            index=pd.Index(levels, name=row_bloc), columns=pd.Index(levels, name=column_bloc))
@@ -0,0 +1,131 @@
+# src/modeling/score_pauta.py
+
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+from src.data_collection.api_client import save_to_parquet
+from src.modeling.approval import approval_summary
+from src.modeling.features import BLOCOS
+from src.modeling.registry import load_bundle
+from src.modeling.ementa_index import EmentaIndex
+from src.modeling.scenario import ScenarioEngine, apply_priors
+from src.utils.timing import timed
+
+DATASET_PATH = 'data/processed/modeling_dataset_enriched.parquet'
+DEPUTIES_PATH = 'data/processed/deputies_master_table.parquet'
+OUTPUT_DIR = 'data/processed/pauta'
+# Colunas opcionais com a coesão esperada (% de 'Sim', de 0 a 1) de um bloco ou partido: 'coesao_<nome>'
+COHESION_PREFIX = 'coesao_'
+
+
+def read_pauta(source, name=None):
+    """
+    Lê a pauta (uma proposição por linha) de um CSV ou parquet.
+
+    Colunas esperadas: `ementa` (ou `proposicao_ementa`), opcionalmente `item` como
+    identificador e colunas `coesao_<bloco ou partido>` com os priors de coesão.
+
+    Args:
+        source (str | file-like): Caminho ou arquivo enviado (ex: `st.file_uploader`).
+        name (str, opcional): Nome do arquivo, usado para detectar o formato de um file-like.
+    """
+    name = name or str(source)
+    pauta = pd.read_parquet(source) if name.lower().endswith('.parquet') else pd.read_csv(source)
+    pauta = pauta.rename(columns={'proposicao_ementa': 'ementa'})
+    if 'ementa' not in pauta.columns:
+        raise ValueError("A pauta precisa de uma coluna 'ementa' (ou 'proposicao_ementa').")
+    if 'item' not in pauta.columns:
+        pauta.insert(0, 'item', np.arange(1, len(pauta) + 1))
+    return pauta.reset_index(drop=True)
+
+
+def pauta_scenarios(pauta, engine=None, index=None):
+    """
+    Converte as colunas `coesao_<nome>` de cada item em pares (party_cohesion, bloc_cohesion).
+
+    Com um `EmentaIndex`, as coesões das votações passadas mais parecidas com cada ementa são
+    usadas como ponto de partida, e as colunas `coesao_<nome>` ajustam esse cenário.
+    """
+    cohesion_columns = [c for c in pauta.columns if c.startswith(COHESION_PREFIX)]
+    scenarios = []
+    for (_, row), ementa in zip(pauta[cohesion_columns].iterrows(), pauta['ementa']):
+        party_cohesion, bloc_cohesion = {}, {}
+        for column, value in row.dropna().items():
+            name = column[len(COHESION_PREFIX):]
+            (bloc_cohesion if name in BLOCOS else party_cohesion)[name] = float(value)
+        priors = engine.similar_voting_priors(index.search(str(ementa))) if index is not None else None
+        scenarios.append(apply_priors(party_cohesion, bloc_cohesion, priors))
+    return scenarios
+
+
+@timed('pauta.score_pauta')
+def score_pauta(engine, pauta, index=None):
+    """
+    Prevê todos os itens da pauta x todos os deputados em uma única chamada ao preditor.
+
+    Args:
+        engine (ScenarioEngine): O motor de cenários (parte fixa da matriz já montada).
+        pauta (pd.DataFrame): A pauta, como retornada por `read_pauta`.
+        index (EmentaIndex, opcional): Índice de ementas usado para os priors de coesão.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: O placar previsto por item e as previsões por deputado.
+    """
+    prob_sim = engine.score_grid(pauta_scenarios(pauta, engine, index))
+    approval = approval_summary(prob_sim)
+
+    placar = pauta[['item', 'ementa']].copy()
+    placar['votos_sim_previstos'] = (prob_sim > 0.5).sum(axis=1)
+    placar['votos_nao_previstos'] = prob_sim.shape[1] - placar['votos_sim_previstos']
+    for key in ('votos_sim_esperados', 'intervalo_inferior', 'intervalo_superior', 'prob_maioria_simples',
+                'prob_maioria_absoluta', 'prob_maioria_constitucional'):
+        placar[key] = approval[key]
+
+    deputies = engine.deputies[['id_deputado', 'nome_urna', 'partido', 'uf', 'posicao_governo']]
+    predictions = pd.DataFrame({
+        'item': np.repeat(pauta['item'].values, len(deputies)),
+        **{column: np.tile(deputies[column].values, len(pauta)) for column in deputies.columns},
+        'prob_sim': prob_sim.ravel().astype(np.float32),
+    })
+    predictions['voto_previsto'] = np.where(predictions['prob_sim'] > 0.5, 'Sim', 'Não')
+    return placar, predictions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prevê o placar de todos os itens de uma pauta (CSV ou parquet).")
+    parser.add_argument('pauta', help="Arquivo com uma proposição por linha (coluna 'ementa').")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help="Pasta de saída dos arquivos parquet.")
+    args = parser.parse_args()
+
+    bundle = load_bundle()
+    if bundle is None:
+        print("Erro: nenhum modelo publicado em 'models/registry'. Execute 'train_model.py' primeiro.")
+        exit()
+
+    try:
+        pauta = read_pauta(args.pauta)
+    except FileNotFoundError:
+        print(f"Erro: Arquivo '{args.pauta}' não encontrado.")
+        exit()
+    except ValueError as e:
+        print(f"Erro: {e}")
+        exit()
+    print(f"Pauta carregada: {len(pauta)} itens.")
+
+    try:
+        deputies_master = pd.read_parquet(DEPUTIES_PATH)
+        dataset = pd.read_parquet(DATASET_PATH)
+    except FileNotFoundError as e:
+        print(f"Erro: Arquivo '{e.filename}' não encontrado. Execute o pipeline de 'src/' primeiro.")
+        exit()
+    engine = ScenarioEngine(bundle, deputies_master, dataset)
+    index = EmentaIndex.load()
+    if index is None:
+        print("Índice de ementas não encontrado; usando cenário neutro para os itens sem 'coesao_*'.")
+    placar, predictions = score_pauta(engine, pauta, index)
+
+    save_to_parquet(placar, os.path.join(args.output_dir, 'placar.parquet'))
+    save_to_parquet(predictions, os.path.join(args.output_dir, 'deputados.parquet'))
+    print(placar[['item', 'votos_sim_previstos', 'votos_nao_previstos', 'prob_maioria_absoluta']].to_string(index=False))
@@ -1,5 +1,7 @@
 # src/modeling/train_model.py
 
+import argparse
+from datetime import datetime
 import pandas as pd
 import numpy as np
 import lightgbm as lgb
@@ -9,63 +11,172 @@ from sklearn.metrics import accuracy_score, classification_report, confusion_mat
 import joblib
 import os
 
-if __name__ == "__main__":
-    print("Iniciando o pipeline de treinamento do modelo (otimizado, sem NLP)...")
+from src.modeling.features import CATEGORICAL_FEATURES, build_feature_matrix
+from src.modeling.registry import current_version, publish_bundle
+from src.utils.timing import timed
 
-    # 1. Carregar o dataset enriquecido
-    try:
-        df = pd.read_parquet('data/processed/modeling_dataset_enriched.parquet')
-        print(f"Dataset enriquecido carregado: {len(df)} linhas.\n")
-    except FileNotFoundError:
-        print("Erro: Arquivo 'data/processed/modeling_dataset_enriched.parquet' não encontrado.")
-        print("Execute o script 'enrich_behavioral_features.py' primeiro.")
-        exit()
+MODEL_PATH = 'models/lgbm_model.joblib'
+ENCODER_PATH = 'models/label_encoder.joblib'
+FEATURE_COLUMNS_PATH = 'models/feature_columns.joblib'
+TRAINED_VOTINGS_PATH = 'models/trained_votings.joblib'
+
+# Rodadas de boosting adicionadas a cada atualização incremental
+INCREMENTAL_ROUNDS = 25
+# Queda máxima de acurácia (na validação das votações novas) tolerada antes do retreino completo
+ACCURACY_TOLERANCE = 0.005
+# Mínimo de votos novos para a atualização incremental (abaixo disso não há validação confiável)
+MIN_INCREMENTAL_ROWS = 20
+
+
+def save_artifacts(model, le, feature_columns, trained_votings, metadata):
+    """
+    Salva o modelo, o encoder, as colunas de features e as votações já usadas no treino,
+    e publica um bundle versionado no registro (`models/registry`).
+    """
+    os.makedirs('models', exist_ok=True)
+    joblib.dump(model, MODEL_PATH)
+    joblib.dump(le, ENCODER_PATH)
+    joblib.dump(feature_columns, FEATURE_COLUMNS_PATH)
+    joblib.dump(sorted(trained_votings), TRAINED_VOTINGS_PATH)
+    publish_bundle(model, le, feature_columns, {
+        'trained_at': datetime.now().isoformat(timespec='seconds'),
+        'votings': len(trained_votings),
+        'params': {k: v for k, v in model.get_params().items() if isinstance(v, (int, float, str, bool, type(None)))},
+        **metadata,
+    })
+    print("Modelo e artefatos salvos na pasta 'models/'.\n")
 
-    # 2. Preparar os dados
-    target = 'tipoVoto'
-    df['escolaridade'] = df['escolaridade'].fillna('Não Informado')
 
+@timed('treino.train_full')
+def train_full(df, target='tipoVoto'):
+    """Treina o modelo do zero com todo o dataset enriquecido."""
     # --- Feature Engineering (Apenas Features Comportamentais e Demográficas) ---
     print("Preparando features para o modelo...")
-    X = pd.get_dummies(
-        df[['partido', 'posicao_governo', 'uf', 'escolaridade']],
-        drop_first=True
-    )
-    X['idade'] = df['idade'].values
-    X['pct_sim_historico'] = df['pct_sim_historico'].values
-    X['pct_sim_na_votacao'] = df['pct_sim_na_votacao'].values
-    X['pct_sim_uf'] = df['pct_sim_uf'].values
-    X['pct_sim_posicao_votacao'] = df['pct_sim_posicao_votacao'].values
-
-    faixa_idade = pd.cut(df['idade'], bins=[0, 30, 40, 50, 60, 100], labels=['18-30', '31-40', '41-50', '51-60', '60+'])
-    X_faixa = pd.get_dummies(faixa_idade, prefix='faixa_idade', drop_first=True)
-    X = pd.concat([X, X_faixa], axis=1)
+    X = build_feature_matrix(df)
     print(f"Total de features utilizadas: {X.shape[1]}\n")
 
-    # 3. Codificar a variável alvo
+    # Codificar a variável alvo
     le = LabelEncoder()
     y_encoded = le.fit_transform(df[target])
 
-    # 4. Dividir os dados
+    # Dividir os dados
     X_train, X_test, y_train, y_test = train_test_split(
         X, y_encoded, test_size=0.2, random_state=42, stratify=y_encoded
     )
 
-    # 5. Treinar o modelo
+    # Treinar o modelo
     print("Treinando o modelo LightGBM final...")
     model = lgb.LGBMClassifier(random_state=42, class_weight='balanced', verbose=-1)
     model.fit(X_train, y_train)
     print("Treinamento concluído.\n")
 
-    # 6. Salvar artefatos (sem o TfidfVectorizer)
-    os.makedirs('models', exist_ok=True)
-    joblib.dump(model, 'models/lgbm_model.joblib')
-    joblib.dump(le, 'models/label_encoder.joblib')
-    joblib.dump(X.columns.tolist(), 'models/feature_columns.joblib')
-    print("Modelo e artefatos salvos na pasta 'models/'.\n")
-
-    # 7. Avaliar
+    # Avaliar
     y_pred_test = model.predict(X_test)
+    accuracy = accuracy_score(y_test, y_pred_test)
+
+    # Salvar artefatos (sem o TfidfVectorizer)
+    save_artifacts(model, le, X.columns.tolist(), set(df['id_votacao'].astype(str)),
+                   {'mode': 'full', 'rows': len(df), 'accuracy': accuracy})
+
     print("=" * 60, "\nRESULTADOS DO MODELO FINAL\n", "=" * 60)
-    print(f"Acurácia no Teste:  {accuracy_score(y_test, y_pred_test):.4f}\n")
-    print(classification_report(y_test, y_pred_test, target_names=le.classes_))
\ No newline at end of file
+    print(f"Acurácia no Teste:  {accuracy:.4f}\n")
+    print(classification_report(y_test, y_pred_test, target_names=le.classes_))
+
+
+@timed('treino.train_incremental')
+def train_incremental(df, target='tipoVoto'):
+    """
+    Continua o boosting do modelo salvo (`init_model`) usando apenas as votações ainda
+    não vistas no treino. Recorre ao retreino completo quando não há modelo anterior,
+    quando surgem categorias ou rótulos novos (ex: um partido novo), quando os votos novos
+    são poucos ou não trazem ao menos dois exemplos de cada classe (ex: uma única votação
+    unânime) ou quando a acurácia na validação das votações novas cai em relação ao modelo
+    anterior.
+    """
+    try:
+        previous_model = joblib.load(MODEL_PATH)
+        le = joblib.load(ENCODER_PATH)
+        feature_columns = joblib.load(FEATURE_COLUMNS_PATH)
+        trained_votings = set(joblib.load(TRAINED_VOTINGS_PATH))
+    except FileNotFoundError:
+        print("Nenhum modelo anterior com histórico de votações encontrado. Executando retreino completo...\n")
+        return train_full(df, target)
+
+    is_new = ~df['id_votacao'].astype(str).isin(trained_votings)
+    new_df = df[is_new]
+    if new_df.empty:
+        print("Nenhuma votação nova desde o último treino. O modelo está atualizado.")
+        return
+
+    print(f"{new_df['id_votacao'].nunique()} votações novas ({len(new_df)} votos) encontradas.")
+
+    # Categorias novas mudam o esquema de features e exigem um modelo novo
+    known_df = df[~is_new]
+    for column in CATEGORICAL_FEATURES:
+        unseen = set(new_df[column].dropna()) - set(known_df[column].dropna())
+        if unseen:
+            print(f"Categorias novas em '{column}': {sorted(unseen)}. Executando retreino completo...\n")
+            return train_full(df, target)
+
+    unseen_labels = set(new_df[target].dropna()) - set(le.classes_)
+    if unseen_labels:
+        print(f"Rótulos novos em '{target}': {sorted(unseen_labels)}. Executando retreino completo...\n")
+        return train_full(df, target)
+
+    # O boosting continuado precisa de todas as classes do encoder no lote de atualização e na
+    # validação; com uma classe só, o classificador passaria a prever apenas ela
+    y_new = le.transform(new_df[target])
+    if len(new_df) < MIN_INCREMENTAL_ROWS or np.bincount(y_new, minlength=len(le.classes_)).min() < 2:
+        print(f"Votos novos insuficientes para a atualização incremental (mínimo de {MIN_INCREMENTAL_ROWS} "
+              "votos e 2 de cada classe). Executando retreino completo...\n")
+        return train_full(df, target)
+
+    X_new = build_feature_matrix(new_df, feature_columns)
+    X_update, X_val, y_update, y_val = train_test_split(
+        X_new, y_new, test_size=0.2, random_state=42, stratify=y_new
+    )
+
+    baseline_accuracy = accuracy_score(y_val, previous_model.predict(X_val))
+
+    print(f"Continuando o boosting do modelo existente por {INCREMENTAL_ROUNDS} rodadas...")
+    params = previous_model.get_params()
+    params['n_estimators'] = INCREMENTAL_ROUNDS
+    model = lgb.LGBMClassifier(**params)
+    model.fit(X_update, y_update, init_model=previous_model.booster_)
+
+    updated_accuracy = accuracy_score(y_val, model.predict(X_val))
+    print(f"Acurácia na validação (votações novas): anterior {baseline_accuracy:.4f} | "
+          f"atualizado {updated_accuracy:.4f}\n")
+
+    if updated_accuracy < baseline_accuracy - ACCURACY_TOLERANCE:
+        print("A atualização incremental piorou o modelo. Executando retreino completo...\n")
+        return train_full(df, target)
+
+    save_artifacts(model, le, feature_columns, trained_votings | set(new_df['id_votacao'].astype(str)),
+                   {'mode': 'incremental', 'rows': len(new_df), 'accuracy': updated_accuracy,
+                    'parent_version': current_version()})
+    print("Atualização incremental concluída.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Treina o modelo LightGBM de previsão de votos.")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Continua o boosting do modelo salvo usando apenas as votações novas.")
+    args = parser.parse_args()
+
+    print("Iniciando o pipeline de treinamento do modelo (otimizado, sem NLP)...")
+
+    # 1. Carregar o dataset enriquecido
+    try:
+        df = pd.read_parquet('data/processed/modeling_dataset_enriched.parquet')
+        print(f"Dataset enriquecido carregado: {len(df)} linhas.\n")
+    except FileNotFoundError:
+        print("Erro: Arquivo 'data/processed/modeling_dataset_enriched.parquet' não encontrado.")
+        print("Execute o script 'enrich_behavioral_features.py' primeiro.")
+        exit()
+
+    # 2. Treinar (completo ou incremental)
+    if args.incremental:
+        train_incremental(df)
+    else:
+        train_full(df)
@@ -0,0 +1,111 @@
+# src/serving/load_test.py
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import numpy as np
+from tornado.httpclient import AsyncHTTPClient, HTTPClientError
+
+from src.serving.prediction_server import DEFAULT_PORT
+from src.utils.dataset_store import DATASET_PATH, read_dataset
+
+# Proporção de cada tipo de requisição na carga padrão
+DEFAULT_MIX = {'predict': 0.8, 'placar': 0.15, 'cenario': 0.05}
+SAMPLE_EMENTAS = [
+    'Dispõe sobre a reforma tributária e altera a legislação do imposto de renda.',
+    'Altera a Lei de Diretrizes Básicas da Educação para ampliar o ensino integral.',
+    'Institui o programa nacional de segurança pública nas fronteiras.',
+    'Dispõe sobre o piso salarial da enfermagem e o financiamento do SUS.',
+]
+
+
+def make_requests(base_url, keys, mix, n_requests, seed=42):
+    """Sorteia `n_requests` requisições (tipo, url, corpo) a partir de pares reais (deputado, votação)."""
+    rng = random.Random(seed)
+    kinds = rng.choices(list(mix), weights=list(mix.values()), k=n_requests)
+    voting_ids = keys['id_votacao'].unique().tolist()
+    requests = []
+    for kind in kinds:
+        if kind == 'predict':
+            row = keys.iloc[rng.randrange(len(keys))]
+            requests.append((kind, f"{base_url}/predict?deputado={row['id_deputado']}&votacao={row['id_votacao']}", None))
+        elif kind == 'placar':
+            requests.append((kind, f"{base_url}/placar/{rng.choice(voting_ids)}", None))
+        else:
+            body = {'ementa': rng.choice(SAMPLE_EMENTAS), 'coesao': {'Governo': round(rng.random(), 2)}}
+            requests.append((kind, f"{base_url}/cenario", json.dumps(body)))
+    return requests
+
+
+async def run_load(requests, concurrency):
+    """Dispara as requisições com `concurrency` clientes simultâneos e mede cada uma."""
+    AsyncHTTPClient.configure(None, max_clients=concurrency)
+    client = AsyncHTTPClient()
+    latencies = {kind: [] for kind, _, _ in requests}
+    errors = 0
+    queue = iter(requests)
+
+    async def worker():
+        nonlocal errors
+        for kind, url, body in queue:
+            start = time.perf_counter()
+            try:
+                await client.fetch(url, method='POST' if body else 'GET', body=body, request_timeout=60)
+            except (HTTPClientError, OSError):
+                errors += 1
+                continue
+            latencies[kind].append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def print_report(latencies, errors, elapsed):
+    print(f"{'Endpoint':<10} {'Requisições':>12} {'p50 (ms)':>10} {'p99 (ms)':>10} {'req/s':>9}")
+    print("-" * 55)
+    all_latencies = []
+    for kind, values in latencies.items():
+        if not values:
+            continue
+        all_latencies.extend(values)
+        values = np.array(values) * 1000
+        print(f"{kind:<10} {len(values):>12,} {np.percentile(values, 50):>10.1f} {np.percentile(values, 99):>10.1f} "
+              f"{len(values) / elapsed:>9.0f}")
+    values = np.array(all_latencies) * 1000
+    print("-" * 55)
+    print(f"{'total':<10} {len(values):>12,} {np.percentile(values, 50):>10.1f} {np.percentile(values, 99):>10.1f} "
+          f"{len(values) / elapsed:>9.0f}")
+    if errors:
+        print(f"{errors} requisições com erro.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gerador de carga local para o servidor de previsões.")
+    parser.add_argument('--url', default=f"http://localhost:{DEFAULT_PORT}", help="Endereço do servidor.")
+    parser.add_argument('--requests', type=int, default=5000, help="Total de requisições.")
+    parser.add_argument('--concurrency', type=int, default=64, help="Clientes simultâneos.")
+    parser.add_argument('--only', choices=list(DEFAULT_MIX), help="Envia só um tipo de requisição.")
+    args = parser.parse_args()
+
+    try:
+        keys = read_dataset(columns=['id_votacao', 'id_deputado'])
+    except FileNotFoundError:
+        print(f"Erro: Arquivo '{DATASET_PATH}' não encontrado. Execute o pipeline de 'src/' primeiro.")
+        exit()
+
+    mix = {args.only: 1.0} if args.only else DEFAULT_MIX
+    requests = make_requests(args.url.rstrip('/'), keys, mix, args.requests)
+    print(f"Enviando {len(requests):,} requisições com {args.concurrency} clientes para {args.url}...\n")
+    latencies, errors, elapsed = asyncio.run(run_load(requests, args.concurrency))
+    print_report(latencies, errors, elapsed)
+
+    async def fetch_stats():
+        response = await AsyncHTTPClient().fetch(f"{args.url.rstrip('/')}/stats")
+        return json.loads(response.body)
+
+    stats = asyncio.run(fetch_stats())
+    print(f"\nServidor: {stats['lotes']:,} lotes, {stats['requisicoes_por_lote']} requisições e "
+          f"{stats['linhas_por_lote']} linhas por lote em média.")
@@ -0,0 +1,371 @@
+# src/serving/prediction_server.py
+
+import argparse
+import asyncio
+import functools
+import json
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import tornado.web
+
+from src.modeling.approval import approval_summary
+from src.modeling.ementa_index import EmentaIndex
+from src.modeling.features import BLOCOS, build_feature_matrix
+from src.modeling.predict import PlenaryPredictor
+from src.modeling.predictor import to_float32_matrix
+from src.modeling.registry import load_bundle
+from src.modeling.scenario import ScenarioEngine, apply_priors
+from src.utils.arrow_store import current_arrow_path, read_arrow
+from src.utils.dataset_index import DatasetIndex
+from src.utils.dataset_store import DATASET_PATH
+
+DEPUTIES_PATH = 'data/processed/deputies_master_table.parquet'
+DEFAULT_PORT = 8600
+# Um lote fecha ao atingir MAX_BATCH_ROWS linhas ou MAX_WAIT_MS após a primeira requisição pendente
+MAX_BATCH_ROWS = 50_000
+MAX_WAIT_MS = 2.0
+# Matrizes de features (float32, uma por votação e tipo) mantidas em memória; ~120 KB cada com 513 deputados
+MATRIX_CACHE_SIZE = 512
+# Latências guardadas por endpoint para os percentis de /stats
+LATENCY_WINDOW = 10_000
+SUMMARY_KEYS = ('votos_sim_esperados', 'prob_maioria_simples', 'prob_maioria_absoluta', 'prob_maioria_constitucional')
+
+
+class MicroBatcher:
+    """
+    Junta as matrizes de features de requisições concorrentes em um único lote por chamada
+    ao preditor.
+
+    Cada requisição entra na fila e aguarda seu futuro. Um laço no IOLoop fecha o lote quando
+    ele atinge `max_batch_rows` linhas ou `max_wait_ms` após a primeira requisição. O lote é
+    avaliado em uma thread à parte, e o IOLoop continua aceitando requisições, que formam o
+    próximo lote.
+    """
+
+    def __init__(self, predictor, max_batch_rows=MAX_BATCH_ROWS, max_wait_ms=MAX_WAIT_MS):
+        self.predictor = predictor
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.requests = 0
+        self.rows = 0
+        self._pending = deque()
+        self._wakeup = asyncio.Event()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    async def predict_positive(self, X):
+        """P(Sim) de cada linha de `X`, avaliada junto com as demais requisições do lote."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((to_float32_matrix(X), future))
+        self._wakeup.set()
+        return await future
+
+    def _take_batch(self):
+        batch, n_rows = [], 0
+        while self._pending and (not batch or n_rows + len(self._pending[0][0]) <= self.max_batch_rows):
+            X, future = self._pending.popleft()
+            batch.append((X, future))
+            n_rows += len(X)
+        if not self._pending:
+            self._wakeup.clear()
+        return batch
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            deadline = loop.time() + self.max_wait
+            while sum(len(X) for X, _ in self._pending) < self.max_batch_rows and loop.time() < deadline:
+                await asyncio.sleep(self.max_wait / 4)
+
+            batch = self._take_batch()
+            X = np.concatenate([X for X, _ in batch]) if len(batch) > 1 else batch[0][0]
+            try:
+                prob_sim = await loop.run_in_executor(self._executor, self.predictor.predict_positive, X)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.requests += len(batch)
+            self.rows += len(X)
+            offsets = np.cumsum([len(X) for X, _ in batch])[:-1]
+            for (_, future), values in zip(batch, np.split(prob_sim, offsets)):
+                if not future.done():
+                    future.set_result(values)
+
+
+class LatencyStats:
+    """Latências recentes por endpoint, para os percentis p50/p99 e a vazão de /stats."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.started = time.time()
+        self.counts = defaultdict(int)
+        self._latencies = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, endpoint, seconds):
+        self.counts[endpoint] += 1
+        self._latencies[endpoint].append(seconds)
+
+    def summary(self):
+        uptime = time.time() - self.started
+        endpoints = {}
+        for endpoint, latencies in self._latencies.items():
+            values = np.array(latencies) * 1000
+            endpoints[endpoint] = {
+                'requisicoes': self.counts[endpoint],
+                'p50_ms': round(float(np.percentile(values, 50)), 2),
+                'p99_ms': round(float(np.percentile(values, 99)), 2),
+                'req_por_segundo': round(self.counts[endpoint] / uptime, 1),
+            }
+        return {'uptime_s': round(uptime, 1), 'endpoints': endpoints}
+
+
+class PredictionService:
+    """
+    Os dados e o modelo usados pelos endpoints, carregados uma única vez: o mesmo bundle do
+    registro e o mesmo dataset (exportação Arrow ou parquet) que o app usa.
+    """
+
+    def __init__(self, bundle, data, deputies_master, ementa_index=None, max_batch_rows=MAX_BATCH_ROWS,
+                 max_wait_ms=MAX_WAIT_MS, matrix_cache_size=MATRIX_CACHE_SIZE):
+        self.bundle = bundle
+        self.index = DatasetIndex(data, deputies_master)
+        self.engine = ScenarioEngine(bundle, deputies_master, data)
+        # O placar cobre todo o plenário, como no app: quem não votou também é previsto
+        historical_features = data[['id_deputado', 'pct_sim_historico', 'pct_sim_uf']].drop_duplicates()
+        self.plenary = PlenaryPredictor(deputies_master, historical_features, bundle.predictor,
+                                        bundle.feature_columns, bundle.version)
+        self.ementa_index = ementa_index
+        self.batcher = MicroBatcher(bundle.predictor, max_batch_rows, max_wait_ms)
+        self.stats = LatencyStats()
+        # Montar a matriz custa alguns ms por chamada (get_dummies), mesmo para uma linha; com o
+        # cache, requisições repetidas da mesma votação só copiam linhas já prontas
+        self.voting_matrix = functools.lru_cache(maxsize=matrix_cache_size)(self._build_voting_matrix)
+        self.plenary_matrix = functools.lru_cache(maxsize=matrix_cache_size)(self._build_plenary_matrix)
+
+    @classmethod
+    def load(cls, version=None, **kwargs):
+        """Carrega o bundle (versão informada, fixada ou `CURRENT`), o dataset e o índice de ementas."""
+        bundle = load_bundle(version)
+        if bundle is None:
+            raise FileNotFoundError("Nenhum modelo publicado em 'models/registry'.")
+        arrow_path = current_arrow_path('modeling_dataset_enriched')
+        data = read_arrow(arrow_path) if arrow_path is not None else pd.read_parquet(DATASET_PATH)
+        return cls(bundle, data, pd.read_parquet(DEPUTIES_PATH), EmentaIndex.load(), **kwargs)
+
+    def _build_voting_matrix(self, voting_id):
+        rows = self.index.voting_rows(voting_id)
+        return to_float32_matrix(build_feature_matrix(rows, self.bundle.feature_columns))
+
+    def _build_plenary_matrix(self, voting_id):
+        return self.plenary.feature_matrix(self.index.voting_rows(voting_id))[0]
+
+    async def predict_vote(self, deputy_id, voting_id):
+        """Previsão de um deputado em uma votação do dataset (KeyError se a linha não existir)."""
+        rows = self.index.voting_rows(voting_id)
+        positions = np.flatnonzero(rows['id_deputado'].to_numpy() == deputy_id)
+        if len(positions) == 0:
+            raise KeyError(f"Deputado {deputy_id} não encontrado na votação {voting_id}.")
+        rows = rows.iloc[positions]
+        prob_sim = float((await self.batcher.predict_positive(self.voting_matrix(voting_id)[positions]))[0])
+        return {
+            'id_deputado': deputy_id,
+            'id_votacao': voting_id,
+            'nome_urna': self.index.deputy_names.get(deputy_id),
+            'prob_sim': round(prob_sim, 6),
+            'voto_previsto': 'Sim' if prob_sim > 0.5 else 'Não',
+            'voto_real': rows['tipoVoto'].iloc[0],
+        }
+
+    async def placar(self, voting_id, include_deputies=False):
+        """
+        Placar previsto de uma votação do dataset para todo o plenário (`PlenaryPredictor`):
+        todos os deputados em exercício, inclusive os que não votaram ('Não Votou').
+        """
+        rows = self.index.voting_rows(voting_id)
+        if rows.empty:
+            raise KeyError(f"Votação {voting_id} não encontrada.")
+        prob_sim = await self.batcher.predict_positive(self.plenary_matrix(voting_id))
+        result = {'id_votacao': voting_id, 'ementa': self.index.ementas.get(voting_id),
+                  **placar_summary(prob_sim), 'votos_sim_reais': int((rows['tipoVoto'] == 'Sim').sum())}
+        if include_deputies:
+            real_votes = rows.drop_duplicates('id_deputado').set_index('id_deputado')['tipoVoto']
+            deputies = self.plenary.deputies.assign(
+                voto_realizado=self.plenary.deputies['id_deputado'].map(real_votes).fillna('Não Votou'))
+            result['deputados'] = deputy_predictions(deputies, prob_sim, extra_columns=['voto_realizado'])
+        return result
+
+    async def scenario(self, ementa, cohesion=None, include_deputies=False):
+        """
+        Placar previsto para uma ementa nova. O cenário parte das votações passadas com ementa
+        mais parecida (se houver índice) e `cohesion` ajusta a coesão de blocos ou partidos.
+        """
+        party_cohesion, bloc_cohesion = {}, {}
+        for name, value in (cohesion or {}).items():
+            (bloc_cohesion if name in BLOCOS else party_cohesion)[name] = float(value)
+        similar = self.ementa_index.search(ementa) if self.ementa_index is not None and ementa else None
+        priors = self.engine.similar_voting_priors(similar) if similar is not None else None
+        X = self.engine.feature_matrix(*apply_priors(party_cohesion, bloc_cohesion, priors))
+        prob_sim = await self.batcher.predict_positive(X)
+        result = {'ementa': ementa, **placar_summary(prob_sim)}
+        if similar is not None:
+            result['votacoes_semelhantes'] = json.loads(similar.head(5).to_json(orient='records'))
+        if include_deputies:
+            result['deputados'] = deputy_predictions(self.engine.deputies, prob_sim)
+        return result
+
+    def status(self):
+        batcher = self.batcher
+        return {
+            'versao_modelo': self.bundle.version,
+            'votacoes': len(self.index.voting_ids),
+            'deputados': len(self.engine.deputies),
+            'matrizes_em_cache': self.voting_matrix.cache_info().currsize + self.plenary_matrix.cache_info().currsize,
+            'lotes': batcher.batches,
+            'requisicoes_por_lote': round(batcher.requests / batcher.batches, 2) if batcher.batches else 0,
+            'linhas_por_lote': round(batcher.rows / batcher.batches, 1) if batcher.batches else 0,
+        }
+
+
+def placar_summary(prob_sim):
+    """Votos previstos e as métricas de `approval_summary` de uma votação, em tipos do JSON."""
+    summary = approval_summary(prob_sim)
+    votos_sim = int((prob_sim > 0.5).sum())
+    return {
+        'votos_sim_previstos': votos_sim,
+        'votos_nao_previstos': len(prob_sim) - votos_sim,
+        **{key: round(float(summary[key]), 6) for key in SUMMARY_KEYS},
+        'intervalo_inferior': int(summary['intervalo_inferior']),
+        'intervalo_superior': int(summary['intervalo_superior']),
+    }
+
+
+def deputy_predictions(deputies, prob_sim, extra_columns=()):
+    columns = ['id_deputado', 'nome_urna', 'partido', 'posicao_governo', *extra_columns]
+    records = deputies[columns].assign(prob_sim=np.round(prob_sim, 6))
+    return json.loads(records.to_json(orient='records', force_ascii=False))
+
+
+# --- Endpoints ---
+
+class BaseHandler(tornado.web.RequestHandler):
+    endpoint = None
+
+    def initialize(self, service):
+        self.service = service
+
+    def set_default_headers(self):
+        self.set_header('Content-Type', 'application/json; charset=utf-8')
+
+    def write_json(self, payload):
+        self.finish(json.dumps(payload, ensure_ascii=False, default=str))
+
+    def write_error(self, status_code, **kwargs):
+        self.write_json({'erro': self._reason})
+
+    def flag(self, name):
+        return self.get_query_argument(name, 'false').lower() in ('1', 'true', 'sim')
+
+    def on_finish(self):
+        if self.endpoint is not None and self.get_status() < 400:
+            self.service.stats.record(self.endpoint, self.request.request_time())
+
+
+class PredictHandler(BaseHandler):
+    """GET /predict?deputado=<id>&votacao=<id>"""
+    endpoint = 'predict'
+
+    async def get(self):
+        try:
+            deputy_id = int(self.get_query_argument('deputado'))
+        except ValueError:
+            raise tornado.web.HTTPError(400, reason="'deputado' deve ser um id numérico.")
+        try:
+            self.write_json(await self.service.predict_vote(deputy_id, self.get_query_argument('votacao')))
+        except KeyError as e:
+            raise tornado.web.HTTPError(404, reason=str(e.args[0]))
+
+
+class PlacarHandler(BaseHandler):
+    """GET /placar/<id_votacao>[?deputados=true]"""
+    endpoint = 'placar'
+
+    async def get(self, voting_id):
+        try:
+            self.write_json(await self.service.placar(voting_id, self.flag('deputados')))
+        except KeyError as e:
+            raise tornado.web.HTTPError(404, reason=str(e.args[0]))
+
+
+class ScenarioHandler(BaseHandler):
+    """POST /cenario[?deputados=true] com {"ementa": "...", "coesao": {"Governo": 0.8, "PT": 0.9}}"""
+    endpoint = 'cenario'
+
+    async def post(self):
+        try:
+            body = json.loads(self.request.body or b'{}')
+            ementa, cohesion = str(body.get('ementa', '')), body.get('coesao') or {}
+            if not isinstance(cohesion, dict):
+                raise ValueError
+        except (ValueError, AttributeError):
+            raise tornado.web.HTTPError(400, reason="Corpo inválido: esperado JSON com 'ementa' e 'coesao' (objeto).")
+        for name, value in cohesion.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= 1:
+                raise tornado.web.HTTPError(
+                    400, reason=f"Coesão de '{name}' inválida: esperado um número entre 0 e 1.")
+        self.write_json(await self.service.scenario(ementa, cohesion, self.flag('deputados')))
+
+
+class StatusHandler(BaseHandler):
+    """GET /health: versão do modelo e estatísticas dos lotes."""
+
+    def get(self):
+        self.write_json(self.service.status())
+
+
+class StatsHandler(BaseHandler):
+    """GET /stats: latências p50/p99 e vazão por endpoint, além dos lotes."""
+
+    def get(self):
+        self.write_json({**self.service.stats.summary(), **self.service.status()})
+
+
+def make_app(service):
+    kwargs = {'service': service}
+    return tornado.web.Application([
+        (r'/predict', PredictHandler, kwargs),
+        (r'/placar/([^/]+)', PlacarHandler, kwargs),
+        (r'/cenario', ScenarioHandler, kwargs),
+        (r'/health', StatusHandler, kwargs),
+        (r'/stats', StatsHandler, kwargs),
+    ])
+
+
+async def serve(service, port):
+    make_app(service).listen(port)
+    print(f"Servidor de previsões (modelo {service.bundle.version}) ouvindo em http://localhost:{port}")
+    await service.batcher.run()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor HTTP de previsões de votos (sem o Streamlit).")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Porta HTTP.")
+    parser.add_argument('--version', default=None, help="Versão do modelo (padrão: a fixada ou CURRENT).")
+    parser.add_argument('--max-batch-rows', type=int, default=MAX_BATCH_ROWS, help="Linhas máximas por lote.")
+    parser.add_argument('--max-wait-ms', type=float, default=MAX_WAIT_MS,
+                        help="Espera máxima para completar um lote (0 = sem espera).")
+    args = parser.parse_args()
+
+    try:
+        service = PredictionService.load(args.version, max_batch_rows=args.max_batch_rows,
+                                         max_wait_ms=args.max_wait_ms)
+    except FileNotFoundError as e:
+        print(f"Erro: {e} Execute o pipeline de 'src/' primeiro.")
+        exit()
+    asyncio.run(serve(service, args.port))
@@ -0,0 +1,167 @@
+# src/serving/refresh_scheduler.py
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from src.utils.artifacts import write_json
+
+STATUS_PATH = 'data/processed/refresh_status.json'
+LOCK_PATH = 'data/processed/.refresh.lock'
+DEFAULT_INTERVAL_MINUTES = 360
+DEFAULT_STEP_TIMEOUT_MINUTES = 120
+
+# Etapas do pipeline, na mesma ordem do README: (grupo, módulo, argumentos). Cada script publica
+# suas saídas de forma atômica (arquivo temporário + rename, ou ponteiro versionado) assim que
+# termina, e o app adota cada artefato novo no rerun seguinte. A atomicidade é por artefato, não
+# da atualização inteira: se uma etapa falha, as anteriores já foram publicadas.
+STEPS = [
+    ('coleta', 'src.data_collection.api_client', []),
+    ('coleta', 'src.data_collection.enrich_deputies_data', []),
+    ('coleta', 'src.data_collection.fetch_votings_data', []),
+    ('coleta', 'src.data_collection.enrich_votings_data', []),
+    ('features', 'src.feature_engineering.build_features', []),
+    ('features', 'src.feature_engineering.create_modeling_dataset', []),
+    ('features', 'src.feature_engineering.enrich_behavioral_features', []),
+    ('features', 'src.feature_engineering.build_aggregates', []),
+    ('treino', 'src.modeling.train_model', ['--incremental']),
+    ('publicacao', 'src.modeling.build_prediction_store', []),
+    ('publicacao', 'src.modeling.ementa_index', []),
+]
+
+
+def log(message):
+    print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] {message}", flush=True)
+
+
+def select_steps(collect=True, retrain=False):
+    """As etapas de uma atualização: a coleta e o retreino (warm start) podem ser desligados."""
+    skipped = ({'coleta'} if not collect else set()) | ({'treino'} if not retrain else set())
+    return [step for step in STEPS if step[0] not in skipped]
+
+
+def acquire_lock(lock_path=LOCK_PATH):
+    """
+    Cria o arquivo de trava com o PID deste processo. Uma trava deixada por um processo que já
+    terminou é removida; uma trava de um processo vivo (outra atualização em andamento) não.
+
+    Returns:
+        bool: True se a trava foi obtida.
+    """
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    for _ in range(2):
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                with open(lock_path, encoding='utf-8') as f:
+                    os.kill(int(f.read().strip()), 0)
+                return False
+            except (ProcessLookupError, ValueError, FileNotFoundError):
+                # Trava órfã (processo encerrado ou arquivo incompleto): remove e tenta de novo
+                try:
+                    os.remove(lock_path)
+                except FileNotFoundError:
+                    pass
+                continue
+            except PermissionError:
+                return False
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(str(os.getpid()))
+        return True
+    return False
+
+
+def run_step(module, args, timeout_minutes=DEFAULT_STEP_TIMEOUT_MINUTES):
+    """
+    Executa uma etapa em um subprocesso (a memória do pipeline é liberada ao fim de cada etapa).
+
+    Os scripts sinalizam falhas imprimindo 'Erro...' e saindo, então uma etapa falha se o código de
+    saída não for zero ou se alguma linha da saída começar com 'Erro'.
+
+    Returns:
+        tuple[bool, str]: (sucesso, última linha relevante da saída).
+    """
+    try:
+        result = subprocess.run([sys.executable, '-m', module, *args], capture_output=True, text=True,
+                                timeout=timeout_minutes * 60)
+    except subprocess.TimeoutExpired:
+        return False, f"tempo limite de {timeout_minutes} min excedido"
+    lines = [line.strip() for line in (result.stdout + result.stderr).splitlines() if line.strip()]
+    errors = [line for line in lines if line.startswith('Erro')]
+    if result.returncode != 0:
+        return False, lines[-1] if lines else f"código de saída {result.returncode}"
+    if errors:
+        return False, errors[0]
+    return True, lines[-1] if lines else ''
+
+
+def run_refresh(steps, timeout_minutes=DEFAULT_STEP_TIMEOUT_MINUTES, status_path=STATUS_PATH):
+    """
+    Executa as etapas em ordem, parando na primeira que falhar, e grava o resumo em `status_path`,
+    com a lista das etapas cujas saídas já foram publicadas (`publicadas`).
+
+    Returns:
+        bool: True se todas as etapas terminaram com sucesso.
+    """
+    status = {'inicio': datetime.now().isoformat(timespec='seconds'), 'status': 'em andamento', 'etapas': [],
+              'publicadas': []}
+    write_json(status, status_path)
+    ok = True
+    for group, module, args in steps:
+        log(f"{group}: {module} {' '.join(args)}".rstrip())
+        start = time.perf_counter()
+        ok, message = run_step(module, args, timeout_minutes)
+        elapsed = time.perf_counter() - start
+        status['etapas'].append({'etapa': module, 'grupo': group, 'segundos': round(elapsed, 1), 'ok': ok,
+                                 'mensagem': message})
+        if ok:
+            status['publicadas'].append(module)
+        write_json(status, status_path)
+        if not ok:
+            log(f"Falha em {module} ({elapsed:.0f}s): {message}")
+            break
+        log(f"Concluído em {elapsed:.0f}s.")
+    status['fim'] = datetime.now().isoformat(timespec='seconds')
+    status['status'] = 'ok' if ok else 'falhou'
+    write_json(status, status_path)
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Atualiza periodicamente os dados e artefatos do app (processo separado do Streamlit).")
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL_MINUTES,
+                        help="Minutos entre o início de duas atualizações.")
+    parser.add_argument('--once', action='store_true', help="Executa uma única atualização e sai.")
+    parser.add_argument('--skip-collection', action='store_true',
+                        help="Não consulta a API; reprocessa apenas os dados brutos já coletados.")
+    parser.add_argument('--retrain', action='store_true',
+                        help="Inclui o retreino incremental (warm start) do modelo.")
+    parser.add_argument('--step-timeout', type=float, default=DEFAULT_STEP_TIMEOUT_MINUTES,
+                        help="Tempo máximo de cada etapa, em minutos.")
+    args = parser.parse_args()
+
+    steps = select_steps(collect=not args.skip_collection, retrain=args.retrain)
+    log(f"Agendador iniciado: {len(steps)} etapas" +
+        ("" if args.once else f", a cada {args.interval:g} min") + ".")
+    try:
+        while True:
+            started = time.monotonic()
+            if not acquire_lock():
+                log(f"Outra atualização está em andamento ('{LOCK_PATH}'); pulando esta execução.")
+            else:
+                try:
+                    ok = run_refresh(steps, args.step_timeout)
+                finally:
+                    os.remove(LOCK_PATH)
+                log("Atualização concluída." if ok else "Atualização interrompida; as etapas concluídas já "
+                    f"publicaram suas saídas e as demais mantêm as anteriores (ver '{STATUS_PATH}').")
+            if args.once:
+                break
+            time.sleep(max(0.0, args.interval * 60 - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        log("Agendador encerrado.")
@@ -0,0 +1,87 @@
+# src/utils/arrow_store.py
+
+import glob
+import os
+from datetime import datetime
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from src.utils.timing import timed
+
+ARROW_DIR = 'data/processed/arrow'
+# Versões antigas mantidas ao lado da atual (processos que ainda as mapeiam continuam funcionando)
+KEEP_VERSIONS = 2
+
+
+def _pointer_path(name, directory):
+    return os.path.join(directory, f"{name}.CURRENT")
+
+
+@timed('dados.export_arrow')
+def export_arrow(df, name, directory=ARROW_DIR):
+    """
+    Exporta um DataFrame para um arquivo Arrow IPC versionado e aponta `<name>.CURRENT` para ele.
+
+    As colunas de texto são gravadas com dictionary encoding (cada valor distinto uma única vez).
+    O arquivo novo é escrito por inteiro antes de o ponteiro ser trocado com um rename atômico,
+    então leitores sempre veem a versão anterior completa ou a nova completa.
+
+    Args:
+        df (pd.DataFrame): Os dados a exportar.
+        name (str): Nome lógico do conjunto de dados (ex: 'modeling_dataset_enriched').
+        directory (str): Pasta dos arquivos `.arrow` e dos ponteiros.
+
+    Returns:
+        str: O caminho do arquivo publicado.
+    """
+    os.makedirs(directory, exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = pa.table([column.dictionary_encode() if pa.types.is_string(column.type) else column
+                      for column in table.columns], names=table.column_names)
+
+    file_path = os.path.join(directory, f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.arrow")
+    with pa.OSFile(f"{file_path}.tmp", 'wb') as sink, ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(f"{file_path}.tmp", file_path)
+
+    pointer = _pointer_path(name, directory)
+    with open(f"{pointer}.tmp", 'w', encoding='utf-8') as f:
+        f.write(os.path.basename(file_path))
+    os.replace(f"{pointer}.tmp", pointer)
+
+    for old_path in sorted(glob.glob(os.path.join(directory, f"{name}-*.arrow")))[:-KEEP_VERSIONS]:
+        try:
+            os.remove(old_path)
+        except OSError:
+            pass  # Ainda aberto por outro processo (Windows); será removido na próxima exportação
+    print(f"Arquivo Arrow publicado em '{file_path}'.")
+    return file_path
+
+
+def current_arrow_path(name, directory=ARROW_DIR):
+    """Caminho do arquivo apontado por `<name>.CURRENT`, ou None se nada foi exportado ainda."""
+    try:
+        with open(_pointer_path(name, directory), encoding='utf-8') as f:
+            file_path = os.path.join(directory, f.read().strip())
+    except FileNotFoundError:
+        return None
+    return file_path if os.path.isfile(file_path) else None
+
+
+@timed('dados.read_arrow')
+def read_arrow(file_path):
+    """
+    Lê um arquivo exportado por `export_arrow` com memory-map (somente leitura).
+
+    As colunas numéricas são visões diretas do arquivo mapeado, sem cópia: a única cópia em
+    memória é a do cache de páginas do SO, compartilhada por todos os processos que mapeiam o
+    mesmo arquivo, e os arrays não aceitam escrita. As colunas de texto viram `object` apontando
+    para os valores distintos do dicionário (uma string por valor, não por linha).
+    """
+    table = ipc.open_file(pa.memory_map(file_path, 'r')).read_all()
+    df = table.to_pandas(split_blocks=True)
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype(object)
+    return df
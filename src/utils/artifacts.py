@@ -0,0 +1,69 @@
+# src/utils/artifacts.py
+
+import hashlib
+import json
+import os
+
+
+def file_hash(file_path, chunk_size=1 << 20):
+    """
+    Calcula o hash SHA-256 do conteúdo de um arquivo, lendo em blocos.
+
+    Args:
+        file_path (str): O caminho do arquivo.
+        chunk_size (int): Tamanho de cada bloco lido (padrão: 1 MiB).
+
+    Returns:
+        str: O hash hexadecimal do conteúdo.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# (caminho) -> ((mtime_ns, tamanho), hash): o conteúdo só é relido quando o arquivo muda
+_content_versions = {}
+
+
+def content_version(file_path):
+    """
+    Versão de um artefato dada pelo hash do seu conteúdo, para usar como chave de cache.
+
+    O hash é recalculado só quando o `stat` do arquivo (mtime e tamanho) muda, então chamar a
+    função a cada rerun custa um `os.stat`; regravar o arquivo com o mesmo conteúdo mantém a versão.
+
+    Returns:
+        str: Os 16 primeiros caracteres do SHA-256 do conteúdo, ou None se o arquivo não existir.
+    """
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _content_versions.get(file_path)
+    if cached is None or cached[0] != signature:
+        cached = (signature, file_hash(file_path)[:16])
+        _content_versions[file_path] = cached
+    return cached[1]
+
+
+def read_json(file_path):
+    """Lê um arquivo JSON, retornando None se ele não existir."""
+    try:
+        with open(file_path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def write_json(data, file_path):
+    """Grava um JSON de forma atômica (arquivo temporário + rename), criando o diretório se necessário."""
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, file_path)
@@ -0,0 +1,69 @@
+# src/utils/dataset_index.py
+
+import numpy as np
+import pandas as pd
+
+from src.utils.timing import timed
+
+
+class SortedKeyIndex:
+    """
+    Índice das posições das linhas por chave (ex: `id_votacao`).
+
+    As posições são ordenadas por chave uma única vez (ordenação estável), de modo que as linhas
+    de uma chave formam uma fatia contígua: buscar uma chave não percorre o DataFrame inteiro e
+    devolve as posições na ordem original das linhas, como uma máscara booleana faria.
+    """
+
+    def __init__(self, keys):
+        codes, uniques = pd.factorize(keys)
+        self.order = np.argsort(codes, kind='stable')
+        self.offsets = np.searchsorted(codes[self.order], np.arange(len(uniques) + 1))
+        self.keys = uniques.tolist()
+        self._codes = {key: code for code, key in enumerate(self.keys)}
+
+    def positions(self, key):
+        """Posições (em ordem crescente) das linhas com a chave informada."""
+        code = self._codes.get(key)
+        if code is None:
+            return np.empty(0, dtype=np.intp)
+        return self.order[self.offsets[code]:self.offsets[code + 1]]
+
+
+class DatasetIndex:
+    """
+    Camada de dimensões sobre o dataset (deputado x votação) usada pelas páginas do app:
+    rótulos das votações e nomes dos deputados em dicionários, para os `format_func` dos
+    selectboxes, e índices por `id_votacao` e `id_deputado` para recuperar linhas sem
+    varrer o DataFrame.
+    """
+
+    @timed('dados.dataset_index')
+    def __init__(self, data, deputies_master=None):
+        self.data = data
+        self._by_voting = SortedKeyIndex(data['id_votacao'].to_numpy())
+        self._by_deputy = SortedKeyIndex(data['id_deputado'].to_numpy())
+
+        # Votações e deputados na ordem em que aparecem no dataset (como `drop_duplicates`)
+        self.voting_ids = self._by_voting.keys
+        self.deputy_ids = self._by_deputy.keys
+        first_rows = data.iloc[self._by_voting.order[self._by_voting.offsets[:-1]]]
+        self.ementas = dict(zip(first_rows['id_votacao'], first_rows['proposicao_ementa']))
+        first_rows = data.iloc[self._by_deputy.order[self._by_deputy.offsets[:-1]]]
+        self.deputy_names = dict(zip(first_rows['id_deputado'], first_rows['nome_urna']))
+        if deputies_master is not None:
+            self.deputy_names.update(zip(deputies_master['id_deputado'], deputies_master['nome_urna']))
+
+    def voting_rows(self, voting_id):
+        """Todas as linhas (votos) de uma votação."""
+        return self.data.iloc[self._by_voting.positions(voting_id)]
+
+    def deputy_rows(self, deputy_id):
+        """Todas as linhas (votos) de um deputado."""
+        return self.data.iloc[self._by_deputy.positions(deputy_id)]
+
+    def row(self, deputy_id, voting_id):
+        """As linhas de um deputado em uma votação (vazio se ele não votou)."""
+        positions = self._by_voting.positions(voting_id)
+        positions = positions[self.data['id_deputado'].to_numpy()[positions] == deputy_id]
+        return self.data.iloc[positions]
@@ -0,0 +1,131 @@
+# src/utils/dataset_store.py
+
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.utils.timing import timed
+
+DATASET_PATH = 'data/processed/modeling_dataset_enriched.parquet'
+# Mesmo conteúdo ordenado por deputado: leituras de um deputado só tocam os row groups dele
+DEPUTY_LAYOUT_PATH = 'data/processed/modeling_dataset_enriched.by_deputy.parquet'
+# Linhas por row group (~16 votações de 513 deputados); cada row group guarda min/max de cada coluna
+ROW_GROUP_SIZE = 8192
+
+
+def write_sorted_parquet(df, file_path, sort_by, row_group_size=ROW_GROUP_SIZE):
+    """
+    Grava um DataFrame ordenado por `sort_by` em row groups de `row_group_size` linhas.
+
+    Com os dados ordenados, o min/max de cada row group cobre uma faixa estreita das chaves de
+    ordenação, e filtros nessas colunas descartam os row groups que não podem conter a seleção.
+    O arquivo é escrito em um temporário e renomeado sobre o anterior (troca atômica).
+
+    Args:
+        df (pd.DataFrame): Os dados a gravar.
+        file_path (str): O caminho do arquivo.
+        sort_by (dict): Chaves de ordenação, em ordem de prioridade ({nome: valores}); os valores
+            não precisam ser colunas de `df` (ex: a data de início de cada votação).
+    """
+    keys = pd.DataFrame({name: pd.Series(values).to_numpy() for name, values in sort_by.items()})
+    order = keys.sort_values(list(sort_by), kind='stable').index.to_numpy()
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    table = pa.Table.from_pandas(df.iloc[order], preserve_index=False)
+    pq.write_table(table, f"{file_path}.tmp", row_group_size=row_group_size)
+    os.replace(f"{file_path}.tmp", file_path)
+
+
+@timed('dados.write_dataset')
+def write_dataset(df, file_path=DATASET_PATH, deputy_layout_path=DEPUTY_LAYOUT_PATH):
+    """
+    Grava o dataset enriquecido nos dois layouts lidos por `read_dataset`: ordenado pela data de
+    cada votação (e `id_votacao`), que poda filtros de votação e de período, e ordenado por
+    `id_deputado`, que poda filtros de deputado.
+    """
+    voting_start = pd.to_datetime(df['dataRegistroVoto'], errors='coerce').groupby(df['id_votacao']).transform('min')
+    write_sorted_parquet(df, file_path, {'inicio_votacao': voting_start, 'id_votacao': df['id_votacao'],
+                                         'id_deputado': df['id_deputado']})
+    write_sorted_parquet(df, deputy_layout_path, {'id_deputado': df['id_deputado'], 'id_votacao': df['id_votacao']})
+    print(f"Dados salvos com sucesso em '{file_path}' e '{deputy_layout_path}'")
+
+
+def selection_filter(voting_ids=None, deputy_ids=None, start=None, end=None):
+    """
+    Expressão de filtro do pyarrow para a seleção (None se nada foi filtrado).
+
+    Args:
+        voting_ids (list, opcional): Valores de `id_votacao`.
+        deputy_ids (list, opcional): Valores de `id_deputado`.
+        start (str, opcional): Data inicial (inclusive) de `dataRegistroVoto`, ex: '2024-01-01'.
+        end (str, opcional): Data final (exclusive) de `dataRegistroVoto`.
+    """
+    conditions = []
+    if voting_ids is not None:
+        conditions.append(ds.field('id_votacao').isin(pa.array([str(v) for v in voting_ids])))
+    if deputy_ids is not None:
+        conditions.append(ds.field('id_deputado').isin(pa.array(list(deputy_ids), type=pa.int64())))
+    # `dataRegistroVoto` é gravado como texto ISO 8601, então a ordem do texto é a ordem das datas
+    if start is not None:
+        conditions.append(ds.field('dataRegistroVoto') >= str(start))
+    if end is not None:
+        conditions.append(ds.field('dataRegistroVoto') < str(end))
+    if not conditions:
+        return None
+    expression = conditions[0]
+    for condition in conditions[1:]:
+        expression = expression & condition
+    return expression
+
+
+def layout_for(deputy_ids=None, voting_ids=None, start=None, end=None,
+               file_path=DATASET_PATH, deputy_layout_path=DEPUTY_LAYOUT_PATH):
+    """Arquivo cuja ordenação poda melhor a seleção (o layout por deputado só quando só há filtro de deputado)."""
+    only_deputies = deputy_ids is not None and voting_ids is None and start is None and end is None
+    if only_deputies and os.path.exists(deputy_layout_path):
+        return deputy_layout_path
+    return file_path
+
+
+@timed('dados.read_dataset')
+def read_dataset(columns=None, voting_ids=None, deputy_ids=None, start=None, end=None,
+                 file_path=DATASET_PATH, deputy_layout_path=DEPUTY_LAYOUT_PATH):
+    """
+    Lê do dataset enriquecido apenas as colunas e as linhas pedidas.
+
+    Os filtros são aplicados pelo pyarrow às estatísticas (min/max) de cada row group antes da
+    leitura, então só os row groups que podem conter a seleção são lidos e decodificados.
+
+    Args:
+        columns (list, opcional): Colunas a ler (padrão: todas).
+        voting_ids, deputy_ids, start, end: Seleção de linhas (ver `selection_filter`).
+
+    Returns:
+        pd.DataFrame: As linhas selecionadas, na ordem do arquivo lido.
+    """
+    path = layout_for(deputy_ids, voting_ids, start, end, file_path, deputy_layout_path)
+    dataset = ds.dataset(path, format='parquet')
+    table = dataset.to_table(columns=columns, filter=selection_filter(voting_ids, deputy_ids, start, end))
+    return table.to_pandas()
+
+
+def scanned_row_groups(columns=None, voting_ids=None, deputy_ids=None, start=None, end=None,
+                       file_path=DATASET_PATH, deputy_layout_path=DEPUTY_LAYOUT_PATH):
+    """
+    Row groups que `read_dataset` lê para a seleção e os bytes (comprimidos) das colunas lidas.
+
+    Returns:
+        tuple[int, int, int]: (row groups lidos, total de row groups, bytes lidos).
+    """
+    path = layout_for(deputy_ids, voting_ids, start, end, file_path, deputy_layout_path)
+    metadata = pq.ParquetFile(path).metadata
+    names = [metadata.schema.column(i).name for i in range(metadata.num_columns)]
+    wanted = [i for i, name in enumerate(names) if columns is None or name in columns]
+
+    expression = selection_filter(voting_ids, deputy_ids, start, end)
+    fragment = next(ds.dataset(path, format='parquet').get_fragments())
+    row_groups = [rg.id for fragment_rg in fragment.split_by_row_group(expression) for rg in fragment_rg.row_groups] \
+        if expression is not None else list(range(metadata.num_row_groups))
+    n_bytes = sum(metadata.row_group(rg).column(i).total_compressed_size for rg in row_groups for i in wanted)
+    return len(row_groups), metadata.num_row_groups, n_bytes
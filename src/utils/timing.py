@@ -0,0 +1,207 @@
+# src/utils/timing.py
+
+import atexit
+import functools
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+TIMING_DIR = 'data/processed/timing'
+# Medições mantidas por trecho para os percentis (janela móvel)
+WINDOW = 1000
+# Ativa a instrumentação no início do processo (ex: `PLENARIO_TIMING=1 python -m src...`)
+ENV_VAR = 'PLENARIO_TIMING'
+
+_enabled = False
+_sections = {}
+_lock = threading.Lock()
+_export_registered = False
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def rss_bytes():
+    """Memória residente do processo em bytes (/proc/self/statm no Linux; pico de RSS nos demais sistemas)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (FileNotFoundError, IndexError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class _Section:
+    """Medições de um trecho: contagem e soma totais, e janelas móveis de duração e de variação de memória."""
+
+    __slots__ = ('count', 'total', 'durations', 'memory_deltas')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.durations = deque(maxlen=WINDOW)
+        self.memory_deltas = deque(maxlen=WINDOW)
+
+    def add(self, seconds, memory_delta):
+        self.count += 1
+        self.total += seconds
+        self.durations.append(seconds)
+        self.memory_deltas.append(memory_delta)
+
+
+def _record(name, seconds, memory_delta):
+    section = _sections.get(name)
+    if section is None:
+        with _lock:
+            section = _sections.setdefault(name, _Section())
+    section.add(seconds, memory_delta)
+
+
+class timed:
+    """
+    Mede um trecho de código, como context manager (`with timed('nome'):`) ou decorator
+    (`@timed('nome')`), guardando a duração e a variação do RSS do processo.
+
+    Desativada (o padrão), a instrumentação custa só a checagem de uma flag global por chamada.
+    A variação de memória é do processo inteiro: com várias sessões em paralelo (ex: Streamlit),
+    ela inclui o que as outras threads alocaram no mesmo intervalo.
+    """
+
+    __slots__ = ('name', '_start', '_rss')
+
+    def __init__(self, name):
+        self.name = name
+        self._start = None
+
+    def __enter__(self):
+        if _enabled:
+            self._rss = rss_bytes()
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self._start is not None:
+            _record(self.name, time.perf_counter() - self._start, rss_bytes() - self._rss)
+            self._start = None
+        return False
+
+    def __call__(self, func):
+        name = self.name
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            rss = rss_bytes()
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record(name, time.perf_counter() - start, rss_bytes() - rss)
+
+        return wrapper
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable(flag=True, export_label=None):
+    """
+    Liga (ou desliga) a instrumentação no processo.
+
+    Args:
+        flag (bool): Estado da instrumentação.
+        export_label (str, opcional): Se informado, as medições são exportadas ao fim do processo
+            para `TIMING_DIR/<export_label>.json` e `.prom` (usado pelos scripts do pipeline).
+    """
+    global _enabled, _export_registered
+    _enabled = flag
+    if flag and export_label and not _export_registered:
+        atexit.register(lambda: snapshot() and export(os.path.join(TIMING_DIR, export_label)))
+        _export_registered = True
+
+
+def reset():
+    """Descarta todas as medições."""
+    with _lock:
+        _sections.clear()
+
+
+def snapshot():
+    """
+    Resumo das medições por trecho, do mais demorado (tempo total) para o menos demorado.
+
+    Returns:
+        dict: Nome do trecho -> `chamadas`, `total_s`, `p50_ms`, `p95_ms`, `max_ms` e
+        `memoria_p50_mb` / `memoria_max_mb` (variação do RSS) sobre a janela móvel.
+    """
+    with _lock:
+        sections = list(_sections.items())
+    summary = {}
+    for name, section in sections:
+        durations = np.array(section.durations) * 1000
+        memory = np.array(section.memory_deltas) / (1024 * 1024)
+        if not len(durations):
+            continue
+        p50, p95 = np.percentile(durations, [50, 95])
+        summary[name] = {
+            'chamadas': section.count,
+            'total_s': round(section.total, 4),
+            'p50_ms': round(float(p50), 3),
+            'p95_ms': round(float(p95), 3),
+            'max_ms': round(float(durations.max()), 3),
+            'memoria_p50_mb': round(float(np.median(memory)), 2),
+            'memoria_max_mb': round(float(memory.max()), 2),
+        }
+    return dict(sorted(summary.items(), key=lambda item: -item[1]['total_s']))
+
+
+def prometheus_text(summary=None):
+    """As medições no formato de texto do Prometheus (um `summary` de duração e um `gauge` de memória)."""
+    summary = snapshot() if summary is None else summary
+    lines = ['# HELP plenario_section_seconds Duração dos trechos instrumentados.',
+             '# TYPE plenario_section_seconds summary']
+    for name, stats in summary.items():
+        label = name.replace('\\', '\\\\').replace('"', '\\"')
+        lines.append(f'plenario_section_seconds{{section="{label}",quantile="0.5"}} {stats["p50_ms"] / 1000:.6f}')
+        lines.append(f'plenario_section_seconds{{section="{label}",quantile="0.95"}} {stats["p95_ms"] / 1000:.6f}')
+        lines.append(f'plenario_section_seconds_sum{{section="{label}"}} {stats["total_s"]:.6f}')
+        lines.append(f'plenario_section_seconds_count{{section="{label}"}} {stats["chamadas"]}')
+    lines += ['# HELP plenario_section_memory_delta_bytes Variação mediana do RSS durante os trechos.',
+              '# TYPE plenario_section_memory_delta_bytes gauge']
+    for name, stats in summary.items():
+        label = name.replace('\\', '\\\\').replace('"', '\\"')
+        lines.append(f'plenario_section_memory_delta_bytes{{section="{label}"}} '
+                     f'{int(stats["memoria_p50_mb"] * 1024 * 1024)}')
+    return '\n'.join(lines) + '\n'
+
+
+def export(path_prefix):
+    """
+    Grava as medições em `<path_prefix>.json` e `<path_prefix>.prom` (cada arquivo com troca atômica).
+
+    Returns:
+        dict: O resumo exportado.
+    """
+    summary = snapshot()
+    directory = os.path.dirname(path_prefix)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    payload = {'processo': os.getpid(), 'exportado_em': time.strftime('%Y-%m-%dT%H:%M:%S'), 'trechos': summary}
+    for extension, content in (('json', json.dumps(payload, ensure_ascii=False, indent=2)),
+                               ('prom', prometheus_text(summary))):
+        tmp_path = f"{path_prefix}.{extension}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, f"{path_prefix}.{extension}")
+    return summary
+
+
+if os.environ.get(ENV_VAR) == '1':
+    # Scripts do pipeline (`python -m src...`) exportam ao sair, com o nome do script
+    enable(export_label=os.path.splitext(os.path.basename(sys.argv[0] or 'processo'))[0] or 'processo')
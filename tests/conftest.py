@@ -0,0 +1,9 @@
+# tests/conftest.py
+
+import os
+import sys
+
+# Garante que o pacote `src` seja importável ao rodar `pytest` a partir de qualquer diretório
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
@@ -0,0 +1,189 @@
+# tests/test_analytics.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis import analytics
+from src.feature_engineering.build_aggregates import build_aggregates
+
+# (id_deputado, nome_urna, partido, uf, idade, posicao_governo)
+DEPUTIES = [
+    (1, 'Ana', 'PT', 'SP', 50, 'Governo'),
+    (2, 'Bruno', 'PL', 'RJ', 45, 'Oposição'),
+    (3, 'Carla', 'MDB', 'MG', 60, 'Independente'),
+    (4, 'Davi', 'PT', 'BA', 38, 'Governo'),
+    (5, 'Eva', 'PL', 'SP', 41, 'Oposição'),
+]
+# Votos por votação, na ordem de DEPUTIES (None = deputado ausente)
+VOTES = {
+    'v1': ['Sim', 'Não', 'Sim', 'Sim', 'Não'],
+    'v2': ['Não', 'Sim', 'Abstenção', None, 'Sim'],
+    'v3': [None, 'Sim', 'Não', None, 'Não'],
+    'v4': ['Sim', 'Não', 'Sim', 'Não', None],
+}
+EMENTAS = {'v1': 'Reforma tributária', 'v2': None, 'v3': 'Ementa não disponível.', 'v4': 'Marco do saneamento'}
+
+
+@pytest.fixture(scope='module')
+def df():
+    """Dataset enriquecido mínimo: uma linha por voto registrado (deputado x votação)."""
+    rows = []
+    for day, (voting_id, votes) in enumerate(VOTES.items(), start=1):
+        for (deputy_id, name, party, uf, age, position), vote in zip(DEPUTIES, votes):
+            if vote is None:
+                continue
+            rows.append({'id_votacao': voting_id, 'id_deputado': deputy_id, 'nome_urna': name, 'partido': party,
+                         'uf': uf, 'idade': age, 'posicao_governo': position, 'tipoVoto': vote,
+                         'proposicao_ementa': EMENTAS[voting_id], 'dataRegistroVoto': f'2024-03-0{day}T10:00:00',
+                         'pct_sim_historico': 0.1 * deputy_id})
+    df = pd.DataFrame(rows)
+    # A Ana troca de partido (e de bloco) na última votação: o resumo por deputado soma as duas linhas
+    switched = (df['id_deputado'] == 1) & (df['id_votacao'] == 'v4')
+    df.loc[switched, ['partido', 'posicao_governo']] = ['PSB', 'Independente']
+    return df
+
+
+@pytest.fixture(scope='module')
+def tables(df):
+    return build_aggregates(df)
+
+
+# --- Versões anteriores (um laço por votação ou por deputado sobre o dataset) ---
+
+def loop_deputies(df, party=None, position=None):
+    rows = []
+    for deputy_id in df['id_deputado'].unique():
+        deputy = df[df['id_deputado'] == deputy_id]
+        if party is not None:
+            deputy = deputy[deputy['partido'] == party]
+        if position is not None:
+            deputy = deputy[deputy['posicao_governo'] == position]
+        if deputy.empty:
+            continue
+        rows.append({'id_deputado': deputy_id, 'nome_urna': deputy['nome_urna'].iloc[0],
+                     'partido': deputy['partido'].iloc[0], 'votacoes': len(deputy),
+                     'taxa_sim': (deputy['tipoVoto'] == 'Sim').sum() / len(deputy) * 100})
+    return pd.DataFrame(rows).set_index('id_deputado').sort_index()
+
+
+def loop_votings(df):
+    rows = {}
+    for voting_id in df['id_votacao'].unique():
+        voting = df[df['id_votacao'] == voting_id]
+        rows[voting_id] = {'votos_sim': (voting['tipoVoto'] == 'Sim').sum(),
+                           'votos_nao': (voting['tipoVoto'] == 'Não').sum(), 'total_votos': len(voting),
+                           'ementa': voting['proposicao_ementa'].iloc[0], 'data': voting['dataRegistroVoto'].iloc[0]}
+    return rows
+
+
+def loop_forecast(df, bloc=None):
+    rows = []
+    for voting_id, voting in loop_votings(df).items():
+        votes = df[df['id_votacao'] == voting_id]
+        if bloc is not None:
+            votes = votes[votes['posicao_governo'] == bloc]
+            if votes.empty:
+                continue
+        rate = (votes['tipoVoto'] == 'Sim').sum() / len(votes)
+        ementa = voting['ementa']
+        if ementa is None or 'Ementa não disponível' in ementa:
+            ementa = f'Votação #{voting_id}'
+        rows.append({'id_votacao': voting_id, 'ementa': ementa, 'data': pd.Timestamp(voting['data']),
+                     'taxa_sim': rate * 100, 'previsao': 'Aprovada' if rate > 0.5 else 'Rejeitada',
+                     'confianca': max(rate, 1 - rate) * 100, 'total_votos': len(votes)})
+    return pd.DataFrame(rows)
+
+
+# --- Testes ---
+
+@pytest.mark.parametrize('party, position', [(None, None), ('PT', None), (None, 'Independente'), ('PSB', None)])
+def test_deputies_overview_matches_loop(df, tables, party, position):
+    summary, party_totals = analytics.deputies_overview(tables['deputies_summary'], party, position)
+    expected = loop_deputies(df, party, position)
+
+    assert summary['votacoes'].is_monotonic_decreasing
+    result = summary.set_index('id_deputado').sort_index()
+    pd.testing.assert_frame_equal(result[expected.columns], expected, check_dtype=False)
+
+    rows = df if party is None else df[df['partido'] == party]
+    rows = rows if position is None else rows[rows['posicao_governo'] == position]
+    assert party_totals.to_dict() == rows['partido'].value_counts().to_dict()
+    assert party_totals.is_monotonic_decreasing
+
+
+def test_votings_overview_matches_loop(df, tables):
+    overview = analytics.votings_overview(tables['votings_summary'])
+    expected = loop_votings(df)
+
+    assert overview['id_votacao'].tolist() == sorted(expected)
+    for row in overview.itertuples():
+        voting = expected[row.id_votacao]
+        assert (row.votos_sim, row.total_votos) == (voting['votos_sim'], voting['total_votos'])
+        assert row.taxa_aprovacao == round(voting['votos_sim'] / voting['total_votos'] * 100, 1)
+        assert row.ementa == voting['ementa'] or (pd.isna(row.ementa) and voting['ementa'] is None)
+
+
+def test_voting_outcomes_matches_loop(df, tables):
+    outcomes = analytics.voting_outcomes(tables['votings_summary'])
+    expected = pd.Series(['Aprovada' if v['votos_sim'] > v['votos_nao'] else 'Rejeitada'
+                          for v in loop_votings(df).values()]).value_counts()
+    assert outcomes.to_dict() == expected.to_dict()
+
+
+def test_bloc_vote_totals_matches_loop(df, tables):
+    totals = analytics.bloc_vote_totals(tables['bloc_counts'])
+    for bloc in df['posicao_governo'].unique():
+        votes = df.loc[df['posicao_governo'] == bloc, 'tipoVoto']
+        assert totals.loc[bloc].tolist() == [(votes == 'Sim').sum(), (votes == 'Não').sum()]
+
+
+@pytest.mark.parametrize('bloc', [None, 'Governo', 'Oposição', 'Independente'])
+def test_approval_forecast_matches_loop(df, tables, bloc):
+    forecast = analytics.approval_forecast(tables['votings_summary'], tables['bloc_counts'], bloc=bloc)
+    expected = loop_forecast(df, bloc)
+    result = forecast.sort_values('id_votacao').reset_index(drop=True)
+    pd.testing.assert_frame_equal(result, expected.sort_values('id_votacao').reset_index(drop=True),
+                                  check_dtype=False)
+
+
+def test_approval_forecast_bloc_filter_drops_votings_without_bloc_votes(tables):
+    # O Governo (Ana e Davi) não votou em v3
+    forecast = analytics.approval_forecast(tables['votings_summary'], tables['bloc_counts'], bloc='Governo')
+    assert sorted(forecast['id_votacao']) == ['v1', 'v2', 'v4']
+
+
+def test_approval_forecast_missing_ementa(tables):
+    forecast = analytics.approval_forecast(tables['votings_summary'], tables['bloc_counts']).set_index('id_votacao')
+    assert forecast.loc['v2', 'ementa'] == 'Votação #v2'
+    assert forecast.loc['v3', 'ementa'] == 'Votação #v3'
+    assert forecast.loc['v1', 'ementa'] == 'Reforma tributária'
+
+
+def test_group_means_matches_loop(df):
+    means = analytics.group_means(df, 'partido')
+    for party in df['partido'].unique():
+        assert means[party] == pytest.approx(df.loc[df['partido'] == party, 'pct_sim_historico'].mean())
+
+
+def test_search_rows():
+    table = pd.DataFrame({'id_votacao': ['v1', 'v2', 'v3'], 'ementa': ['Reforma Tributária', None, 'a+b (c)']})
+    assert analytics.search_rows(table, '', ['ementa']) is table
+    assert analytics.search_rows(table, '   ', ['ementa']) is table
+    assert analytics.search_rows(table, 'tributária', ['ementa'])['id_votacao'].tolist() == ['v1']
+    assert analytics.search_rows(table, 'V2', ['id_votacao', 'ementa'])['id_votacao'].tolist() == ['v2']
+    # O texto é procurado literalmente, não como expressão regular
+    assert analytics.search_rows(table, 'a+b (c', ['ementa'])['id_votacao'].tolist() == ['v3']
+    assert analytics.search_rows(table, 'inexistente', ['ementa']).empty
+
+
+def test_page_rows():
+    table = pd.DataFrame({'id': range(7), 'taxa': [3.0, np.nan, 1.0, 2.0, 1.0, np.nan, 5.0]})
+    assert analytics.page_rows(table, 1, 3)['id'].tolist() == [0, 1, 2]
+    assert analytics.page_rows(table, 3, 3)['id'].tolist() == [6]
+    assert analytics.page_rows(table, 0, 3)['id'].tolist() == [0, 1, 2]
+    assert analytics.page_rows(table, 4, 3).empty
+    # Ordenação estável, com os valores ausentes por último nos dois sentidos
+    assert analytics.page_rows(table, 1, 7, sort_by='taxa')['id'].tolist() == [2, 4, 3, 0, 6, 1, 5]
+    assert analytics.page_rows(table, 1, 7, sort_by='taxa', ascending=False)['id'].tolist() == [6, 0, 3, 2, 4, 1, 5]
+    assert analytics.page_rows(table, 2, 3, sort_by='taxa')['id'].tolist() == [0, 6, 1]